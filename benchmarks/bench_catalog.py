@@ -0,0 +1,56 @@
+"""
+Cold vs warm catalog load: parsing tle_cache.tle as text (and writing the binary sidecar)
+against memory-mapping the sidecar and rebuilding the satellites from it.
+
+Run from the repository root:
+    python benchmarks/bench_catalog.py [--tle tle_cache.tle] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from skyfield.api import load
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import SIDECAR_SUFFIX, load_catalog, read_sidecar, tle_digest
+
+
+def best_of(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_catalog.py',
+                    description='Benchmark cold vs warm TLE catalog loading')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--repeat", type=int, default=5, help='Repetitions, best time is reported')
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    sidecar = args.tle + SIDECAR_SUFFIX
+
+    def cold():
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+        return load_catalog(args.tle, ts)
+
+    count = len(cold())
+    print(f"Catalog: {count} satellites")
+    print(f"load.tle_file (baseline) ........ : {best_of(args.repeat, lambda: load.tle_file(args.tle, ts=ts)) * 1e3:8.1f} ms")
+    print(f"Cold: parse + write sidecar ..... : {best_of(args.repeat, cold) * 1e3:8.1f} ms")
+    print(f"Warm: hash + mmap + rebuild ..... : {best_of(args.repeat, lambda: load_catalog(args.tle, ts)) * 1e3:8.1f} ms")
+    print(f"  hash TLE text ................. : {best_of(args.repeat, lambda: tle_digest(args.tle)) * 1e3:8.1f} ms")
+    digest = tle_digest(args.tle)
+    print(f"  mmap sidecar records .......... : {best_of(args.repeat, lambda: read_sidecar(sidecar, digest)) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
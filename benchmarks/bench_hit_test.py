@@ -0,0 +1,85 @@
+"""
+Microbenchmark for hit_test.MarkerIndex: the per-frame grid build plus mouse queries against the
+linear math.hypot scan over satellite_positions it replaced. Every query is also checked against
+a brute-force nearest-marker search; exits non-zero on any disagreement.
+
+Markers are scattered over the polar plot the way satellites cluster on it: uniformly in
+azimuth, denser toward the horizon.
+
+Run from the repository root:
+    python benchmarks/bench_hit_test.py [--markers N]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from hit_test import HIT_RADIUS_PX, MarkerIndex
+
+PLOT_RECT = (200, 0, 1720, 1080)
+
+
+def linear_scan(positions, x, y):
+    """The previous hit test: first marker in dict order within the radius"""
+    for sat, (px, py) in positions.items():
+        if math.hypot(x - px, y - py) < HIT_RADIUS_PX:
+            return sat
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_hit_test.py',
+                    description='Benchmark hover/click hit-testing on the polar plot')
+    parser.add_argument("--markers", type=int, default=5000, help='Markers on the plot')
+    parser.add_argument("--queries", type=int, default=2000, help='Mouse positions tested')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sub_x, sub_y, sub_width, sub_height = PLOT_RECT
+    cx, cy = sub_x + sub_width // 2, sub_y + sub_height // 2
+    radius = min(sub_width, sub_height) // 2 - 50
+    plot_r = radius * np.sqrt(rng.uniform(0, 1, args.markers))
+    az = rng.uniform(0, 2 * np.pi, args.markers)
+    xs = (cx + plot_r * np.sin(az)).astype(int).tolist()
+    ys = (cy - plot_r * np.cos(az)).astype(int).tolist()
+    positions = {i: (x, y) for i, (x, y) in enumerate(zip(xs, ys))}
+    queries = list(zip(rng.uniform(cx - radius, cx + radius, args.queries).tolist(),
+                       rng.uniform(cy - radius, cy + radius, args.queries).tolist()))
+
+    start = time.perf_counter()
+    for x, y in queries:
+        linear_scan(positions, x, y)
+    linear = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    index = MarkerIndex(list(positions), np.array(xs), np.array(ys))
+    index.nearest(*queries[0])  # The first query builds the grid
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    hits = [index.nearest(x, y) for x, y in queries]
+    query = (time.perf_counter() - start) / len(queries)
+    print(f"{len(positions)} markers: linear scan {linear * 1e3:.3f} ms/query, "
+          f"grid build + first query {build * 1e3:.3f} ms, then {query * 1e3:.3f} ms/query")
+
+    xy = np.array([positions[i] for i in range(len(positions))], dtype=float)
+    mismatches = first_order = 0
+    for (x, y), hit in zip(queries, hits):
+        distances = np.hypot(xy[:, 0] - x, xy[:, 1] - y)
+        nearest = int(np.argmin(distances))
+        expected = nearest if distances[nearest] < HIT_RADIUS_PX else None
+        if hit != expected and not (hit is not None and distances[hit] == distances[nearest]):
+            mismatches += 1
+        first_order += linear_scan(positions, x, y) != expected
+    print(f"Hits: {sum(hit is not None for hit in hits)} of {len(queries)}; "
+          f"linear scan picked a farther marker on {first_order}; grid mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
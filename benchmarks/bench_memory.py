@@ -0,0 +1,97 @@
+"""
+Memory footprint of one trajectory window on the bundled tle_cache.tle: the original
+per-satellite lists of (t, alt, az, dist, x, y) tuples, the (M, T, 8) float64 array that replaced
+them, and the columnar float32 TrajectoryStore, for the whole catalog and for the satellites the
+visibility pre-filter keeps.
+
+The list-of-tuples layout is built for a sample of satellites under tracemalloc and scaled to the
+catalog; building it for every satellite would take gigabytes. The window is centered on the
+catalog's median TLE epoch unless --start is given.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py [--sample N] [--mask DEG]
+"""
+
+import argparse
+import datetime
+import math
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from propagation import CatalogPropagator, precompute_trajectories
+
+PLOT_RECT = (200, 0, 1720, 1080)
+PREVIOUS_COLUMNS = 8  # t, alt, az, dist, px, py, lit, eye
+
+
+def tuple_trajectories(satellites, observer, times):
+    """The original layout: {sat: (list of per-sample tuples, times_array)} from numpy scalars"""
+    sub_x, sub_y, sub_width, sub_height = PLOT_RECT
+    cx = sub_x + sub_width // 2
+    cy = sub_y + sub_height // 2
+    radius = min(sub_width, sub_height) // 2 - 50
+    alts, azs, distances = CatalogPropagator(satellites).altaz(observer, times)
+    trajectories = {}
+    for k, sat in enumerate(satellites):
+        trajectory = [(t, alt, az, dist,
+                       cx + ((90 - alt) / 90 * radius) * math.sin(math.radians(az % 360)),
+                       cy - ((90 - alt) / 90 * radius) * math.cos(math.radians(az % 360)))
+                      for t, alt, az, dist in zip(times.tt, alts[k], azs[k], distances[k])]
+        trajectories[sat] = (trajectory, np.array([row[0] for row in trajectory]))
+    return trajectories
+
+
+def megabytes(n):
+    return f"{n / 1e6:9.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_memory.py',
+                    description='Report trajectory window memory use per storage layout')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--sample", type=int, default=200, help='Satellites the list-of-tuples layout is built for')
+    parser.add_argument("--mask", type=float, default=10.0, help='Elevation mask for the pre-filtered store')
+    parser.add_argument("--start", type=str, default=None, help="Window center (ISO UTC), defaults to the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    start_utc = (datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc) if args.start
+                 else median_epoch(satellites))
+
+    store = precompute_trajectories(satellites, observer, ts, *PLOT_RECT, start_utc=start_utc)
+    samples = len(store.times_tt)
+    times = ts.tt_jd(store.times_tt)
+    print(f"Catalog: {len(satellites)} satellites x {samples} samples")
+
+    sample = satellites[:args.sample]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    trajectories = tuple_trajectories(sample, observer, times)
+    per_satellite = (tracemalloc.get_traced_memory()[0] - before) / len(sample)
+    tracemalloc.stop()
+    del trajectories
+    previous = np.dtype(np.float64).itemsize * PREVIOUS_COLUMNS * samples
+
+    filtered = precompute_trajectories(satellites, observer, ts, *PLOT_RECT, start_utc=start_utc,
+                                       elevation_mask=args.mask)
+    print(f"{'list of tuples':34s} {megabytes(per_satellite * len(satellites))}  "
+          f"({per_satellite / samples:.0f} B/sample, from {len(sample)} satellites)")
+    print(f"{'(M, T, 8) float64 array':34s} {megabytes(previous * len(satellites))}  "
+          f"({previous / samples:.0f} B/sample)")
+    print(f"{'columnar float32 store':34s} {megabytes(store.nbytes)}  "
+          f"({store.data.nbytes / store.data[0].size:.0f} B/sample)")
+    print(f"{f'columnar store, {args.mask:g} deg pre-filter':34s} {megabytes(filtered.nbytes)}  "
+          f"({len(filtered)} of {len(satellites)} satellites)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark and consistency check for multi-site trajectory windows on the bundled tle_cache.tle.
+
+Propagates one TrajectoryWindow over --sites observer sites, spread in longitude from the default
+site, and times it (and a roll forward) against one single-site window per site. Every site's
+store from the shared window must hold each row its own window holds, with the same samples.
+The window is centered on the catalog's median TLE epoch unless --start is given. Exits non-zero
+on any mismatch.
+
+Run from the repository root:
+    python benchmarks/bench_multi_site.py [--sites 3] [--mask 10] [--start 2025-08-23T06:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from ephemeris import EphemerisService
+from propagation import TRAJECTORY_COLUMNS, TrajectoryWindow
+
+PLOT_RECT = (200, 0, 1720, 1080)
+# Both windows run the same arithmetic; allow for float32 rounding only (range relative to itself)
+TOLERANCE = {'alt': 1e-4, 'az': 1e-4, 'range': 1e-6, 'px': 0.01, 'py': 0.01, 'lit': 1e-4, 'eye': 0.0}
+
+
+def compare(single, shared):
+    """Mismatching columns between a single-site store and the same site's shared store"""
+    failures = 0
+    missing = np.setdiff1d(single.indices, shared.indices)
+    if len(missing):
+        print(f"  FAIL: {len(missing)} rows of the single-site window missing from the shared one")
+        failures += len(missing)
+    common = np.intersect1d(single.indices, shared.indices)
+    alt = single.alt[single.row_of[common]].astype(float)
+    for column in TRAJECTORY_COLUMNS:
+        a = getattr(single, column)[single.row_of[common]].astype(float)
+        b = getattr(shared, column)[shared.row_of[common]].astype(float)
+        diff = np.abs(a - b)
+        if column == 'az':
+            # As arc on the sky; azimuth is ill-conditioned near the zenith
+            diff = np.minimum(diff, 360.0 - diff) * np.cos(np.radians(alt))
+        elif column == 'range':
+            diff = diff / a
+        both_nan = np.isnan(a) & np.isnan(b)
+        worst = np.max(np.where(both_nan, 0.0, np.nan_to_num(diff, nan=np.inf)), initial=0.0)
+        if worst > TOLERANCE[column]:
+            print(f"  FAIL: {column} differs by {worst:.3g}")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_multi_site.py',
+                    description='Benchmark one multi-site trajectory window against one window per site')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--ephemeris", type=str, default=None, help='Planetary ephemeris for the shadow columns')
+    parser.add_argument("--sites", type=int, default=3, help='Number of observer sites')
+    parser.add_argument("--mask", type=float, default=None, help='Elevation mask for the visibility pre-filter')
+    parser.add_argument("--step-minutes", type=float, default=5.0, help='How far the roll moves the window')
+    parser.add_argument("--start", type=str, default=None, help="ISO UTC center of the window, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    ephemeris = EphemerisService(args.ephemeris, ts=ts) if args.ephemeris else None
+    observers = [wgs84.latlon(34.87405877829887 - 5.0 * i, -120.44621926328121 + 20.0 * i, elevation_m=120.0)
+                 for i in range(args.sites)]
+    center = (median_epoch(satellites) if args.start is None else
+              datetime.datetime.fromisoformat(args.start).replace(tzinfo=datetime.timezone.utc))
+    print(f"Catalog: {len(satellites)} satellites, {args.sites} sites, mask {args.mask}, "
+          f"shadow {'on' if ephemeris else 'off'}")
+
+    singles = [TrajectoryWindow(satellites, observer, ts, PLOT_RECT, elevation_mask=args.mask, ephemeris=ephemeris)
+               for observer in observers]
+    shared = TrajectoryWindow(satellites, observers, ts, PLOT_RECT, elevation_mask=args.mask, ephemeris=ephemeris)
+    failures = 0
+    for label, when in (("full window", center), (f"roll +{args.step_minutes:g} min",
+                                                   center + datetime.timedelta(minutes=args.step_minutes))):
+        start = time.perf_counter()
+        single_stores = [window.advance(when) for window in singles]
+        single_s = time.perf_counter() - start
+        start = time.perf_counter()
+        shared_stores = shared.advance(when)
+        shared_s = time.perf_counter() - start
+        print(f"{label:16s}: one window per site {single_s:7.2f} s, shared window {shared_s:7.2f} s "
+              f"({shared_s / single_s:.0%})")
+        for site, (single, store) in enumerate(zip(single_stores, shared_stores)):
+            site_failures = compare(single, store)
+            print(f"  site {site}: rows single {len(single)}, shared {len(store)}{'' if site_failures else ', match'}")
+            failures += site_failures
+    print("OK: every site's store matches its own window" if failures == 0 else f"FAIL: {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
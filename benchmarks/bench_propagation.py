@@ -0,0 +1,61 @@
+"""
+Benchmark whole-catalog batch propagation against the per-satellite Skyfield path
+that precompute_trajectories used to run, on the bundled tle_cache.tle.
+
+Run from the repository root:
+    python benchmarks/bench_propagation.py [--sample N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from propagation import CatalogPropagator
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_propagation.py',
+                    description='Benchmark batch vs per-satellite SGP4 propagation')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--steps", type=int, default=900, help='Samples in the 30 minute window')
+    parser.add_argument("--sample", type=int, default=500,
+                        help='Satellites timed on the per-satellite path (0 = whole catalog); the rest is extrapolated')
+    args = parser.parse_args()
+
+    satellites = load.tle_file(args.tle)
+    ts = load.timescale()
+    now = ts.now()
+    times = ts.tt_jd(np.linspace(now.tt - 900 / 86400, now.tt + 900 / 86400, args.steps))
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    print(f"Catalog: {len(satellites)} satellites x {args.steps} samples")
+
+    start = time.perf_counter()
+    alts, azs, distances = CatalogPropagator(satellites).altaz(observer, times)
+    batch_s = time.perf_counter() - start
+    print(f"Batch (SatrecArray) ............ : {batch_s:8.2f} s")
+
+    subset = satellites if args.sample <= 0 else satellites[:args.sample]
+    worst_alt = 0.0
+    start = time.perf_counter()
+    for i, sat in enumerate(subset):
+        alt, az, dist = (sat - observer).at(times).altaz()
+        with np.errstate(invalid='ignore'):
+            diff = np.abs(alt.degrees - alts[i])
+        if np.any(np.isfinite(diff)):
+            worst_alt = max(worst_alt, np.nanmax(diff))
+    per_sat_s = time.perf_counter() - start
+    per_sat_full_s = per_sat_s / len(subset) * len(satellites)
+    label = "measured" if len(subset) == len(satellites) else f"extrapolated from {len(subset)}"
+    print(f"Per-satellite (Skyfield) ....... : {per_sat_full_s:8.2f} s ({label})")
+    print(f"Speedup ........................ : {per_sat_full_s / batch_s:8.1f}x")
+    print(f"Max |alt difference| ........... : {worst_alt:.2e} deg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark and consistency check for the rolling TrajectoryWindow on the bundled tle_cache.tle.
+
+Propagates a full ±15 minute window, then rolls it forward several times by --step-minutes,
+timing each refresh against a full recomputation at the same center. The last rolled window is
+compared sample for sample with a freshly propagated one: every satellite that clears the mask in
+the fresh window must be in the rolled one, and the rows both hold must match.
+Exits non-zero on any mismatch. Both windows run SGP4 at every sample, so that rolling is all that
+differs between them (check_adaptive_sampling.py covers the interpolation). The first window is
+centered on the catalog's median TLE epoch unless --start is given.
+
+Run from the repository root:
+    python benchmarks/bench_rolling_window.py [--step-minutes 5] [--mask 10] [--start 2025-08-23T06:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from ephemeris import EphemerisService
+from propagation import TRAJECTORY_COLUMNS, WINDOW_HALF_WIDTH, TrajectoryWindow, precompute_trajectories
+
+PLOT_RECT = (200, 0, 1720, 1080)
+# Azimuth is compared as arc on the sky (it is ill-conditioned near the zenith and nadir, which also
+# moves the off-plot pixel positions of satellites below the horizon) and range relative to itself
+# (a float32 ulp is ~8 m at GEO distances); both windows sample the same grid to ~40 us
+TOLERANCE = {'alt': 1e-3, 'az': 1e-3, 'range': 1e-6, 'px': 0.05, 'py': 0.05, 'lit': 1e-3, 'eye': 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_rolling_window.py',
+                    description='Benchmark rolling the trajectory window forward against recomputing it')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--ephemeris", type=str, default=None, help='Planetary ephemeris for the shadow columns')
+    parser.add_argument("--mask", type=float, default=None, help='Elevation mask for the visibility pre-filter')
+    parser.add_argument("--step-minutes", type=float, default=5.0, help='How far each refresh moves the window')
+    parser.add_argument("--refreshes", type=int, default=3, help='Refreshes to time')
+    parser.add_argument("--start", type=str, default=None, help="ISO UTC center of the first window, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    ephemeris = EphemerisService(args.ephemeris, ts=ts) if args.ephemeris else None
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    center = (median_epoch(satellites) if args.start is None else
+              datetime.datetime.fromisoformat(args.start).replace(tzinfo=datetime.timezone.utc))
+    window = TrajectoryWindow(satellites, observer, ts, PLOT_RECT, elevation_mask=args.mask, ephemeris=ephemeris,
+                              max_error_arcsec=None)
+
+    start = time.perf_counter()
+    window.advance(center)
+    full_s = time.perf_counter() - start
+    print(f"Catalog: {len(satellites)} satellites, mask {args.mask}, shadow {'on' if ephemeris else 'off'}")
+    print(f"full window .................... : {full_s:8.2f} s  {window.propagated:>10d} satellite-samples")
+    for refresh in range(1, args.refreshes + 1):
+        center += datetime.timedelta(minutes=args.step_minutes)
+        start = time.perf_counter()
+        rolled = window.advance(center)
+        rolled_s = time.perf_counter() - start
+        print(f"roll +{args.step_minutes:g} min #{refresh} ............ : {rolled_s:8.2f} s  "
+              f"{window.propagated:>10d} satellite-samples  ({rolled_s / full_s:.0%} of full)")
+
+    # Same grid: a fresh window starting at the rolled one's first sample
+    middle = ts.tt_jd(rolled.times_tt[0]).utc_datetime() + WINDOW_HALF_WIDTH
+    start = time.perf_counter()
+    fresh = precompute_trajectories(satellites, observer, ts, *PLOT_RECT, start_utc=middle,
+                                    elevation_mask=args.mask, ephemeris=ephemeris, max_error_arcsec=None)
+    print(f"full recompute at last center .. : {time.perf_counter() - start:8.2f} s")
+
+    failures = 0
+    drift_s = np.max(np.abs(fresh.times_tt - rolled.times_tt)) * 86400
+    if drift_s > 1e-3:
+        print(f"FAIL: time grids differ by {drift_s:.4f} s")
+        failures += 1
+    # Both windows are conservative supersets of what clears the mask, screened differently; what
+    # actually rises above it in the fresh window must be in the rolled one
+    visible = fresh.indices[np.any(fresh.alt > (args.mask if args.mask is not None else -90.0), axis=1)]
+    missing = np.setdiff1d(visible, rolled.indices)
+    if len(missing):
+        print(f"FAIL: {len(missing)} satellites visible in the fresh window missing from the rolled one")
+        failures += len(missing)
+    print(f"Rows: rolled {len(rolled)}, fresh {len(fresh)}, above the mask {len(visible)}")
+    common = np.intersect1d(fresh.indices, rolled.indices)
+    fresh_rows = fresh.row_of[common]
+    rolled_rows = rolled.row_of[common]
+    for column in TRAJECTORY_COLUMNS:
+        a = getattr(fresh, column)[fresh_rows].astype(float)
+        b = getattr(rolled, column)[rolled_rows].astype(float)
+        diff = np.abs(a - b)
+        if column == 'az':
+            diff = np.minimum(diff, 360.0 - diff) * np.cos(np.radians(fresh.alt[fresh_rows]))
+        elif column == 'range':
+            diff = diff / a
+        both_nan = np.isnan(a) & np.isnan(b)
+        worst = np.max(np.where(both_nan, 0.0, np.nan_to_num(diff, nan=np.inf)), initial=0.0)
+        ok = worst <= TOLERANCE[column]
+        failures += not ok
+        print(f"  {column:6s} max difference {worst:.3g}{'' if ok else '  FAIL'}")
+    print("OK: rolled window matches a fresh one" if failures == 0 else f"FAIL: {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Scaling benchmark for sharded precompute_trajectories: times the full 900-sample window on
+the bundled tle_cache.tle for 1..N pool workers.
+
+Run from the repository root:
+    python benchmarks/bench_sharding.py [--max-workers N] [--shard-size S]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from propagation import DEFAULT_SHARD_SIZE, precompute_trajectories
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='bench_sharding.py',
+                    description='Benchmark precompute_trajectories scaling across pool workers')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help='Largest pool size to time')
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help='Satellites per shard')
+    args = parser.parse_args()
+
+    satellites = load.tle_file(args.tle)
+    ts = load.timescale()
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    start_utc = datetime.datetime.now(utc)
+    print(f"Catalog: {len(satellites)} satellites, shard size {args.shard_size}, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        start = time.perf_counter()
+        precompute_trajectories(satellites, observer, ts, 200, 0, 1720, 1080, start_utc=start_utc,
+                                workers=workers, shard_size=args.shard_size)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3d} {elapsed:8.2f} s   speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Check the adaptive-sampling error bound against dense SGP4 truth on the bundled tle_cache.tle,
+and time adaptive against dense propagation.
+
+For several sites and windows, the trajectory window is propagated once with adaptive sampling
+(SGP4 every sample_strides() steps, Hermite interpolation in between) and once with SGP4 at every
+sample. Every sample's direction must agree within --max-error arcseconds, plus the float32
+rounding of the stored alt/az. Exits non-zero if any sample exceeds it. Windows start at the
+catalog's median TLE epoch unless --start is given; far from it, satellites whose elements have
+diverged are sampled at every step.
+
+Run from the repository root:
+    python benchmarks/check_adaptive_sampling.py [--max-error 1.0] [--start 2025-08-23T06:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from propagation import DEEP_SPACE_PERIOD_MIN, WINDOW_STEP_S, precompute_trajectories, sample_strides
+
+PLOT_RECT = (200, 0, 1720, 1080)
+SITES = {
+    'Santa Maria': (34.87405877829887, -120.44621926328121, 120.0),
+    'Equator': (0.0, 30.0, 0.0),
+    'McMurdo': (-77.85, 166.67, 10.0),
+}
+FLOAT32_ARCSEC = 0.2  # Half a float32 ulp of a 256-360 degree azimuth is 0.055", of alt and az together less than this
+
+
+def separation_arcsec(alt1, az1, alt2, az2):
+    """Angle between two alt/az directions in degrees, by the haversine formula"""
+    alt1, az1, alt2, az2 = (np.radians(np.asarray(x, dtype=float)) for x in (alt1, az1, alt2, az2))
+    hav = (np.sin((alt2 - alt1) / 2) ** 2 + np.cos(alt1) * np.cos(alt2) * np.sin((az2 - az1) / 2) ** 2)
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0.0, 1.0)))) * 3600
+
+
+def regimes(satellites):
+    """LEO / MEO / GEO / HEO label per satellite, from period and eccentricity"""
+    period_min = np.array([2 * np.pi / sat.model.no_kozai for sat in satellites])
+    ecco = np.array([sat.model.ecco for sat in satellites])
+    return np.where(ecco > 0.25, 'HEO', np.where(period_min < 128, 'LEO',
+                    np.where(period_min < DEEP_SPACE_PERIOD_MIN * 5, 'MEO', 'GEO')))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_adaptive_sampling.py',
+                    description='Check the adaptive trajectory sampling error bound against dense SGP4')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--max-error", type=float, default=1.0, help='Error bound in arcseconds')
+    parser.add_argument("--windows", type=int, default=1, help='30 minute windows per site, 5h apart')
+    parser.add_argument("--start", type=str, default=None,
+                        help="ISO UTC center of the first window, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    labels = regimes(satellites)
+    center = (median_epoch(satellites) if args.start is None else
+              datetime.datetime.fromisoformat(args.start).replace(tzinfo=datetime.timezone.utc))
+    limit = args.max_error + FLOAT32_ARCSEC
+    failures = 0
+    for site, (lat, lon, alt_m) in SITES.items():
+        observer = wgs84.latlon(lat, lon, elevation_m=alt_m)
+        strides = sample_strides(satellites, observer, WINDOW_STEP_S, args.max_error)
+        for w in range(args.windows):
+            start_utc = center + datetime.timedelta(hours=5 * w)
+            start = time.perf_counter()
+            dense = precompute_trajectories(satellites, observer, ts, *PLOT_RECT, start_utc=start_utc,
+                                            max_error_arcsec=None)
+            dense_s = time.perf_counter() - start
+            start = time.perf_counter()
+            adaptive = precompute_trajectories(satellites, observer, ts, *PLOT_RECT, start_utc=start_utc,
+                                               max_error_arcsec=args.max_error)
+            adaptive_s = time.perf_counter() - start
+            error = separation_arcsec(dense.alt, dense.az, adaptive.alt, adaptive.az)
+            # Samples next to an SGP4 failure are NaN in the adaptive window; they are not errors
+            lost = np.isnan(adaptive.alt) & ~np.isnan(dense.alt)
+            worst = np.nanmax(np.where(np.isnan(dense.alt), 0.0, error), axis=1)
+            over = np.flatnonzero(worst > limit)
+            failures += len(over)
+            print(f"{site:12s} window {w}: dense {dense_s:6.2f} s, adaptive {adaptive_s:6.2f} s "
+                  f"({dense_s / adaptive_s:.1f}x), max error {np.nanmax(worst):.3f}\" "
+                  f"(bound {args.max_error:g}\"), {lost.sum()} samples lost next to SGP4 failures")
+            for regime in ('LEO', 'MEO', 'GEO', 'HEO'):
+                members = labels == regime
+                if members.any():
+                    print(f"    {regime}: {members.sum():5d} satellites, stride median "
+                          f"{np.median(strides[members]):4.0f} ({np.median(strides[members]) * WINDOW_STEP_S:5.0f} s), "
+                          f"max error {np.nanmax(worst[members]):.3f}\"")
+            for i in over:
+                print(f"    OVER {satellites[i].model.satnum_str} {satellites[i].name} stride {strides[i]} "
+                      f"error {worst[i]:.3f}\"")
+    print(f"OK: every sample within {limit:g}\"" if failures == 0 else f"FAIL: {failures} satellites over the bound")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Check the conditional, merged TLE cache refresh against a local HTTP stand-in for Celestrak.
+
+Serves the bundled gp.php from an http.server thread with an ETag and Last-Modified, and answers
+matching If-None-Match / If-Modified-Since requests with a 304. Checks that the first fetch
+writes the cache, that a second fetch is conditional, gets a 304 and leaves the cache alone, that
+a download with one newer-epoch and one older-epoch object replaces only the newer one, and that
+a refused connection leaves the cache intact. Exits non-zero on any failure.
+
+Run from the repository root:
+    python benchmarks/check_celestrak.py [--gp gp.php]
+"""
+
+import argparse
+import email.utils
+import http.server
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from celestrak import merge_tle_text, parse_tle_entries, refresh_tle_cache
+
+
+class CatalogHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the server's current catalog body, conditionally, and records each request's headers"""
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if (self.headers.get('If-None-Match') == server.etag or
+                self.headers.get('If-Modified-Since') == server.last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(server.body)))
+        self.send_header('ETag', server.etag)
+        self.send_header('Last-Modified', server.last_modified)
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(server, text, version):
+    """Switch the stand-in to a new catalog version"""
+    server.body = text.encode('utf-8')
+    server.etag = f'"catalog-{version}"'
+    server.last_modified = email.utils.formatdate(time.time() + version, usegmt=True)
+
+
+def shift_epoch(line1, days):
+    """TLE line 1 with its epoch moved by days (within the year) and the checksum redone"""
+    line = line1[:20] + f"{float(line1[20:32]) + days:012.8f}" + line1[32:68]
+    checksum = sum(int(c) if c.isdigit() else c == '-' for c in line) % 10
+    return line + str(checksum)
+
+
+def read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_celestrak.py',
+                    description='Check the TLE cache refresh against a local HTTP stand-in')
+    parser.add_argument("--gp", type=str, default="gp.php", help='Catalog for the stand-in to serve')
+    args = parser.parse_args()
+
+    gp_text = read(args.gp)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), CatalogHandler)
+    server.requests = []
+    serve(server, gp_text, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/gp.php'
+    cache = os.path.join(tempfile.mkdtemp(), 'tle_cache.tle')
+    failures = 0
+
+    def check(ok, what):
+        nonlocal failures
+        failures += not ok
+        print(f"{what} ... {'ok' if ok else 'FAIL'}")
+
+    start = time.perf_counter()
+    outcome = refresh_tle_cache(cache, url)
+    print(f"first fetch: {outcome} ({(time.perf_counter() - start) * 1e3:.1f} ms)")
+    headers = server.requests[-1]
+    check('If-None-Match' not in headers and 'If-Modified-Since' not in headers, "first fetch is unconditional")
+    check(os.path.exists(cache) and read(cache) == merge_tle_text('', gp_text)[0], "first fetch writes the cache")
+
+    written = read(cache)
+    inode = os.stat(cache).st_ino
+    start = time.perf_counter()
+    outcome = refresh_tle_cache(cache, url)
+    print(f"second fetch: {outcome} ({(time.perf_counter() - start) * 1e3:.1f} ms)")
+    headers = server.requests[-1]
+    check(headers.get('If-None-Match') == server.etag and headers.get('If-Modified-Since') == server.last_modified,
+          "second fetch sends If-None-Match and If-Modified-Since")
+    check(outcome == "TLEs not modified on server", "second fetch gets a 304")
+    check(read(cache) == written and os.stat(cache).st_ino == inode, "a 304 leaves the cache file alone")
+
+    entries = parse_tle_entries(written)
+    (newer_id, _, newer), (older_id, _, older) = entries[0], entries[1]
+    newer = newer[:-2] + [shift_epoch(newer[-2], 1.0), newer[-1]]
+    older_shifted = older[:-2] + [shift_epoch(older[-2], -1.0), older[-1]]
+    serve(server, '\n'.join(newer + older_shifted) + '\n', 1)
+    outcome = refresh_tle_cache(cache, url)
+    print(f"partial download: {outcome}")
+    merged = {norad_id: entry_lines for norad_id, _, entry_lines in parse_tle_entries(read(cache))}
+    check(merged[newer_id] == newer, f"newer epoch of {newer_id} replaces the cached entry")
+    check(merged[older_id] == older, f"older epoch of {older_id} keeps the cached entry")
+    check(len(merged) == len(entries) and outcome == "TLEs merged: 1 updated, 0 new",
+          "objects missing from the download are kept")
+
+    written = read(cache)
+    server.shutdown()
+    server.server_close()
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        closed_url = f'http://127.0.0.1:{probe.getsockname()[1]}/gp.php'
+    start = time.perf_counter()
+    try:
+        refresh_tle_cache(cache, closed_url)
+        refused = False
+    except requests.RequestException as e:
+        refused = True
+        print(f"refused connection: {type(e).__name__} after {time.perf_counter() - start:.1f} s of retries")
+    check(refused, "a refused connection raises")
+    check(read(cache) == written, "a refused connection leaves the cache intact")
+
+    print("OK: cache refresh behaves" if failures == 0 else f"FAIL: {failures} checks")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
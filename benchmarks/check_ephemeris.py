@@ -0,0 +1,54 @@
+"""
+Check the ephemeris service's interpolated positions against direct kernel queries and time both.
+
+Run from the repository root:
+    python benchmarks/check_ephemeris.py [--ephemeris de421.bsp]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from ephemeris import DEFAULT_BODIES, EphemerisService
+
+TOLERANCE_KM = 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_ephemeris.py',
+                    description='Check and time interpolated ephemeris tables')
+    parser.add_argument("--ephemeris", type=str, default="de421.bsp", help='Planetary ephemeris')
+    parser.add_argument("--samples", type=int, default=900, help='Query times within one day')
+    args = parser.parse_args()
+
+    service = EphemerisService(args.ephemeris)
+    ts, kernel = service.ts, service.kernel
+    now = ts.now().tt
+    times = ts.tt_jd(np.sort(now + np.random.default_rng(0).uniform(0, 1, args.samples)))
+    start = time.perf_counter()
+    service.set_window(now, now + 1)
+    build_s = time.perf_counter() - start
+    print(f"Table build ({len(DEFAULT_BODIES)} bodies, 1 day) : {build_s * 1e3:8.1f} ms")
+
+    worst = 0.0
+    for body in DEFAULT_BODIES:
+        start = time.perf_counter()
+        interpolated = service.positions(body, times)
+        table_s = time.perf_counter() - start
+        start = time.perf_counter()
+        direct = kernel['earth'].at(times).observe(kernel[body]).position.km.T
+        kernel_s = time.perf_counter() - start
+        error = np.max(np.linalg.norm(interpolated - direct, axis=1))
+        worst = max(worst, error)
+        print(f"{body:20s}: max error {error:10.2e} km   table {table_s * 1e3:6.2f} ms   kernel {kernel_s * 1e3:7.2f} ms")
+    print("OK" if worst <= TOLERANCE_KM else "FAIL")
+    sys.exit(0 if worst <= TOLERANCE_KM else 1)
+
+
+if __name__ == "__main__":
+    main()
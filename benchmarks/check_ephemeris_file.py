@@ -0,0 +1,76 @@
+"""
+Check .aeph angular ephemeris interpolation against direct SGP4 and time the writer and lookups.
+
+Writes one satellite's ephemeris with track.py's writer, then looks up a large array of random
+query times in the memory-mapped file and compares them with alt/az/range computed directly at
+those times. Exits non-zero if any lookup is off by more than --max-error arcseconds.
+
+Run from the repository root:
+    python benchmarks/check_ephemeris_file.py [--norad 25544] [--rate 1] [--start 2025-08-23T10:30:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+from skyfield.constants import DAY_S
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import find_satellite
+from ephemeris_file import AngularEphemeris
+from propagation import angular_ephemeris
+from track import write_ephemeris
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_ephemeris_file.py',
+                    description='Check and time angular ephemeris file lookups')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--norad", type=int, default=25544, help='NORAD catalog number')
+    parser.add_argument("--rate", type=float, default=1.0, help='Ephemeris samples per second')
+    parser.add_argument("--minutes", type=float, default=15.0, help='Ephemeris length')
+    parser.add_argument("--queries", type=int, default=100000, help='Random lookup times')
+    parser.add_argument("--max-error", type=float, default=0.5, help='Allowed error in arcseconds')
+    parser.add_argument("--start", type=str, default=None, help='ISO UTC start of the ephemeris, default now')
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellite = find_satellite(args.tle, args.norad, ts)
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    start_utc = (datetime.datetime.now(utc) if args.start is None else
+                 datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc))
+    stop_utc = start_utc + datetime.timedelta(minutes=args.minutes)
+    path = os.path.join(tempfile.mkdtemp(), 'check.aeph')
+
+    start = time.perf_counter()
+    count = write_ephemeris(satellite, observer, ts, start_utc, stop_utc, args.rate, binary_path=path)
+    print(f"write {count} samples at {args.rate:g} Hz ...... : {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+    ephemeris = AngularEphemeris(path)
+    queries = np.random.default_rng(0).uniform(ephemeris.start, ephemeris.stop, args.queries)
+    start = time.perf_counter()
+    alt, az, rng = ephemeris.interpolate(queries)
+    print(f"interpolate {args.queries} times ......... : {(time.perf_counter() - start) * 1e3:8.1f} ms")
+
+    base = ts.from_datetime(start_utc)
+    times = ts.tt_jd(base.whole, base.tt_fraction + (queries - ephemeris.start) / DAY_S)
+    true_alt, true_az, true_rng, _, _, _ = angular_ephemeris(satellite, observer, times)
+    alt_error = np.abs(alt - true_alt) * 3600
+    az_error = np.abs((az - true_az + 180.0) % 360.0 - 180.0) * np.cos(np.radians(true_alt)) * 3600
+    range_error = np.abs(rng - true_rng) * 1e3
+    print(f"max error: alt {np.nanmax(alt_error):.4f}\", az (on sky) {np.nanmax(az_error):.4f}\", "
+          f"range {np.nanmax(range_error):.2f} m")
+    os.remove(path)
+    failed = max(np.nanmax(alt_error), np.nanmax(az_error)) > args.max_error or np.isnan(alt).any()
+    print(f"FAIL: over {args.max_error:g}\"" if failed else f"OK: every lookup within {args.max_error:g}\"")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Check and time moving-observer trajectory windows on the bundled tle_cache.tle.
+
+Flies a synthetic aircraft track out of the default site (--speed m/s on a north-east heading
+at 10 km), writes it as an NMEA log and reads it back. A trajectory window is propagated from
+the track and from the fixed site, and the two are timed against each other. At a few window
+samples, every row is compared with alt/az computed from a fixed observer placed at the track's
+position at that sample. Every satellite that rises above the mask in an unscreened track window
+must also be in the screened one. Last, the NMEA sentences are replayed through a pty to
+NmeaReader. The window is centered on the catalog's median TLE epoch unless --start is given.
+Exits non-zero on any failure.
+
+Run from the repository root:
+    python benchmarks/check_moving_observer.py [--mask 10] [--start 2025-08-23T06:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import pty
+import sys
+import tempfile
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from observer_track import NmeaReader, ObserverTrack, read_track
+from propagation import angular_ephemeris, precompute_trajectories
+
+PLOT_RECT = (200, 0, 1720, 1080)
+SITE = (34.87405877829887, -120.44621926328121)
+TOLERANCE_ARCSEC = 0.5
+CHECKED_SAMPLES = (0, 60, 120, 180)
+
+
+def nmea_sentence(body):
+    checksum = 0
+    for char in body:
+        checksum ^= ord(char)
+    return f"${body}*{checksum:02X}\r\n"
+
+
+def nmea_log(track):
+    """GGA (and a leading RMC for the date) sentences for every fix of a track"""
+    sentences = []
+    for t, lat, lon, alt_m in zip(track.times, track.lat, (track.lon + 180.0) % 360.0 - 180.0, track.alt_m):
+        when = datetime.datetime.fromtimestamp(t, utc)
+        hms = when.strftime('%H%M%S') + f"{when.microsecond / 1e6:.2f}"[1:]
+        lat_text = f"{int(abs(lat)):02d}{(abs(lat) % 1) * 60:08.5f},{'N' if lat >= 0 else 'S'}"
+        lon_text = f"{int(abs(lon)):03d}{(abs(lon) % 1) * 60:08.5f},{'E' if lon >= 0 else 'W'}"
+        if not sentences:
+            sentences.append(nmea_sentence(f"GPRMC,{hms},A,{lat_text},{lon_text},486.0,45.0,{when:%d%m%y},,,A"))
+        # Height split into altitude above the geoid and the geoid separation, as receivers report it
+        sentences.append(nmea_sentence(f"GPGGA,{hms},{lat_text},{lon_text},1,12,0.8,{alt_m + 33.0:.1f},M,-33.0,M,,"))
+    return sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_moving_observer.py',
+                    description='Check and time trajectory windows for a moving observer')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--mask", type=float, default=10.0, help='Elevation mask for the visibility pre-filter')
+    parser.add_argument("--speed", type=float, default=250.0, help='Platform ground speed in m/s')
+    parser.add_argument("--start", type=str, default=None, help="ISO UTC center of the window, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    center = (median_epoch(satellites) if args.start is None else
+              datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc))
+    failures = 0
+
+    # 1 Hz fixes from 20 minutes before the center to 20 after, on a north-east great-circle-ish line
+    seconds = np.arange(-1200.0, 1201.0)
+    step_deg = np.degrees(args.speed / 6371000.0) * np.sqrt(0.5)
+    truth = ObserverTrack(center.timestamp() + seconds, SITE[0] + step_deg * seconds,
+                          SITE[1] + step_deg * seconds / np.cos(np.radians(SITE[0])), np.full(len(seconds), 10000.0))
+    path = os.path.join(tempfile.mkdtemp(), 'track.nmea')
+    sentences = nmea_log(truth)
+    with open(path, 'w') as f:
+        f.writelines(sentences)
+    start = time.perf_counter()
+    track = read_track(path)
+    read_ms = (time.perf_counter() - start) * 1e3
+    position_error = max(np.max(np.abs(track.lat - truth.lat)), np.max(np.abs(track.lon - truth.lon)))
+    ok = len(track) == len(truth) and position_error < 1e-6 and np.max(np.abs(track.alt_m - truth.alt_m)) < 0.05
+    failures += not ok
+    print(f"NMEA log: {len(track)} fixes read in {read_ms:.1f} ms, max position error "
+          f"{position_error * 3.6e6:.3f} mas{'' if ok else '  FAIL'}")
+
+    fixed = wgs84.latlon(*SITE, elevation_m=10000.0)
+    start = time.perf_counter()
+    precompute_trajectories(satellites, fixed, ts, *PLOT_RECT, start_utc=center, elevation_mask=args.mask)
+    fixed_s = time.perf_counter() - start
+    start = time.perf_counter()
+    store = precompute_trajectories(satellites, track, ts, *PLOT_RECT, start_utc=center, elevation_mask=args.mask)
+    moving_s = time.perf_counter() - start
+    print(f"window, mask {args.mask:g}: fixed site {fixed_s:6.2f} s, moving observer {moving_s:6.2f} s "
+          f"({moving_s / fixed_s:.0%}), {len(store)} rows")
+
+    # Each sample's alt/az against a fixed observer where the track is at that sample
+    rows = np.random.default_rng(0).choice(len(store), min(len(store), 300), replace=False)
+    worst = 0.0
+    for k in CHECKED_SAMPLES:
+        t = ts.tt_jd(store.times_tt[k:k + 1])
+        here = track.positions_at(t)
+        observer = wgs84.latlon(here.latitude.degrees[0], here.longitude.degrees[0], elevation_m=here.elevation.m[0])
+        for row in rows:
+            alt, az, _, _, _, _ = angular_ephemeris(satellites[store.indices[row]], observer, t)
+            if np.isnan(alt[0]):
+                continue
+            d_az = (store.az[row, k] - az[0] + 180.0) % 360.0 - 180.0
+            error = np.hypot(store.alt[row, k] - alt[0], d_az * np.cos(np.radians(alt[0]))) * 3600
+            worst = max(worst, error)
+    ok = worst < TOLERANCE_ARCSEC
+    failures += not ok
+    print(f"per-sample observer: max error {worst:.3f}\" over {len(rows)} rows x {len(CHECKED_SAMPLES)} samples"
+          f"{'' if ok else '  FAIL'}")
+
+    unscreened = precompute_trajectories(satellites, track, ts, *PLOT_RECT, start_utc=center)
+    visible = unscreened.indices[np.any(unscreened.alt > args.mask, axis=1)]
+    missing = np.setdiff1d(visible, store.indices)
+    failures += len(missing)
+    print(f"pre-filter: {len(visible)} satellites above the mask, {len(missing)} missing from the screened window"
+          f"{'' if not len(missing) else '  FAIL'}")
+
+    # Live: the same sentences through a pty, as from a receiver on a serial port
+    master, slave = pty.openpty()
+    reader = NmeaReader(os.ttyname(slave))
+    reader.start()
+    time.sleep(0.2)
+    for i in range(0, len(sentences), 50):
+        os.write(master, "".join(sentences[i:i + 50]).encode('ascii'))
+        time.sleep(0.005)
+    deadline = time.time() + 10
+    while len(reader.fixes) < len(track) and time.time() < deadline:
+        time.sleep(0.05)
+    live = reader.track()
+    ok = live is not None and live == track
+    failures += not ok
+    print(f"pty stream: {len(reader.fixes)} of {len(track)} fixes{'' if ok else '  FAIL'}")
+    os.close(master)
+    os.close(slave)
+    print("OK: moving observer matches" if failures == 0 else f"FAIL: {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
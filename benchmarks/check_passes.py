@@ -0,0 +1,92 @@
+"""
+Check find_passes against Skyfield's per-satellite find_events and time the pass table, cold
+and from the cache, on the bundled tle_cache.tle.
+
+Run from the repository root:
+    python benchmarks/check_passes.py [--sample N] [--start 2025-08-23T06:00:00]
+
+The 24 hours start at the catalog's median TLE epoch unless --start is given, so the elements
+are fresh however old the bundled file is.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from passes import load_passes, pass_window
+
+SITE = (34.87405877829887, -120.44621926328121, 120.0)
+TOLERANCE_S = 2.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_passes.py',
+                    description='Check and time the catalog-wide pass event table')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--sample", type=int, default=150, help='Satellites cross-checked with find_events')
+    parser.add_argument("--mask", type=float, default=10.0, help='Elevation mask in degrees')
+    parser.add_argument("--start", type=str, default=None,
+                        help="ISO UTC time the 24 hours start from, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    now_utc = median_epoch(satellites) if args.start is None else \
+        datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        passes, _ = load_passes(satellites, SITE, ts, now_utc=now_utc, elevation_mask=args.mask, cache_dir=cache_dir)
+        cold_s = time.perf_counter() - start
+        start = time.perf_counter()
+        _, cached = load_passes(satellites, SITE, ts, now_utc=now_utc, elevation_mask=args.mask, cache_dir=cache_dir)
+        warm_s = time.perf_counter() - start
+    print(f"Catalog: {len(satellites)} satellites, {len(passes)} passes above {args.mask} deg")
+    print(f"Cold (computed) ................ : {cold_s:8.2f} s")
+    print(f"Warm ({'cache hit' if cached else 'CACHE MISS'}) ............ : {warm_s:8.2f} s")
+
+    window_start, hours = pass_window(now_utc)
+    t0 = ts.utc(window_start)
+    t1 = ts.utc(window_start + datetime.timedelta(hours=hours))
+    observer = wgs84.latlon(*SITE[:2], elevation_m=SITE[2])
+    rng = np.random.default_rng(1)
+    worst_s = 0.0
+    failures = 0
+    events = 0
+    for i in rng.choice(len(satellites), min(args.sample, len(satellites)), replace=False):
+        sat = satellites[i]
+        mine = passes[passes['satnum'] == sat.model.satnum]
+        found = {0: mine['rise_tt'], 2: mine['set_tt']}
+        expected = {0: [], 2: []}
+        event_times, kinds = sat.find_events(observer, t0, t1, altitude_degrees=args.mask)
+        for t, kind in zip(event_times, kinds):
+            if kind in expected:
+                expected[kind].append(t.tt)
+        for kind, name in ((0, 'rise'), (2, 'set')):
+            ours = found[kind][~np.isnan(found[kind])]
+            if len(ours) != len(expected[kind]):
+                failures += 1
+                print(f"    {sat.name}: {len(ours)} {name}s, find_events has {len(expected[kind])}")
+                continue
+            for a, b in zip(np.sort(ours), expected[kind]):
+                error_s = abs(a - b) * 86400
+                events += 1
+                worst_s = max(worst_s, error_s)
+                if error_s > TOLERANCE_S:
+                    failures += 1
+                    print(f"    {sat.name}: {name} off by {error_s:.1f} s")
+    print(f"Cross-checked events ........... : {events}, worst {worst_s:.2f} s")
+    print("OK" if failures == 0 else f"FAIL: {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
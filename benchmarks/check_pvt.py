@@ -0,0 +1,108 @@
+"""
+Check PVT ephemeris ingestion and the TLE-difference analysis on the bundled tle_cache.tle.
+
+Writes OEM text files sampled from one satellite's own SGP4 trajectory, every --step seconds,
+in TEME, ITRF and EME2000. Each is read back (and round-tripped through the binary form) and
+compared with SGP4 on a dense grid, by Hermite and by Lagrange interpolation. The
+differences must vanish to within interpolation error. An ephemeris whose epochs are labelled
+--shift seconds early must show up as an in-track offset of speed * shift (in TEME and EME2000;
+Earth-fixed coordinates also carry the Earth's rotation). Exits non-zero on any failure.
+
+Run from the repository root:
+    python benchmarks/check_pvt.py [--norad 25544] [--start 2025-08-23T10:20:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+from skyfield.framelib import itrs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import find_satellite
+from propagation import WINDOW_SAMPLES, _sgp4_dates
+from pvt import load_pvt, pvt_difference, write_pvt
+
+PLOT_RECT = (200, 0, 1720, 1080)
+TOLERANCE_KM = 0.005
+TOLERANCE_ARCSEC = 1.0
+
+
+def write_oem(path, satellite, ts, start_utc, minutes, step_s, frame, shift_s=0.0):
+    """OEM text sampled from the satellite's SGP4 trajectory, epochs labelled shift_s early"""
+    offsets = np.arange(0.0, minutes * 60 + step_s / 2, step_s)
+    labels = [start_utc + datetime.timedelta(seconds=float(s)) for s in offsets]
+    times = ts.from_datetimes([label + datetime.timedelta(seconds=shift_s) for label in labels])
+    if frame == 'TEME':
+        _, r, v = satellite.model.sgp4_array(*_sgp4_dates(times))
+    else:
+        position = satellite.at(times)
+        if frame == 'ITRF':
+            r, v = position.frame_xyz_and_velocity(itrs)
+            r, v = r.km.T, v.km_per_s.T
+        else:
+            r, v = position.position.km.T, position.velocity.km_per_s.T
+    with open(path, 'w') as f:
+        f.write(f"CCSDS_OEM_VERS = 2.0\nMETA_START\nOBJECT_NAME = {satellite.name}\n"
+                f"OBJECT_ID = {satellite.model.satnum}\nCENTER_NAME = EARTH\nREF_FRAME = {frame}\n"
+                "TIME_SYSTEM = UTC\nMETA_STOP\n")
+        for label, rs, vs in zip(labels, r, v):
+            f.write(label.strftime('%Y-%m-%dT%H:%M:%S.%f') + ' ' + ' '.join(f'{x:.6f}' for x in (*rs, *vs)) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_pvt.py',
+                    description='Check PVT ephemeris interpolation and TLE differences against SGP4')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--norad", type=int, default=25544, help='NORAD catalog number')
+    parser.add_argument("--step", type=float, default=60.0, help='Ephemeris sample spacing in seconds')
+    parser.add_argument("--shift", type=float, default=1.0, help='Epoch mislabelling for the offset check, s')
+    parser.add_argument("--start", type=str, default=None, help='ISO UTC start of the ephemeris, default now')
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellite = find_satellite(args.tle, args.norad, ts)
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    start_utc = (datetime.datetime.now(utc) if args.start is None else
+                 datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc))
+    grid = ts.from_datetime(start_utc + datetime.timedelta(minutes=5))
+    grid = ts.tt_jd(grid.tt + np.linspace(0, 30 / 1440, WINDOW_SAMPLES))
+    speed = np.linalg.norm(satellite.model.sgp4_array(*_sgp4_dates(grid))[2], axis=1)
+    directory = tempfile.mkdtemp()
+
+    failures = 0
+    for frame in ('TEME', 'ITRF', 'EME2000'):
+        for shift in (0.0, args.shift):
+            path = os.path.join(directory, f'{frame}_{shift:g}.oem')
+            write_oem(path, satellite, ts, start_utc, 40, args.step, frame, shift)
+            start = time.perf_counter()
+            ephemeris = load_pvt(path, ts)
+            read_ms = (time.perf_counter() - start) * 1e3
+            write_pvt(path + '.pvt', ephemeris)
+            for source, loaded in (('oem', ephemeris), ('pvt', load_pvt(path + '.pvt'))):
+                for method in ('hermite', 'lagrange'):
+                    start = time.perf_counter()
+                    difference = pvt_difference(loaded, satellite, observer, grid, PLOT_RECT, method)
+                    diff_ms = (time.perf_counter() - start) * 1e3
+                    # Earth-fixed coordinates of a mislabelled epoch also carry the Earth's rotation
+                    expected = speed * shift if frame != 'ITRF' else np.abs(difference['along'])
+                    along_error = np.max(np.abs(np.abs(difference['along']) - expected))
+                    other = np.max(np.abs(np.concatenate([difference['radial'], difference['cross']])))
+                    ok = along_error < TOLERANCE_KM and (shift or (other < TOLERANCE_KM and
+                                                                   np.max(difference['angle']) < TOLERANCE_ARCSEC))
+                    failures += not ok
+                    print(f"{frame:8s} shift {shift:g} s {source} {method:8s}: along error {along_error * 1e3:7.2f} m, "
+                          f"radial/cross {other * 1e3:8.2f} m, max angle {np.max(difference['angle']):8.2f}\" "
+                          f"(read {read_ms:5.1f} ms, difference {diff_ms:5.1f} ms){'' if ok else '  FAIL'}")
+    print("OK: PVT differences match" if failures == 0 else f"FAIL: {failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
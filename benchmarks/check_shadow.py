@@ -0,0 +1,79 @@
+"""
+Check the batch shadow model against Skyfield's per-satellite is_sunlit() and time its overhead,
+on the bundled tle_cache.tle.
+
+is_sunlit() tests whether the Sun's centre is hidden by the Earth, which corresponds to an
+illumination fraction of one half in the conical model, so the two must agree on lit >= 0.5.
+Samples within TIE_MARGIN of one half (a fraction of a second of the terminator crossing, where the
+interpolated Sun table and Skyfield's own can land on either side) are counted but not compared.
+The 30 minute window is centered on the catalog's median TLE epoch unless --start is given.
+
+Run from the repository root:
+    python benchmarks/check_shadow.py [--sample N] [--ephemeris de421.bsp] [--start 2025-08-23T06:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from catalog import median_epoch
+from ephemeris import EphemerisService
+from propagation import CatalogPropagator, sun_teme
+
+TIE_MARGIN = 0.01
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_shadow.py',
+                    description='Check the conical shadow model against Skyfield is_sunlit')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--ephemeris", type=str, default="de421.bsp", help='Planetary ephemeris')
+    parser.add_argument("--sample", type=int, default=300, help='Satellites cross-checked with is_sunlit')
+    parser.add_argument("--start", type=str, default=None, help="ISO UTC center of the window, default the catalog's median TLE epoch")
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    ephemeris = EphemerisService(args.ephemeris, ts=ts)
+    observer = wgs84.latlon(34.87405877829887, -120.44621926328121, elevation_m=120.0)
+    center = ts.from_datetime(median_epoch(satellites) if args.start is None else
+                              datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc)).tt
+    times = ts.tt_jd(np.linspace(center - 900 / 86400, center + 900 / 86400, 900))
+    propagator = CatalogPropagator(satellites)
+
+    start = time.perf_counter()
+    propagator.altaz(observer, times)
+    plain_s = time.perf_counter() - start
+    start = time.perf_counter()
+    sun = sun_teme(ephemeris, times)
+    _, _, _, lit = propagator.altaz(observer, times, sun=sun)
+    shadow_s = time.perf_counter() - start
+    print(f"Catalog: {len(satellites)} satellites x {len(times.tt)} samples")
+    print(f"alt/az/range ................... : {plain_s:8.2f} s")
+    print(f"with Sun table + shadow ........ : {shadow_s:8.2f} s")
+    print(f"Umbra / penumbra / sunlit ...... : {np.mean(lit == 0):.1%} / {np.mean((lit > 0) & (lit < 1)):.1%}"
+          f" / {np.mean(lit == 1):.1%}")
+
+    rng = np.random.default_rng(0)
+    checked = mismatched = ties = 0
+    for i in rng.choice(len(satellites), min(args.sample, len(satellites)), replace=False):
+        sunlit = satellites[i].at(times).is_sunlit(ephemeris.kernel)
+        tie = np.abs(lit[i] - 0.5) < TIE_MARGIN
+        valid = ~np.isnan(lit[i]) & ~tie
+        ties += tie.sum()
+        checked += valid.sum()
+        mismatched += (sunlit != (lit[i] >= 0.5))[valid].sum()
+    print(f"Samples cross-checked .......... : {checked}, mismatched {mismatched}, {ties} ties at the terminator")
+    print("OK" if mismatched == 0 else "FAIL")
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Conservativeness check and timing for visibility_prefilter on the bundled tle_cache.tle.
+
+For several sites, windows and elevation masks, every satellite whose dense 900-sample
+propagation rises above the mask must survive the pre-filter. Exits non-zero if any visible
+satellite is dropped.
+
+Run from the repository root:
+    python benchmarks/check_visibility_prefilter.py [--windows N] [--start 2025-08-25T12:00:00]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+from propagation import CatalogPropagator, visibility_prefilter
+
+SITES = {
+    'Santa Maria': (34.87405877829887, -120.44621926328121, 120.0),
+    'Equator': (0.0, 30.0, 0.0),
+    'Fairbanks': (64.84, -147.72, 140.0),
+    'McMurdo': (-77.85, 166.67, 10.0),
+}
+MASKS = (0.0, 10.0, 30.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='check_visibility_prefilter.py',
+                    description='Check that the visibility pre-filter never drops a visible satellite')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--windows", type=int, default=2, help='30 minute windows per site, 5h apart')
+    parser.add_argument("--start", type=str, default=None,
+                        help='ISO UTC center of the first window, default now; use a date near the TLE epochs to '
+                             'exercise the inclination screen')
+    args = parser.parse_args()
+
+    ts = load.timescale()
+    satellites = load.tle_file(args.tle, ts=ts)
+    propagator = CatalogPropagator(satellites)
+    now = ts.now().tt if args.start is None else ts.from_datetime(
+        datetime.datetime.fromisoformat(args.start).replace(tzinfo=datetime.timezone.utc)).tt
+    failures = 0
+    for site, (lat, lon, alt_m) in SITES.items():
+        observer = wgs84.latlon(lat, lon, elevation_m=alt_m)
+        for w in range(args.windows):
+            center = now + w * 5 / 24
+            times = ts.tt_jd(np.linspace(center - 900 / 86400, center + 900 / 86400, 900))
+            alts, _, _ = propagator.altaz(observer, times)
+            peak = np.nanmax(np.where(np.isnan(alts), -90.0, alts), axis=1)
+            for mask in MASKS:
+                start = time.perf_counter()
+                keep = visibility_prefilter(satellites, observer, times, mask)
+                elapsed = time.perf_counter() - start
+                visible = peak > mask
+                dropped = np.flatnonzero(visible & ~keep)
+                failures += len(dropped)
+                print(f"{site:12s} window {w} mask {mask:4.1f}: visible {visible.sum():5d}  kept {keep.sum():5d}"
+                      f" of {len(satellites)}  dropped-visible {len(dropped)}  ({elapsed * 1e3:.0f} ms)")
+                for i in dropped:
+                    print(f"    DROPPED {satellites[i].model.satnum_str} {satellites[i].name} peak {peak[i]:.2f} deg")
+    print("OK: no visible satellite dropped" if failures == 0 else f"FAIL: {failures} visible satellites dropped")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Benchmark suite for the computational kernels, on the bundled tle_cache.tle, with results saved as
+JSON so commits can be compared.
+
+Kernels: TLE load (text parse, cold and warm sidecar), precompute_trajectories (unscreened and
+behind the elevation mask), main2.interpolate_positions over the catalog store, the name/altitude
+filter masks, MarkerIndex hit-testing, AUX command encoding and requests in auxstar.py and the
+post.py image kernels. A kernel that cannot run here (the image kernels without OpenCV, AUX
+requests that raise before reaching the device) is skipped, with the reason recorded.
+
+Each kernel is called often enough that one measurement takes at least --min-time, and --repeat
+measurements are taken; the best and median time per call are recorded. The window is centered
+on the catalog's median TLE epoch unless --start is given, as in the individual bench scripts, so
+runs over the same TLE file propagate the same window. With --compare, every kernel's best time is checked against a
+previous results file and the script exits non-zero if any is slower by more than --threshold.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py [--only interpolate,hit_test] [--compare benchmarks/results/abc1234.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import skyfield
+from skyfield.api import load, utc, wgs84
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cli'))
+import auxstar
+from catalog import SIDECAR_SUFFIX, load_catalog, median_epoch
+from hit_test import MarkerIndex
+from main2 import index_catalog, interpolate_positions
+from propagation import precompute_trajectories
+
+PLOT_RECT = (200, 0, 1720, 1080)
+SITE = (34.87405877829887, -120.44621926328121, 120.0)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+FRAME_SHAPE = (1040, 1548)  # Native camera frame, rows x columns
+RESIZED = (int(1548 / 2.5), int(1040 / 2.5))  # As post.py shows it
+
+
+class Skip(Exception):
+    """Raised by a kernel's setup when it cannot run here"""
+
+
+class LoopbackDevice:
+    """Serial stand-in that accepts any request and answers every read with a fixed position"""
+    def __init__(self):
+        self.written = 0
+
+    def write(self, request):
+        self.written += len(request)
+        return len(request)
+
+    def read(self, count):
+        return b'\x40\x00\x00#'[:count]
+
+    def close(self):
+        pass
+
+
+class Context:
+    """Inputs shared by the kernels, built on first use"""
+    def __init__(self, args):
+        self.args = args
+        self.ts = load.timescale()
+        self.satellites = load.tle_file(args.tle, ts=self.ts)[:args.satellites]
+        self.observer = wgs84.latlon(SITE[0], SITE[1], elevation_m=SITE[2])
+        self.center = (median_epoch(self.satellites) if args.start is None else
+                       datetime.datetime.fromisoformat(args.start).replace(tzinfo=utc))
+        self._store = None
+        self._markers = None
+
+    @property
+    def store(self):
+        """Unscreened trajectory store for the whole catalog"""
+        if self._store is None:
+            self._store = precompute_trajectories(self.satellites, self.observer, self.ts, *PLOT_RECT,
+                                                  start_utc=self.center)
+        return self._store
+
+    @property
+    def frame_tts(self):
+        """Off-grid frame times spread over the window"""
+        times_tt = self.store.times_tt
+        return times_tt[0] + np.random.default_rng(0).uniform(0, times_tt[-1] - times_tt[0], 20)
+
+    @property
+    def markers(self):
+        """Marker positions of the satellites above the horizon at the window center"""
+        if self._markers is None:
+            px, py, alt, _ = interpolate_positions(self.store, self.store.times_tt[len(self.store.times_tt) // 2])
+            visible = alt > 0
+            self._markers = list(self.store.indices[visible]), px[visible], py[visible]
+        return self._markers
+
+
+# Each kernel's setup takes the Context and returns (callable to time, params recorded with the result)
+
+def bench_tle_parse(ctx):
+    return lambda: load.tle_file(ctx.args.tle, ts=ctx.ts), {'satellites': 'all'}
+
+
+def _catalog_copy(ctx):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, os.path.basename(ctx.args.tle))
+    shutil.copyfile(ctx.args.tle, path)
+    return path
+
+
+def bench_catalog_cold(ctx):
+    path = _catalog_copy(ctx)
+
+    def cold():
+        if os.path.exists(path + SIDECAR_SUFFIX):
+            os.remove(path + SIDECAR_SUFFIX)
+        load_catalog(path, ctx.ts)
+    return cold, {'satellites': 'all'}
+
+
+def bench_catalog_warm(ctx):
+    path = _catalog_copy(ctx)
+    load_catalog(path, ctx.ts)
+    return lambda: load_catalog(path, ctx.ts), {'satellites': 'all'}
+
+
+def bench_precompute(ctx):
+    return (lambda: precompute_trajectories(ctx.satellites, ctx.observer, ctx.ts, *PLOT_RECT, start_utc=ctx.center),
+            {'satellites': len(ctx.satellites)})
+
+
+def bench_precompute_masked(ctx):
+    mask = ctx.args.mask
+    return (lambda: precompute_trajectories(ctx.satellites, ctx.observer, ctx.ts, *PLOT_RECT, start_utc=ctx.center,
+                                            elevation_mask=mask),
+            {'satellites': len(ctx.satellites), 'mask': mask})
+
+
+def bench_interpolate(ctx):
+    store, frame_tts = ctx.store, ctx.frame_tts
+
+    def frames():
+        for current_tt in frame_tts:
+            interpolate_positions(store, current_tt)
+    return frames, {'rows': len(store), 'frames': len(frame_tts)}
+
+
+def bench_filter_index(ctx):
+    return lambda: index_catalog(ctx.satellites), {'satellites': len(ctx.satellites)}
+
+
+def bench_filter_masks(ctx):
+    _, filter_index, _ = index_catalog(ctx.satellites)
+    typed = ['starlink'[:n] for n in range(1, 9)] + ['iss', 'noaa 1']
+    limits = ['5', '55', '550', '2000', '35786']
+
+    def typing():
+        # Emptied so every call searches, as the first keystrokes after a catalog load do
+        filter_index._name_masks.clear()
+        filter_index._altitude_masks.clear()
+        for text in typed:
+            filter_index.name_mask(text)
+        for text in limits:
+            filter_index.altitude_mask(text)
+    return typing, {'satellites': len(ctx.satellites), 'filters': len(typed) + len(limits)}
+
+
+def bench_hit_test(ctx):
+    items, xs, ys = ctx.markers
+    rng = np.random.default_rng(0)
+    sub_x, sub_y, sub_width, sub_height = PLOT_RECT
+    queries = list(zip(rng.uniform(sub_x, sub_x + sub_width, 1000).tolist(),
+                       rng.uniform(sub_y, sub_y + sub_height, 1000).tolist()))
+
+    def frame():
+        index = MarkerIndex(items, xs, ys)
+        for x, y in queries:
+            index.nearest(x, y)
+    return frame, {'markers': len(items), 'queries': len(queries)}
+
+
+def bench_aux_encode(ctx):
+    angles = np.random.default_rng(0).uniform(-0.5, 0.5, 1000).tolist()
+
+    def encode():
+        for fraction in angles:
+            packed = auxstar.pack_int3(fraction)
+            auxstar.unpack_int3(packed)
+            dd, mm, ss = auxstar.f2dms(fraction)
+            auxstar.dms2f(abs(dd), mm, ss, 1)
+            auxstar.checksum(b'\x07\x11\x02' + packed)
+    return encode, {'angles': len(angles)}
+
+
+def bench_aux_commands(ctx):
+    controller = auxstar.NexstarHandController(LoopbackDevice())
+    targets = (auxstar.Targets.ALT, auxstar.Targets.AZM)
+
+    def commands():
+        for _ in range(100):
+            for target in targets:
+                controller.hc_get_position(target)
+                controller.hc_slew_fixed(target, -4)
+                controller.hc_set_backlash(target, 20)
+                controller.hc_get_version(target)
+    return commands, {'requests': 100 * len(targets) * 4}
+
+
+def _aux_request(request):
+    """Kernel sending one AUX request to both axes 100 times; skipped if the request raises here"""
+    controller = auxstar.NexstarHandController(LoopbackDevice())
+    targets = (auxstar.Targets.ALT, auxstar.Targets.AZM)
+    try:
+        request(controller, targets[0])
+    except Exception as e:
+        raise Skip(f"auxstar.py raises before the request is answered: {type(e).__name__}: {e}")
+
+    def commands():
+        for _ in range(100):
+            for target in targets:
+                request(controller, target)
+    return commands, {'requests': 100 * len(targets)}
+
+
+def bench_aux_goto(ctx):
+    return _aux_request(lambda controller, target: controller.hc_goto_fast(target, 45, 30, 15))
+
+
+def bench_aux_set_position(ctx):
+    return _aux_request(lambda controller, target: controller.hc_set_position(target, 45, 30, 15))
+
+
+def bench_aux_guide_rate(ctx):
+    return _aux_request(lambda controller, target: controller.hc_set_guide_rate(target, 0, sidereal=True))
+
+
+def _image_kernels():
+    try:
+        import image_kernels
+    except ImportError as e:
+        raise Skip(f"image kernels need OpenCV: {e}")
+    return image_kernels
+
+
+def _frame():
+    """A noisy star field with a few round spots, resized the way post.py shows frames"""
+    import cv2 as cv
+    rng = np.random.default_rng(0)
+    frame = rng.normal(20, 6, FRAME_SHAPE).clip(0, 255).astype(np.uint8)
+    for y, x in rng.uniform((50, 50), (FRAME_SHAPE[0] - 50, FRAME_SHAPE[1] - 50), (25, 2)).astype(int):
+        cv.circle(frame, (int(x), int(y)), 12, 220, -1)
+    return cv.resize(frame, RESIZED)
+
+
+def bench_image_resize(ctx):
+    _image_kernels()
+    import cv2 as cv
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    return lambda: cv.resize(frame, RESIZED), {'shape': list(FRAME_SHAPE)}
+
+
+def bench_image_gamma(ctx):
+    kernels = _image_kernels()
+    frame = _frame()
+    return lambda: kernels.gamma_correction(frame, 0.1), {'shape': list(frame.shape)}
+
+
+def bench_image_linear(ctx):
+    kernels = _image_kernels()
+    frame = _frame()
+    return lambda: kernels.linear_transform(frame, 1.5, 10), {'shape': list(frame.shape)}
+
+
+def bench_image_spots(ctx):
+    kernels = _image_kernels()
+    frame = _frame()
+    return lambda: kernels.detect_spots(frame), {'shape': list(frame.shape)}
+
+
+BENCHMARKS = {
+    'tle_parse': bench_tle_parse,
+    'catalog_cold': bench_catalog_cold,
+    'catalog_warm': bench_catalog_warm,
+    'precompute': bench_precompute,
+    'precompute_masked': bench_precompute_masked,
+    'interpolate': bench_interpolate,
+    'filter_index': bench_filter_index,
+    'filter_masks': bench_filter_masks,
+    'hit_test': bench_hit_test,
+    'aux_encode': bench_aux_encode,
+    'aux_commands': bench_aux_commands,
+    'aux_goto': bench_aux_goto,
+    'aux_set_position': bench_aux_set_position,
+    'aux_guide_rate': bench_aux_guide_rate,
+    'image_resize': bench_image_resize,
+    'image_gamma': bench_image_gamma,
+    'image_linear': bench_image_linear,
+    'image_spots': bench_image_spots,
+}
+
+
+def measure(fn, repeat, min_time):
+    """Best and median seconds per call over repeat measurements of at least min_time each
+
+    Returns:
+        dict: best_s, median_s, number (calls per measurement) and repeat
+    """
+    start = time.perf_counter()
+    fn()  # Warm-up, and sizes the measurements
+    first = time.perf_counter() - start
+    number = max(1, int(np.ceil(min_time / max(first, 1e-9))))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'number': number, 'repeat': repeat}
+
+
+def metadata(args, ctx):
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+    def git(*command):
+        try:
+            return subprocess.run(['git', *command], cwd=root, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'date': datetime.datetime.now(utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'skyfield': skyfield.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'tle': os.path.basename(args.tle),
+        'satellites': len(ctx.satellites),
+        'window_center': ctx.center.isoformat(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print each kernel against the baseline; the number of regressions beyond threshold"""
+    print(f"Against {baseline['metadata'].get('commit')} ({baseline['metadata'].get('date')}), "
+          f"threshold +{threshold:.0%}:")
+    regressions = 0
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if 'skipped' in result or before is None or 'skipped' in before:
+            print(f"  {name:18s}: not compared")
+            continue
+        if before.get('params') != result.get('params'):
+            print(f"  {name:18s}: not compared, parameters differ ({before.get('params')} vs {result.get('params')})")
+            continue
+        ratio = result['best_s'] / before['best_s']
+        regressed = ratio > 1 + threshold
+        regressions += regressed
+        print(f"  {name:18s}: {before['best_s'] * 1e3:10.3f} -> {result['best_s'] * 1e3:10.3f} ms "
+              f"({ratio - 1:+.0%}){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+                    prog='run_benchmarks.py',
+                    description='Time the computational kernels and compare against a previous run')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help='TLE file to load')
+    parser.add_argument("--satellites", type=int, default=None, help='Only use the first N satellites')
+    parser.add_argument("--mask", type=float, default=10.0, help='Elevation mask for precompute_masked')
+    parser.add_argument("--start", type=str, default=None,
+                        help="ISO UTC center of the window, default the catalog's median TLE epoch")
+    parser.add_argument("--only", type=str, default=None, help='Comma-separated kernel names to run')
+    parser.add_argument("--repeat", type=int, default=5, help='Measurements per kernel')
+    parser.add_argument("--min-time", type=float, default=0.05, help='Minimum seconds per measurement')
+    parser.add_argument("--output", type=str, default=None,
+                        help='Results JSON, default benchmarks/results/<commit>.json; "-" to not save')
+    parser.add_argument("--compare", type=str, default=None, help='Previous results JSON to compare against')
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help='Fail when a kernel is slower than in --compare by more than this fraction')
+    args = parser.parse_args()
+
+    names = list(BENCHMARKS) if args.only is None else args.only.split(',')
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown kernels {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+
+    ctx = Context(args)
+    print(f"Catalog: {len(ctx.satellites)} satellites, window center {ctx.center.isoformat()}")
+    results = {}
+    for name in names:
+        try:
+            fn, params = BENCHMARKS[name](ctx)
+        except Skip as e:
+            results[name] = {'skipped': str(e)}
+            print(f"{name:18s}: skipped, {e}")
+            continue
+        result = measure(fn, args.repeat, args.min_time)
+        result['params'] = params
+        results[name] = result
+        print(f"{name:18s}: best {result['best_s'] * 1e3:10.3f} ms, median {result['median_s'] * 1e3:10.3f} ms "
+              f"({result['repeat']} x {result['number']})")
+
+    report = {'metadata': metadata(args, ctx), 'results': results}
+    if args.output != '-':
+        output = args.output or os.path.join(RESULTS_DIR, f"{report['metadata']['commit'] or 'unknown'}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print("OK: no regressions" if regressions == 0 else f"FAIL: {regressions} kernels regressed")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
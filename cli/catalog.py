@@ -0,0 +1,181 @@
+"""
+TLE catalog loading with a pre-parsed binary sidecar.
+
+The first load of a TLE file parses the text as usual and then writes ``<tle file>.bin``
+next to it. That sidecar is a fixed 64-byte header (magic, version, record count, SHA-256 of the
+TLE text) followed by one CATALOG_DTYPE record per satellite: the SGP4 mean elements, epoch,
+NORAD ID, name and international designator. Later loads memory-map the records and rebuild the
+satellites with sgp4init instead of re-parsing the text. The sidecar is rebuilt whenever the TLE
+text's hash or the sidecar version changes.
+
+A warm load is not free: sgp4init still runs for every record. On the bundled 12.5k-object
+catalog a warm load measured 60-130 ms on one CPU, against about 235 ms for load.tle_file;
+nearly all of it is the rebuild (benchmarks/bench_catalog.py).
+"""
+
+import datetime
+import hashlib
+import os
+import struct
+
+import numpy as np
+from skyfield.api import EarthSatellite, load
+
+from propagation import ELEMENT_DTYPE, pack_elements, unpack_elements
+
+SIDECAR_SUFFIX = '.bin'
+SIDECAR_MAGIC = b'HCSKYTLE'
+SIDECAR_VERSION = 2
+# magic, version, record count, SHA-256 of the TLE text; padded to 64 bytes
+SIDECAR_HEADER = struct.Struct('<8sIQ32s12x')
+
+CATALOG_DTYPE = np.dtype(ELEMENT_DTYPE.descr + [
+    ('epochyr', 'i4'),
+    ('epochdays', 'f8'),
+    ('name', 'S24'),
+    ('intldesg', 'S8'),  # International designator, e.g. 98067A
+])
+
+# EarthSatellite has no public constructor taking a model, a name and an epoch that is already
+# computed; its private _setup() (skyfield 1.x) fills in the rest. Without it, from_satrec() is used,
+# which derives every epoch on its own and makes a warm load slower than parsing the text (~350 ms).
+_EARTH_SATELLITE_SETUP = callable(getattr(EarthSatellite, '_setup', None))
+
+
+def tle_digest(tle_path):
+    """SHA-256 digest of a TLE file's contents"""
+    with open(tle_path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def load_catalog(tle_path, ts=None):
+    """Load a TLE file as EarthSatellite objects, via the binary sidecar when it is current
+
+    Args:
+        tle_path (str): TLE text file, e.g. tle_cache.tle
+        ts (skyfield.timelib.Timescale): Timescale for the satellite epochs
+
+    Returns:
+        list: EarthSatellite objects in file order
+    """
+    ts = ts or load.timescale()
+    digest = tle_digest(tle_path)
+    records = read_sidecar(tle_path + SIDECAR_SUFFIX, digest)
+    if records is not None:
+        return satellites_from_records(records, ts)
+    satellites = load.tle_file(tle_path, ts=ts)
+    try:
+        write_sidecar(tle_path + SIDECAR_SUFFIX, records_from_satellites(satellites), digest)
+    except OSError as e:
+        print(f"Debug: Could not write TLE sidecar: {e}")
+    return satellites
+
+
+def find_satellite(tle_path, satnum, ts=None):
+    """Load one satellite from a TLE file by NORAD ID
+
+    With a current sidecar only the matching record is rebuilt, not the whole catalog.
+
+    Args:
+        tle_path (str): TLE text file, e.g. tle_cache.tle
+        satnum (int): NORAD catalog number
+        ts (skyfield.timelib.Timescale): Timescale for the satellite epoch
+
+    Returns:
+        EarthSatellite: The satellite, or None if the file does not hold it
+    """
+    ts = ts or load.timescale()
+    records = read_sidecar(tle_path + SIDECAR_SUFFIX, tle_digest(tle_path))
+    if records is not None:
+        match = records[records['satnum'] == satnum]
+        return satellites_from_records(match[:1], ts)[0] if len(match) else None
+    for sat in load_catalog(tle_path, ts):
+        if sat.model.satnum == satnum:
+            return sat
+    return None
+
+
+def median_epoch(satellites):
+    """Median TLE epoch of a catalog as a UTC datetime, rounded to the second
+
+    A window there keeps most of the elements fresh, whatever the file's age.
+    """
+    epochs = np.array([getattr(sat, 'model', sat).jdsatepoch + getattr(sat, 'model', sat).jdsatepochF
+                       for sat in satellites])
+    seconds = round((np.median(epochs) - 2440587.5) * 86400.0)
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+
+
+def records_from_satellites(satellites):
+    """Pack EarthSatellite objects into a CATALOG_DTYPE array"""
+    records = np.zeros(len(satellites), dtype=CATALOG_DTYPE)
+    elements = pack_elements(satellites)
+    for name in ELEMENT_DTYPE.names:
+        records[name] = elements[name]
+    records['epochyr'] = [sat.model.epochyr for sat in satellites]
+    records['epochdays'] = [sat.model.epochdays for sat in satellites]
+    records['name'] = [(sat.name or '').encode('ascii', 'replace')[:24] for sat in satellites]
+    records['intldesg'] = [sat.model.intldesg.encode('ascii', 'replace')[:8] for sat in satellites]
+    return records
+
+
+def satellites_from_records(records, ts):
+    """Rebuild EarthSatellite objects from CATALOG_DTYPE records without parsing TLE text
+
+    Runs sgp4init once per record, which is most of a warm load's cost.
+    """
+    models = unpack_elements(records)
+    # TLE epochs are UTC with a two-digit year, as in EarthSatellite.__init__
+    years = np.where(records['epochyr'] < 57, records['epochyr'] + 2000, records['epochyr'] + 1900)
+    epochs = ts.utc(years, 1, records['epochdays'])
+    names = records['name'].tolist()
+    designators = records['intldesg'].tolist()
+    satellites = []
+    for i, model in enumerate(models):
+        model.intldesg = designators[i].decode('ascii')
+        if _EARTH_SATELLITE_SETUP:
+            sat = EarthSatellite.__new__(EarthSatellite)
+            sat.model = model
+            sat._setup(model)
+        else:
+            sat = EarthSatellite.from_satrec(model, ts)
+        sat.name = names[i].decode('ascii') or None
+        sat.epoch = epochs[i]
+        satellites.append(sat)
+    return satellites
+
+
+def write_sidecar(path, records, digest):
+    """Write records to a sidecar file, replacing any previous one atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SIDECAR_HEADER.pack(SIDECAR_MAGIC, SIDECAR_VERSION, len(records), digest))
+        f.write(np.ascontiguousarray(records, dtype=CATALOG_DTYPE).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_sidecar(path, digest=None):
+    """Memory-map a sidecar's records
+
+    Args:
+        path (str): Sidecar file
+        digest (bytes): Expected SHA-256 of the TLE text; None skips the check
+
+    Returns:
+        numpy.memmap: CATALOG_DTYPE records, or None if the sidecar is missing, stale or malformed
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(SIDECAR_HEADER.size)
+        magic, version, count, stored_digest = SIDECAR_HEADER.unpack(header)
+        if magic != SIDECAR_MAGIC or version != SIDECAR_VERSION:
+            return None
+        if digest is not None and stored_digest != digest:
+            return None
+        if os.path.getsize(path) != SIDECAR_HEADER.size + count * CATALOG_DTYPE.itemsize:
+            return None
+        if count == 0:
+            return np.zeros(0, dtype=CATALOG_DTYPE)
+        return np.memmap(path, dtype=CATALOG_DTYPE, mode='r', offset=SIDECAR_HEADER.size, shape=(count,))
+    except (OSError, struct.error):
+        return None
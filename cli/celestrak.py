@@ -0,0 +1,170 @@
+"""
+Incremental TLE cache refresh from Celestrak.
+
+Fetches go through one pooled requests.Session with retries and timeouts, and are conditional:
+the ETag and Last-Modified of the previous response are stored next to the cache in
+``<cache>.http.json`` and sent back as If-None-Match / If-Modified-Since, so an unchanged
+catalog costs a 304. A new download is merged into the cache object by object. An entry is
+replaced only when the download carries a newer epoch for that NORAD ID, new objects are
+appended, and objects missing from the download are kept.
+
+The URL is configurable, so the refresh can be exercised against a local stand-in that serves
+the bundled gp.php (benchmarks/check_celestrak.py checks it that way), e.g.:
+    python -m http.server 8000
+    python cli/celestrak.py --cache /tmp/tle_cache.tle --url http://localhost:8000/gp.php
+"""
+
+import argparse
+import json
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CELESTRAK_ACTIVE_URL = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle'
+HTTP_META_SUFFIX = '.http.json'
+DEFAULT_TIMEOUT = (5.0, 30.0)  # (connect, read) seconds
+
+_session = None
+
+
+def get_session():
+    """Shared HTTP session with connection pooling and retry/backoff on transient failures"""
+    global _session
+    if _session is None:
+        retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=2, pool_maxsize=2)
+        _session = requests.Session()
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+
+def parse_tle_entries(text):
+    """Split TLE text into (norad_id, epoch_key, lines) entries
+
+    Args:
+        text (str): Two- or three-line TLE text
+
+    Returns:
+        list: Tuples of NORAD ID string, sortable epoch key and the entry's lines (name line included)
+    """
+    entries = []
+    # Blank lines dropped: Windows-written caches end lines in \r\r\n
+    lines = [line for line in text.splitlines() if line.strip()]
+    i = 0
+    while i < len(lines) - 1:
+        line1, line2 = lines[i], lines[i + 1]
+        if line1.startswith('1 ') and line2.startswith('2 ') and len(line1) >= 69 and len(line2) >= 69:
+            name = lines[i - 1] if i > 0 and not lines[i - 1].startswith(('1 ', '2 ')) else None
+            entry_lines = ([name] if name is not None else []) + [line1, line2]
+            entries.append((line1[2:7], tle_epoch_key(line1), entry_lines))
+            i += 2
+        else:
+            i += 1
+    return entries
+
+
+def tle_epoch_key(line1):
+    """Sortable epoch (4-digit year * 1000 + day of year) from a TLE line 1"""
+    two_digit_year = int(line1[18:20])
+    year = two_digit_year + 2000 if two_digit_year < 57 else two_digit_year + 1900
+    return year * 1000 + float(line1[20:32])
+
+
+def merge_tle_text(cached_text, fetched_text):
+    """Merge a fresh download into the cached catalog, object by object
+
+    Args:
+        cached_text (str): Current cache contents ('' if there is none)
+        fetched_text (str): Newly downloaded TLE text
+
+    Returns:
+        tuple: (merged_text, replaced, added)
+    """
+    merged = {}
+    for norad_id, epoch, entry_lines in parse_tle_entries(cached_text):
+        if norad_id not in merged or epoch > merged[norad_id][0]:
+            merged[norad_id] = (epoch, entry_lines)
+    replaced = added = 0
+    for norad_id, epoch, entry_lines in parse_tle_entries(fetched_text):
+        if norad_id not in merged:
+            added += 1
+        elif epoch > merged[norad_id][0]:
+            replaced += 1
+        else:
+            continue
+        merged[norad_id] = (epoch, entry_lines)
+    text = '\n'.join(line for _, entry_lines in merged.values() for line in entry_lines) + '\n'
+    return text, replaced, added
+
+
+def refresh_tle_cache(cache_file, url=CELESTRAK_ACTIVE_URL, session=None, timeout=DEFAULT_TIMEOUT):
+    """Conditionally fetch the catalog and merge it into the cache file
+
+    Args:
+        cache_file (str): TLE cache to update in place
+        url (str): Catalog URL, Celestrak's active group by default
+        session (requests.Session): Session to use, defaults to the shared pooled one
+        timeout (tuple): (connect, read) timeouts in seconds
+
+    Returns:
+        str: Human readable outcome for the status area
+
+    Raises:
+        requests.RequestException: The fetch failed; the cache file is left untouched
+    """
+    session = session or get_session()
+    meta_file = cache_file + HTTP_META_SUFFIX
+    meta = {}
+    headers = {}
+    if os.path.exists(cache_file) and os.path.exists(meta_file):
+        try:
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get('url') == url:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        os.utime(cache_file)  # Restart the cache age clock
+        return "TLEs not modified on server"
+    response.raise_for_status()
+
+    if not parse_tle_entries(response.text):
+        raise requests.RequestException(f"No TLEs in response from {url}")
+    cached_text = ''
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r') as f:
+            cached_text = f.read()
+    merged_text, replaced, added = merge_tle_text(cached_text, response.text)
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        f.write(merged_text)
+    os.replace(tmp_file, cache_file)
+    with open(meta_file, 'w') as f:
+        json.dump({'url': url, 'etag': response.headers.get('ETag'),
+                   'last_modified': response.headers.get('Last-Modified')}, f)
+    return f"TLEs merged: {replaced} updated, {added} new"
+
+
+def main():
+    """Refresh a TLE cache from the command line"""
+    parser = argparse.ArgumentParser(
+                    prog='celestrak.py',
+                    description='Conditionally refresh and merge a TLE cache')
+    parser.add_argument("--cache", type=str, default="tle_cache.tle", help='TLE cache file to update')
+    parser.add_argument("--url", type=str, default=CELESTRAK_ACTIVE_URL, help='Catalog URL')
+    args = parser.parse_args()
+    print(refresh_tle_cache(args.cache, args.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Shared planetary ephemeris service.
+
+The JPL kernel is opened once per process (Skyfield's jplephem backend memory-maps the segment
+data, so only the pages actually used are ever read). Geocentric astrometric positions and
+velocities of the Sun, Moon and planets are tabulated every TABLE_STEP_S seconds over the active
+time window. Queries for any array of times are answered by cubic Hermite interpolation in that
+table, without going back to the kernel, until a query falls outside the window and the table
+is rebuilt around it.
+
+    service = get_ephemeris_service()
+    sun = service.positions('sun', times, frame=TEME)
+    alt, az, distance = service.altaz('mars', wgs84.latlon(34.87, -120.45), ts.now())
+"""
+
+import numpy as np
+from skyfield.api import load
+from skyfield.constants import DAY_S
+
+DEFAULT_EPHEMERIS = 'de421.bsp'
+DEFAULT_BODIES = ('sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter barycenter', 'saturn barycenter')
+TABLE_STEP_S = 600.0  # Hermite interpolation over 10 minutes is good to well under a metre for the Moon
+TABLE_MIN_SPAN_DAYS = 1.0  # Tables cover at least this much ahead of the first query that needs one
+
+_services = {}
+
+
+def get_ephemeris_service(path=DEFAULT_EPHEMERIS):
+    """Process-wide EphemerisService for a kernel, opened on first use"""
+    if path not in _services:
+        _services[path] = EphemerisService(path)
+    return _services[path]
+
+
+class EphemerisService:
+    """One open ephemeris kernel plus interpolation tables for the active window"""
+    def __init__(self, path=DEFAULT_EPHEMERIS, bodies=DEFAULT_BODIES, step_s=TABLE_STEP_S, ts=None):
+        """Open the kernel; tables are built lazily by the first query
+
+        Args:
+            path (str): JPL SPK kernel, downloaded by Skyfield if missing
+            bodies (tuple): Kernel target names to tabulate
+            step_s (float): Table spacing in seconds
+            ts (skyfield.timelib.Timescale): Timescale for the table grid
+        """
+        self.kernel = load(path)
+        self.ts = ts or load.timescale()
+        self.bodies = tuple(bodies)
+        self.step_days = step_s / DAY_S
+        self.grid = np.zeros(0)
+        self._tables = {}
+
+    def set_window(self, tt_start, tt_stop):
+        """Tabulate every body over [tt_start, tt_stop] (TT Julian dates), one step of margin each side"""
+        first = np.floor(tt_start / self.step_days) - 1
+        last = np.ceil(tt_stop / self.step_days) + 1
+        self.grid = np.arange(first, last + 1) * self.step_days
+        times = self.ts.tt_jd(self.grid)
+        earth = self.kernel['earth'].at(times)
+        for name in self.bodies:
+            astrometric = earth.observe(self.kernel[name])
+            self._tables[name] = (astrometric.position.km.T.copy(), astrometric.velocity.km_per_s.T * DAY_S)
+
+    def covers(self, tt):
+        return len(self.grid) > 1 and self.grid[0] <= np.min(tt) and np.max(tt) <= self.grid[-1]
+
+    def positions(self, body, times, frame=None):
+        """Geocentric astrometric position of a body at every time
+
+        Args:
+            body (str): One of the tabulated bodies, e.g. 'sun'
+            times (skyfield.timelib.Time): Scalar or array time
+            frame: Optional Skyfield frame, e.g. skyfield.sgp4lib.TEME; ICRF when None
+
+        Returns:
+            numpy.ndarray: (T, 3) positions in km, or (3,) for a scalar time
+        """
+        tt = np.atleast_1d(times.tt)
+        if not self.covers(tt):
+            self.set_window(np.min(tt), max(np.max(tt), np.min(tt) + TABLE_MIN_SPAN_DAYS))
+        position, velocity = self._tables[body]
+        k = np.clip(np.searchsorted(self.grid, tt, side='right') - 1, 0, len(self.grid) - 2)
+        h = self.grid[k + 1] - self.grid[k]
+        s = ((tt - self.grid[k]) / h)[:, None]
+        s2 = s * s
+        s3 = s2 * s
+        xyz = ((2 * s3 - 3 * s2 + 1) * position[k] + (s3 - 2 * s2 + s) * h[:, None] * velocity[k]
+               + (3 * s2 - 2 * s3) * position[k + 1] + (s3 - s2) * h[:, None] * velocity[k + 1])
+        if frame is not None:
+            rotation = frame.rotation_at(times)
+            xyz = np.einsum('ij...,...j->...i', rotation, xyz) if rotation.ndim == 3 else xyz @ rotation.T
+        return xyz if np.ndim(times.tt) else xyz[0]
+
+    def altaz(self, body, observer, times):
+        """Topocentric altitude, azimuth and distance of a body
+
+        Args:
+            body (str): One of the tabulated bodies
+            observer (skyfield.toposlib.GeographicPosition): Observer, e.g. from wgs84.latlon()
+            times (skyfield.timelib.Time): Scalar or array time
+
+        Returns:
+            tuple: (alt_deg, az_deg, distance_km), arrays for an array time
+        """
+        relative = self.positions(body, times) - observer.at(times).position.km.T
+        rotation = observer.rotation_at(times)  # GCRS -> (north, east, up)
+        if rotation.ndim == 3:
+            local = np.einsum('ij...,...j->...i', rotation, relative)
+        else:
+            local = relative @ rotation.T
+        north, east, up = local[..., 0], local[..., 1], local[..., 2]
+        horizontal = np.hypot(north, east)
+        alt = np.degrees(np.arctan2(up, horizontal))
+        az = np.degrees(np.arctan2(east, north)) % 360.0
+        return alt, az, np.sqrt(horizontal * horizontal + up * up)
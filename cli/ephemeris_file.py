@@ -0,0 +1,204 @@
+"""
+Memory-mappable angular ephemeris files (``.aeph``), written by track.py and read by the post tools.
+
+A file is a fixed 128-byte header followed by one contiguous column per quantity:
+
+    header   magic, version, NORAD ID, sample count, first sample time, cadence, site latitude,
+             longitude and altitude, TLE epoch, satellite name
+    time     float64 UTC seconds since 1970-01-01 (POSIX, no leap seconds)
+    alt, az, range, alt_rate, az_rate, range_rate
+             float32 degrees, km, deg/s and km/s
+
+Columns are memory-mapped separately, so a reader only pages in the columns, and the rows of
+them, that it touches. AngularEphemeris.interpolate() looks up a whole array of query times at once:
+with a fixed cadence the bracketing samples are found by arithmetic instead of a search, and
+alt/az/range between them come from cubic Hermite interpolation using the stored rates.
+"""
+
+import datetime
+import json
+import os
+import struct
+
+import numpy as np
+
+EPHEMERIS_SUFFIX = '.aeph'
+EPHEMERIS_MAGIC = b'HCSKYAEF'
+EPHEMERIS_VERSION = 1
+# magic, version, NORAD ID, count, start, step (0 = irregular), lat, lon, alt_m, TLE epoch, name; padded to 128 bytes
+EPHEMERIS_HEADER = struct.Struct('<8sIiQdddddd24s32x')
+ANGLE_COLUMNS = ('alt', 'az', 'range', 'alt_rate', 'az_rate', 'range_rate')
+COLUMN_DTYPES = (('time', np.float64),) + tuple((name, np.float32) for name in ANGLE_COLUMNS)
+
+
+class AngularEphemeris:
+    """One satellite's angular ephemeris over a site, memory-mapped from an .aeph file"""
+    def __init__(self, path, mode='r'):
+        """Map an existing file
+
+        Args:
+            path (str): .aeph file
+            mode (str): 'r', or 'r+' to fill the columns in place
+
+        Raises:
+            ValueError: If the file is not an angular ephemeris, or is truncated
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(EPHEMERIS_HEADER.size)
+        try:
+            (magic, version, self.satnum, self.count, self.start, self.step_s, lat, lon, alt_m,
+             tle_epoch, name) = EPHEMERIS_HEADER.unpack(header)
+        except struct.error:
+            raise ValueError(f"{path}: not an angular ephemeris file")
+        if magic != EPHEMERIS_MAGIC or version != EPHEMERIS_VERSION:
+            raise ValueError(f"{path}: not an angular ephemeris file (version {EPHEMERIS_VERSION})")
+        if os.path.getsize(path) != EPHEMERIS_HEADER.size + self.count * _row_size():
+            raise ValueError(f"{path}: truncated")
+        self.site = (lat, lon, alt_m)
+        self.tle_epoch = datetime.datetime.fromtimestamp(tle_epoch, datetime.timezone.utc)
+        self.name = name.rstrip(b'\0').decode('ascii', 'replace')
+        offset = EPHEMERIS_HEADER.size
+        self.columns = {}
+        for column, dtype in COLUMN_DTYPES:
+            self.columns[column] = (np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(self.count,))
+                                    if self.count else np.zeros(0, dtype=dtype))
+            offset += self.count * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create(cls, path, count, satnum, site, tle_epoch, start, step_s, name=''):
+        """Write a header and zero-filled columns, and map the file for filling in place
+
+        Args:
+            path (str): .aeph file to create, replacing any previous one
+            count (int): Number of samples
+            satnum (int): NORAD catalog number
+            site (tuple): Observer (lat_deg, lon_deg, alt_m)
+            tle_epoch (datetime.datetime): Epoch of the elements the ephemeris came from
+            start (float): First sample time, POSIX UTC seconds
+            step_s (float): Cadence in seconds, or 0 if the samples are not evenly spaced
+            name (str): Satellite name
+
+        Returns:
+            AngularEphemeris: Mapped with mode 'r+'
+        """
+        with open(path, 'wb') as f:
+            f.write(EPHEMERIS_HEADER.pack(EPHEMERIS_MAGIC, EPHEMERIS_VERSION, satnum, count, start, step_s,
+                                          *site, tle_epoch.timestamp(), (name or '').encode('ascii', 'replace')[:24]))
+            f.truncate(EPHEMERIS_HEADER.size + count * _row_size())
+        return cls(path, mode='r+')
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__['columns'][column]
+        except KeyError:
+            raise AttributeError(column)
+
+    @property
+    def stop(self):
+        """Last sample time, POSIX UTC seconds"""
+        return float(self.columns['time'][-1]) if self.count else self.start
+
+    def flush(self):
+        for column in self.columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
+
+    def interpolate(self, times):
+        """Alt/az/range at arbitrary times, by cubic Hermite interpolation between the samples
+
+        Args:
+            times (numpy.ndarray): POSIX UTC seconds, any shape
+
+        Returns:
+            tuple: (alt_deg, az_deg, range_km) shaped like times; NaN outside the file's span
+        """
+        t = np.asarray(times, dtype=float)
+        shape = t.shape
+        t = t.ravel()
+        if self.count < 2:
+            nan = np.full(shape, np.nan)
+            return nan, nan.copy(), nan.copy()
+        time = self.columns['time']
+        if self.step_s > 0:
+            k = np.floor((t - self.start) / self.step_s)
+            k = np.clip(np.nan_to_num(k, nan=0.0), 0, self.count - 2).astype(np.intp)
+            # Arithmetic can land one sample off a stored time; step to the right interval
+            k -= (t < time[k]) & (k > 0)
+            k += (t >= time[k + 1]) & (k < self.count - 2)
+        else:
+            k = np.clip(np.searchsorted(time, t, side='right') - 1, 0, self.count - 2)
+        t0 = time[k]
+        t1 = time[k + 1]
+        h = t1 - t0
+        s = (t - t0) / h
+        inside = (t >= time[0]) & (t <= time[-1])
+        # Hermite basis
+        s2 = s * s
+        s3 = s2 * s
+        h00 = 2 * s3 - 3 * s2 + 1
+        h10 = s3 - 2 * s2 + s
+        h01 = -2 * s3 + 3 * s2
+        h11 = s3 - s2
+
+        results = []
+        for column in ('alt', 'az', 'range'):
+            values = self.columns[column]
+            rates = self.columns[column + '_rate']
+            p0 = values[k].astype(float)
+            p1 = values[k + 1].astype(float)
+            if column == 'az':
+                p1 = p0 + (p1 - p0 + 180.0) % 360.0 - 180.0
+            secant = (p1 - p0) / h
+            # Rates are unbounded at the zenith (azimuth) or missing; fall back to the secant there
+            m0 = rates[k].astype(float)
+            m1 = rates[k + 1].astype(float)
+            m0 = np.where(np.isfinite(m0), m0, secant)
+            m1 = np.where(np.isfinite(m1), m1, secant)
+            value = h00 * p0 + h10 * h * m0 + h01 * p1 + h11 * h * m1
+            if column == 'az':
+                value %= 360.0
+            value[~inside] = np.nan
+            results.append(value.reshape(shape))
+        return tuple(results)
+
+
+def _row_size():
+    return sum(np.dtype(dtype).itemsize for _, dtype in COLUMN_DTYPES)
+
+
+def frame_times(paths):
+    """UTC capture time of each image, as POSIX seconds
+
+    Taken from the frame's .json sidecar (``<image>.json`` or ``<image stem>.json``) when it has
+    a "utc" ISO 8601 time or a numeric "time", else from the image file's modification time.
+
+    Args:
+        paths (list): Image file paths
+
+    Returns:
+        numpy.ndarray: One float64 time per path
+    """
+    times = np.empty(len(paths))
+    for i, path in enumerate(paths):
+        times[i] = os.path.getmtime(path)
+        for sidecar in (path + '.json', os.path.splitext(path)[0] + '.json'):
+            if not os.path.exists(sidecar):
+                continue
+            try:
+                with open(sidecar, 'r') as f:
+                    meta = json.load(f)
+                if 'utc' in meta:
+                    when = datetime.datetime.fromisoformat(str(meta['utc']).replace('Z', '+00:00'))
+                    if when.tzinfo is None:
+                        when = when.replace(tzinfo=datetime.timezone.utc)
+                    times[i] = when.timestamp()
+                elif 'time' in meta:
+                    times[i] = float(meta['time'])
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Debug: Error reading {sidecar}: {e}")
+            break
+    return times
@@ -0,0 +1,78 @@
+"""
+Catalog filter index for the tracking view's name and altitude boxes.
+
+Built once per catalog. Names are lowercased once into a NumPy string array, so a name filter is
+one vectorized substring search (numpy.char.find) instead of a Python loop. Mean altitudes are
+kept sorted, so "at or below N km" is one searchsorted. Both return boolean catalog masks,
+memoized per filter string: a frame whose filter text has not changed costs a dictionary lookup,
+and typing another character only searches the satellites the previous, shorter string matched.
+"""
+
+import numpy as np
+
+FILTER_CACHE_SIZE = 64  # Memoized masks per filter kind
+
+
+class CatalogFilterIndex:
+    """Name-substring and maximum-altitude masks over a satellite catalog"""
+    def __init__(self, names, mean_altitudes):
+        """Index the catalog
+
+        Args:
+            names (list): Satellite names in catalog order
+            mean_altitudes (numpy.ndarray): Mean altitude in km of each satellite, in catalog order
+        """
+        self._names = np.array([name.lower() for name in names], dtype=str)
+        self.size = len(self._names)
+        mean_altitudes = np.asarray(mean_altitudes, dtype=float)
+        self._altitude_order = np.argsort(mean_altitudes, kind='stable')
+        self._sorted_altitudes = mean_altitudes[self._altitude_order]
+        self._name_masks = {}
+        self._altitude_masks = {}
+
+    def name_mask(self, text):
+        """Catalog mask of satellites whose name contains text, ignoring case; all True for ''"""
+        needle = text.lower()
+        mask = self._name_masks.get(needle)
+        if mask is None:
+            mask = self._search(needle)
+            _remember(self._name_masks, needle, mask)
+        return mask
+
+    def _search(self, needle):
+        if not needle:
+            return np.ones(self.size, dtype=bool)
+        mask = np.zeros(self.size, dtype=bool)
+        # A longer filter can only match names the shorter one it extends matched
+        previous = self._name_masks.get(needle[:-1]) if len(needle) > 1 else None
+        if previous is not None:
+            candidates = np.flatnonzero(previous)
+            mask[candidates[np.char.find(self._names[candidates], needle) >= 0]] = True
+        else:
+            mask[np.char.find(self._names, needle) >= 0] = True
+        return mask
+
+    def altitude_mask(self, text):
+        """Catalog mask of satellites with mean altitude at or below the km value in text
+
+        Text that is not a plain non-negative number (e.g. an empty box) applies no limit, as before.
+        """
+        mask = self._altitude_masks.get(text)
+        if mask is None:
+            limit = float('inf')
+            if text.replace('.', '').isdigit():
+                try:
+                    limit = float(text)
+                except ValueError:  # e.g. "1.2.3"
+                    pass
+            # NaN altitudes sort last and never pass, matching the old `mean_altitude <= limit` test
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self._altitude_order[:np.searchsorted(self._sorted_altitudes, limit, side='right')]] = True
+            _remember(self._altitude_masks, text, mask)
+        return mask
+
+
+def _remember(cache, key, mask):
+    if len(cache) >= FILTER_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = mask
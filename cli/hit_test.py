@@ -0,0 +1,78 @@
+"""
+Uniform-grid spatial index over the satellite markers drawn on the polar plot.
+
+Hover and click handling used to scan every drawn marker with math.hypot on each mouse event.
+MarkerIndex buckets the markers' screen positions into square cells, sorted by cell key; a query
+then only measures the markers in the few cells around the cursor and returns the nearest one, so
+overlapping markers resolve to the one actually under the pointer. The index is handed the
+frame's position arrays every frame but only sorts them when the first query arrives, so frames
+without mouse events pay nothing.
+"""
+
+import math
+
+import numpy as np
+
+HIT_RADIUS_PX = 10.0  # Hover/click radius around a marker
+_KEY_OFFSET = 1 << 31  # Keeps negative cell rows positive in the packed int64 key
+
+
+class MarkerIndex:
+    """Nearest-marker queries over marker screen positions"""
+    def __init__(self, items, xs, ys, cell_size=HIT_RADIUS_PX):
+        """Index markers; the cells are built by the first query
+
+        Args:
+            items (list): What a hit returns for each marker, e.g. the satellite
+            xs, ys (numpy.ndarray): Screen position of each marker
+            cell_size (float): Cell edge in pixels; queries look at the cells a radius around the cursor touches
+        """
+        self.items = items
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.cell_size = float(cell_size)
+        self.keys = None
+
+    def _build(self):
+        keys = self._keys(np.floor(self.xs / self.cell_size), np.floor(self.ys / self.cell_size))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.xs = self.xs[self.order]
+        self.ys = self.ys[self.order]
+
+    def __len__(self):
+        return len(self.items)
+
+    @staticmethod
+    def _keys(cells_x, cells_y):
+        return cells_x.astype(np.int64) * (1 << 32) + (cells_y.astype(np.int64) + _KEY_OFFSET)
+
+    def nearest(self, x, y, radius=HIT_RADIUS_PX):
+        """The item whose marker is closest to (x, y), if any is strictly within radius
+
+        Args:
+            x, y (float): Query point, e.g. the mouse position
+            radius (float): Hit radius in pixels
+
+        Returns:
+            The matching entry of items, or None
+        """
+        if not self.items:
+            return None
+        if self.keys is None:
+            self._build()
+        first_x, last_x = math.floor((x - radius) / self.cell_size), math.floor((x + radius) / self.cell_size)
+        first_y, last_y = math.floor((y - radius) / self.cell_size), math.floor((y + radius) / self.cell_size)
+        cells_x, cells_y = np.meshgrid(np.arange(first_x, last_x + 1), np.arange(first_y, last_y + 1))
+        cells = self._keys(cells_x.ravel(), cells_y.ravel())
+        starts = np.searchsorted(self.keys, cells, side='left').tolist()
+        stops = np.searchsorted(self.keys, cells, side='right').tolist()
+        candidates = [np.arange(start, stop) for start, stop in zip(starts, stops) if stop > start]
+        if not candidates:
+            return None
+        candidates = np.concatenate(candidates)
+        distances = np.hypot(self.xs[candidates] - x, self.ys[candidates] - y)
+        best = int(np.argmin(distances))
+        if distances[best] >= radius:
+            return None
+        return self.items[int(self.order[candidates[best]])]
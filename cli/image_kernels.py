@@ -0,0 +1,61 @@
+"""
+Per-frame image kernels used by post.py, importable without post.py's argument parsing and windows.
+
+Each takes a grayscale uint8 frame and returns a new image (or detections); the trackbar state
+post.py keeps in module globals is passed in explicitly.
+"""
+
+import numpy as np
+import cv2 as cv
+
+
+def linear_transform(img_original, alpha, beta):
+    """Brightness/contrast adjustment, shown beside the original
+
+    Args:
+        img_original (numpy.ndarray): Grayscale frame
+        alpha (float): Contrast gain
+        beta (float): Brightness offset
+
+    Returns:
+        numpy.ndarray: Original and adjusted frames side by side
+    """
+    res = cv.convertScaleAbs(img_original, alpha=alpha, beta=beta)
+    return cv.hconcat([img_original, res])
+
+
+def gamma_table(gamma):
+    """256-entry uint8 lookup table for a gamma curve"""
+    return np.clip(np.power(np.arange(256) / 255.0, gamma) * 255.0, 0, 255).astype(np.uint8).reshape(1, 256)
+
+
+def gamma_correction(img_original, gamma):
+    """Gamma correction through a lookup table, shown beside the original
+
+    Args:
+        img_original (numpy.ndarray): Grayscale frame
+        gamma (float): Gamma exponent
+
+    Returns:
+        numpy.ndarray: Original and corrected frames side by side
+    """
+    res = cv.LUT(img_original, gamma_table(gamma))
+    return cv.hconcat([img_original, res])
+
+
+def detect_spots(img):
+    """Round spots (satellites, stars) by Hough circle transform
+
+    12 = inverse ratio of accumulator resolution to image res. 1.5 is standard. 12 is quite big and
+    filters out star streaks well. 70 = min distance between detections, which weeds out extraneous
+    detections. param1 = 300 = gradient threshold for canny edge. param2 = 0.85 = circle perfectness
+    measure/filter. minRadius/maxRadius depend on the instantaneous field of view; 2/8 works well
+    for a 50mm guide scope.
+
+    Returns:
+        numpy.ndarray: (x, y, radius) rows, uint16, or None when nothing is found
+    """
+    circles = cv.HoughCircles(img, cv.HOUGH_GRADIENT, 12, 70, param1=300, param2=0.85, minRadius=2, maxRadius=8)
+    if circles is None:
+        return None
+    return np.uint16(np.around(circles))[0]
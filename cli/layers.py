@@ -0,0 +1,181 @@
+"""
+Cached static layers for the main window.
+
+The sky-plot grid (horizon, elevation rings, azimuth spokes and their labels), the orbit legend
+and the config page background never change from one frame to the next, yet main2.py used to
+redraw them with a few hundred pygame.draw calls every frame. LayerCache renders each of them
+once to an off-screen surface and hands the surface back until the state it was drawn from (its
+key: plot size, elevation mask, ...) changes, so a frame costs one blit per static layer.
+Dynamic content (satellite markers, arcs, text fields, the clock) is drawn on top each frame.
+
+Satellite labels are rendered by LabelCache the first time a satellite is drawn and kept in a
+bounded LRU, rather than pre-rendered for the whole catalog at startup.
+"""
+
+import math
+from collections import OrderedDict
+
+import pygame
+
+LEGEND_SIZE = (150, 140)
+LABEL_CACHE_SIZE = 4096  # Label surfaces kept; above the most satellites ever above the horizon at once
+
+
+class LayerCache:
+    """Off-screen surfaces for static layers, re-rendered only when their key changes"""
+    def __init__(self):
+        self._layers = {}
+
+    def get(self, name, key, render):
+        """Surface for a layer, calling render() only if the layer is missing or its key changed
+
+        Args:
+            name (str): Layer name
+            key: Hashable description of everything the layer's pixels depend on
+            render (callable): Returns a freshly drawn pygame.Surface
+
+        Returns:
+            pygame.Surface: The cached layer
+        """
+        cached = self._layers.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, render())
+            self._layers[name] = cached
+        return cached[1]
+
+
+class LabelCache:
+    """"NORAD ID - name" label surfaces, rendered on first use and evicted least recently used first"""
+    def __init__(self, font, capacity=LABEL_CACHE_SIZE, color=(255, 255, 255)):
+        self.font = font
+        self.capacity = capacity
+        self.color = color
+        self._labels = OrderedDict()
+
+    def __len__(self):
+        return len(self._labels)
+
+    def get(self, sat):
+        """Label surface for a satellite
+
+        Args:
+            sat (skyfield.sgp4lib.EarthSatellite): Satellite to label
+
+        Returns:
+            pygame.Surface: The rendered label
+        """
+        label = self._labels.get(sat)
+        if label is None:
+            label = self.font.render(f"{sat.model.satnum_str} - {sat.name.strip()}", True, self.color)
+            self._labels[sat] = label
+            if len(self._labels) > self.capacity:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(sat)
+        return label
+
+
+def render_sky_grid(size, elevation_mask, small_font):
+    """Black polar plot with horizon, mask circle, elevation rings and azimuth spokes
+
+    Args:
+        size (tuple): (width, height) of the plot area
+        elevation_mask (float): Elevation of the red mask circle in degrees
+        small_font (pygame.font.Font): Font for the ring and cardinal labels
+
+    Returns:
+        pygame.Surface: Plot-area sized layer, blitted at the plot's top-left corner
+    """
+    width, height = size
+    surface = pygame.Surface(size).convert()
+    surface.fill((0, 0, 0))
+    cx = width // 2
+    cy = height // 2
+    radius = min(width, height) // 2 - 50
+    # Draw horizon circle
+    pygame.draw.circle(surface, (255, 255, 255), (cx, cy), radius, 1)
+    # Draw elevation mask circle
+    mask_radius = (90 - elevation_mask) / 90 * radius
+    pygame.draw.circle(surface, (255, 0, 0), (cx, cy), mask_radius, 2)
+    # Draw elevation circles
+    for el in [30, 60]:
+        r = (90 - el) / 90 * radius
+        pygame.draw.circle(surface, (100, 100, 100), (cx, cy), int(r), 1)
+        el_label = small_font.render(f"{el}°", True, (255, 255, 255))
+        surface.blit(el_label, (cx + r + 5, cy - 5))
+    # Draw azimuth lines and labels
+    for az_deg in range(0, 360, 30):
+        az_rad = math.radians(az_deg)
+        x1 = cx + radius * math.sin(az_rad)
+        y1 = cy - radius * math.cos(az_rad)
+        pygame.draw.line(surface, (100, 100, 100), (cx, cy), (x1, y1), 1)
+        if az_deg % 90 == 0:
+            direction = {0: "N", 90: "E", 180: "S", 270: "W"}[az_deg]
+            direction_label = small_font.render(direction, True, (255, 255, 255))
+            # Ensure all cardinal directions are outside the circle with 10-pixel clearance
+            if az_deg == 0:  # North
+                surface.blit(direction_label, (cx - direction_label.get_width() // 2, cy - radius - 10))
+            elif az_deg == 90:  # East
+                surface.blit(direction_label, (cx + radius + 10, cy - direction_label.get_height() // 2))
+            elif az_deg == 180:  # South
+                surface.blit(direction_label, (cx - direction_label.get_width() // 2, cy + radius + 10))
+            elif az_deg == 270:  # West
+                surface.blit(direction_label, (cx - radius - 10 - direction_label.get_width(),
+                                               cy - direction_label.get_height() // 2))
+    return surface
+
+
+def render_legend(small_font, altitude_color, draw_hexagon, draw_triangle):
+    """Orbit legend: LEO altitude heat bar, MEO hexagon and GEO triangle
+
+    Args:
+        small_font (pygame.font.Font): Label font
+        altitude_color (callable): Maps a LEO altitude in km to its marker color
+        draw_hexagon, draw_triangle (callable): Marker shape painters from main2.py
+
+    Returns:
+        pygame.Surface: LEGEND_SIZE layer, blitted at the legend's top-left corner. The "1000 km" label
+                        overhangs the panel onto the plot, so main2.py draws it on top.
+    """
+    surface = pygame.Surface(LEGEND_SIZE).convert()
+    pygame.draw.rect(surface, (50, 50, 50), (0, 0, 150, 140))  # Larger legend
+    pygame.draw.line(surface, (255, 255, 255), (0, 20), (150, 20), 1)  # Title line
+    surface.blit(small_font.render("Orbit Legend", True, (255, 255, 255)), (5, 5))
+    # LEO heatmap
+    for i in range(150):
+        alt = i / 150 * 1000  # Scale from 0 to 1000 km
+        color = altitude_color(alt) or (0, 255, 0)
+        pygame.draw.line(surface, color, (i, 40), (i, 60))
+    surface.blit(small_font.render("0 km", True, (255, 255, 255)), (0, 70))
+    # MEO hexagon
+    draw_hexagon(surface, 20, 90, (255, 165, 0))  # Orange
+    surface.blit(small_font.render("MEO (Orange)", True, (255, 255, 255)), (40, 85))
+    # GEO triangle with line break
+    draw_triangle(surface, 20, 110, (128, 0, 128))  # Purple
+    surface.blit(small_font.render("GEO (Purple)", True, (255, 255, 255)), (40, 105))
+    return surface
+
+
+def render_config_background(size, font):
+    """Config page gradient from (160, 160, 160) to (155, 155, 155) with the observer group box
+
+    Args:
+        size (tuple): (width, height) of the page area
+        font (pygame.font.Font): Label font
+
+    Returns:
+        pygame.Surface: Page-area sized layer, blitted at the page's top-left corner
+    """
+    width, height = size
+    surface = pygame.Surface(size).convert()
+    for y in range(height):
+        shade = 160 - (y / height * 5)
+        pygame.draw.line(surface, (shade, shade, shade), (0, y), (width, y))
+    # Draw grouping box and label
+    pygame.draw.rect(surface, (0, 0, 0), pygame.Rect(10, 0, 220, 370), 2, border_radius=5)  # Sleek black box with rounded edges
+    surface.blit(font.render("Observer Location", True, (0, 0, 0)), (20, 10))
+    for text, y in (("Latitude:", 30), ("Longitude:", 120), ("Altitude (m):", 210), ("Elevation Mask (deg):", 300)):
+        surface.blit(font.render(text, True, (0, 0, 0)), (20, y))
+    # Divider above the save/load buttons
+    pygame.draw.line(surface, (0, 0, 0), (0, height - 60), (width, height - 60), 1)
+    return surface
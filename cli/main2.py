@@ -1,15 +1,18 @@
+import time
+LAUNCH_TIME = time.perf_counter()  # Origin of the --profile-startup breakdown
+import argparse
 import pygame
 import os
-import sys
-import webbrowser
 import math
-from skyfield.api import load, wgs84, EarthSatellite, utc
-import time
-import requests
 import json
-from tkinter import filedialog, Tk
 import datetime
-import numpy as np
+import numpy as np  # Already imported by pygame.surfarray, so deferring it saves nothing
+from filters import CatalogFilterIndex
+from hit_test import MarkerIndex
+from layers import LabelCache, LayerCache, render_config_background, render_legend, render_sky_grid
+from startup import CatalogLoader, StartupProfile
+# skyfield, sgp4, requests, tkinter and the trajectory worker are imported on first use: the catalog
+# loader thread pulls in the first four while the menu is already interactive
 
 # Button drawing function
 def draw_button(surface, rect, text, state):
@@ -84,66 +87,114 @@ def draw_triangle(surface, x, y, color, size=3):
     ]
     pygame.draw.polygon(surface, color, points)
 
-def precompute_trajectories(satellites, observer, ts, sub_x, sub_y, sub_width, sub_height):
-    current_utc = datetime.datetime.now(utc)
-    t0 = ts.utc(current_utc - datetime.timedelta(minutes=15))
-    t1 = ts.utc(current_utc + datetime.timedelta(minutes=15))
-    times = ts.linspace(t0, t1, 900)  # 1-second intervals over 30 minutes
-    trajectories = {}
-    arc_segments = {}
-    cx = sub_x + sub_width // 2
-    cy = sub_y + sub_height // 2
-    radius = min(sub_width, sub_height) // 2 - 50
-    for sat in satellites:
-        if sat in satellite_labels:
-            difference = sat - observer
-            topocentrics = difference.at(times)
-            alts, azs, distances = topocentrics.altaz()
-            # Precompute pixel coordinates and trajectory
-            trajectory = [(t, alt, az, dist,
-                          cx + ((90 - alt) / 90 * radius) * math.sin(math.radians(az % 360)),
-                          cy - ((90 - alt) / 90 * radius) * math.cos(math.radians(az % 360)))
-                          for t, alt, az, dist in zip(times.tt, alts.degrees, azs.degrees, distances.km)]
-            trajectories[sat] = trajectory
-            # Precompute time array
-            times_array = np.array([t for t, _, _, _, _, _ in trajectory])
-            trajectories[sat] = (trajectory, times_array)
-            # Precompute arc segments with colors
-            segments = []
-            for i in range(len(trajectory) - 1):
-                t0, alt0, az0, dist0, x0, y0 = trajectory[i]
-                t1, alt1, az1, dist1, x1, y1 = trajectory[i + 1]
-                if alt0 > 0 or alt1 > 0:
-                    color = (128, 128, 128)  # Grey for past
-                    if t0 > times.tt[0]:  # Future if after start time
-                        color = (255, 0, 0)  # Red for future
-                        # Simplified sunlit check (precompute based on time order)
-                        if i > 0 and trajectory[i-1][0] <= times.tt[0] <= t0:
-                            sat_pos = sat.at(ts.tt_jd(t0))
-                            sun_pos = load('de421.bsp')['sun'].at(ts.tt_jd(t0))
-                            sat_vec = sat_pos.position.km
-                            sun_vec = sun_pos.position.km
-                            dot_product = np.dot(sat_vec, sun_vec)
-                            mag_sat = np.linalg.norm(sat_vec)
-                            mag_sun = np.linalg.norm(sun_vec)
-                            cos_angle = dot_product / (mag_sat * mag_sun)
-                            angle_deg = math.degrees(math.acos(np.clip(cos_angle, -1.0, 1.0)))
-                            if angle_deg < 90:
-                                color = (255, 255, 0)  # Yellow for sunlit
-                    segments.append((x0, y0, x1, y1, color))
-            arc_segments[sat] = segments
-    return trajectories, arc_segments
-
-def interpolate_position(trajectory_data, current_tt):
-    if not trajectory_data[0]:  # Check if trajectory is empty
-        return None, None, None
-    trajectory, times_array = trajectory_data
-    # Use precomputed time array for nearest index lookup
-    nearest_idx = np.argmin(np.abs(times_array - current_tt))
-    # Return the precomputed pixel coordinates and altitude of the nearest point
-    return trajectory[nearest_idx][4], trajectory[nearest_idx][5], trajectory[nearest_idx][1]  # Return px, py, alt
+def compute_arc_segments(store, row):
+    """Build colored (x0, y0, x1, y1, color) arc segments for one row of a TrajectoryStore"""
+    alts = store.alt[row]
+    lit = store.lit[row].tolist()
+    xs = store.px[row].tolist()
+    ys = store.py[row].tolist()
+    # Segment i is drawn if either endpoint is above the horizon
+    drawn = (alts[:-1] > 0) | (alts[1:] > 0)
+    segments = []
+    for i in np.flatnonzero(drawn).tolist():
+        color = (128, 128, 128)  # Grey for past
+        if i > 0:  # Future if after start time
+            color = (255, 0, 0)  # Red for future
+            if lit[i] >= 0.5:  # Precomputed shadow model: most of the solar disk visible
+                color = (255, 255, 0)  # Yellow for sunlit
+        segments.append((xs[i], ys[i], xs[i + 1], ys[i + 1], color))
+    return segments
+
+def compute_difference_segments(difference):
+    """Build (x0, y0, x1, y1) segments of a PVT ephemeris arc from pvt.pvt_difference() records"""
+    alts = difference['alt']
+    xs = difference['px'].tolist()
+    ys = difference['py'].tolist()
+    # Drawn where either endpoint is above the horizon and both lie inside the ephemeris's span
+    drawn = ((alts[:-1] > 0) | (alts[1:] > 0)) & ~np.isnan(alts[:-1]) & ~np.isnan(alts[1:])
+    return [(xs[i], ys[i], xs[i + 1], ys[i + 1]) for i in np.flatnonzero(drawn).tolist()]
+
+def observer_sites(config, lat_str, lon_str, alt_str, track=None):
+    """(name, observer) of every site the tracking view can switch between
+
+    observer is (lat, lon, alt_m) for a fixed site, or an observer_track.ObserverTrack. The first
+    site is the moving platform's track when there is one, else the site being edited in Config
+    Options; config.json's "sites" list, of {"name", "lat", "lon", "alt"} objects, adds the rest.
+    """
+    if track is not None:
+        sites = [(track.name or "Track", track)]
+    else:
+        sites = [(config.get("site_name", "Home"), (float(lat_str), float(lon_str), float(alt_str)))]
+    for i, site in enumerate(config.get("sites", [])):
+        sites.append((site.get("name", f"Site {i + 2}"),
+                      (float(site["lat"]), float(site["lon"]), float(site.get("alt", 0.0)))))
+    return sites
+
+def interpolate_positions(store, current_tt):
+    """Pixel position, altitude and naked-eye flag of every store row at current_tt, linearly interpolated
+
+    The time grid is uniform, so the bracketing samples come from index arithmetic rather than a
+    search, and every row is evaluated in the same few array operations. Times outside the window
+    clamp to its first or last sample.
+
+    Returns:
+        tuple: (px, py, alt, eye) arrays with one entry per store row
+    """
+    times_array = store.times_tt
+    count = len(times_array)
+    if count == 1:
+        return store.px[:, 0], store.py[:, 0], store.alt[:, 0], store.eye[:, 0]
+    position = (current_tt - times_array.item(0)) / (times_array.item(-1) - times_array.item(0)) * (count - 1)
+    position = min(max(float(position), 0.0), count - 1.0)
+    i = min(int(position), count - 2)
+    frac = position - i
+    before = store.data[:, :, i]
+    after = store.data[:, :, i + 1]
+    alt, px, py = (before[column] + (after[column] - before[column]) * frac for column in (0, 3, 4))
+    eye = before[6] if frac < 0.5 else after[6]
+    return px, py, alt, eye
+
+def index_catalog(satellites):
+    """Per-catalog lookups for the tracking view, built on the catalog loader thread
+
+    Args:
+        satellites (list): Catalog-ordered satellites
+
+    Returns:
+        tuple: (satellite_mean_altitudes dict, CatalogFilterIndex, satellite_index dict)
+    """
+    # Pre-compute mean altitudes for the whole catalog in one array pass
+    MU = 3.986004418e14  # Earth's gravitational parameter in m^3/s^2
+    R_EARTH = 6371  # Earth radius in km
+    # Mean motion in rad/s (convert from rad/min)
+    n = np.array([sat.model.no_kozai for sat in satellites], dtype=float) / 60
+    e = np.array([sat.model.ecco for sat in satellites], dtype=float)  # Eccentricity
+    a = (MU / (n**2))**(1/3) / 1000  # Semi-major axis in km
+    perigee = a * (1 - e) - R_EARTH  # Perigee altitude in km
+    apogee = a * (1 + e) - R_EARTH  # Apogee altitude in km
+    # Catalog-ordered arrays for the per-frame filters
+    mean_altitude_array = (perigee + apogee) / 2
+    satellite_mean_altitudes = dict(zip(satellites, mean_altitude_array.tolist()))
+    filter_index = CatalogFilterIndex([sat.name for sat in satellites], mean_altitude_array)
+    satellite_index = {sat: i for i, sat in enumerate(satellites)}
+    return satellite_mean_altitudes, filter_index, satellite_index
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+                    prog='main2.py',
+                    description='Satellite tracking and sensor control UI')
+    parser.add_argument("--profile-startup", action="store_true",
+                        help='Print how long each startup phase took once the catalog is loaded')
+    parser.add_argument("--pvt", type=str, default=None,
+                        help='PVT ephemeris (OEM text or pvt.py binary) drawn against its satellite\'s TLE')
+    parser.add_argument("--track", type=str, default=None,
+                        help='Observer track for a moving platform: a CSV or NMEA log, or a live NMEA serial '
+                             'port, pty or FIFO')
+    parser.add_argument("--track-baud", type=int, default=4800, help='Baud rate of a live NMEA serial port')
+    args = parser.parse_args()
+    profile = StartupProfile(origin=LAUNCH_TIME)
+    profile.lap("module imports")
+
     os.environ['SDL_VIDEO_WINDOW_POS'] = "0,0"
     pygame.init()
     display_info = pygame.display.Info()
@@ -152,6 +203,7 @@ if __name__ == "__main__":
     total_height = display_info.current_h
     menu_screen = pygame.display.set_mode((total_width, total_height))
     pygame.display.set_caption("Main Menu")
+    profile.lap("display init")
 
     # Load background image for menu and icon (assume 'cli/lucky.jpg' exists)
     try:
@@ -172,12 +224,19 @@ if __name__ == "__main__":
     large_font = pygame.font.Font(None, 36)
     small_font = pygame.font.Font(None, 14)  # Smaller font for labels to save space
     status_font = pygame.font.Font(None, 14)  # Increased from 12 to 14 for status messages
+    profile.lap("menu images and fonts")
 
     sub_x = menu_width
     sub_y = 0
     sub_width = total_width - menu_width
     sub_height = total_height
 
+    # Tracking view buttons, beside the legend; created here because hover and clicks are handled
+    # before the view is first drawn
+    clear_filters_button = pygame.Rect(sub_x + 190, sub_y + 20, 110, 30)  # Wider button (30 pixels more)
+    visible_only_button = pygame.Rect(sub_x + 190, sub_y + 60, 110, 30)
+    site_button = pygame.Rect(sub_x + 190, sub_y + 100, 110, 30)
+
     buttons = [
         {"rect": pygame.Rect(10, 10, 180, 80), "text": "Tracking Vis", "mode": "tracking_vis"},
         {"rect": pygame.Rect(10, 100, 180, 80), "text": "Sensor Calib", "mode": "sensor_calib"},
@@ -202,7 +261,8 @@ if __name__ == "__main__":
         pass
 
     # Configuration defaults
-    config = {"lat": "34.87405877829887", "lon": "-120.44621926328121", "alt": "120.0", "elevation_mask": "0.0"}
+    config = {"lat": "34.87405877829887", "lon": "-120.44621926328121", "alt": "120.0", "elevation_mask": "0.0",
+              "propagation_workers": "1", "propagation_shard_size": "2048", "trajectory_max_error_arcsec": "1.0"}
     # Load config.json if it exists, overriding defaults
     if os.path.exists("config.json"):
         try:
@@ -215,6 +275,11 @@ if __name__ == "__main__":
     lon_str = config["lon"]
     alt_str = config["alt"]
     elevation_mask_str = config["elevation_mask"]
+    # Propagation process pool: 1 propagates in the worker process itself, 0 shards across one process per CPU core
+    propagation_workers = int(config["propagation_workers"]) or None
+    propagation_shard_size = int(config["propagation_shard_size"])
+    # Adaptive trajectory sampling error bound; 0 runs SGP4 at every sample
+    trajectory_max_error = float(config["trajectory_max_error_arcsec"])
     focused_field = None  # None, 'lat', 'lon', 'alt', 'elevation_mask', 'filter', 'filter_alt'
     cursor_pos = {"lat": 0, "lon": 0, "alt": 0, "elevation_mask": 0, "filter": 0, "filter_alt": 0}  # Cursor position in each field
     selection_start = {"lat": None, "lon": None, "alt": None, "elevation_mask": None, "filter": None, "filter_alt": None}  # Selection start position
@@ -236,6 +301,8 @@ if __name__ == "__main__":
     button_states["save"] = {"hover": False, "clicked": False}
     button_states["load"] = {"hover": False, "clicked": False}
     button_states["clear_filters"] = {"hover": False, "clicked": False}
+    button_states["visible_only"] = {"hover": False, "clicked": False}  # Toggle; "clicked" while on
+    button_states["site"] = {"hover": False, "clicked": False}
 
     # Initial render of main menu
     menu_screen.fill((200, 200, 200), (0, 0, menu_width, total_height))  # Menu background
@@ -250,97 +317,56 @@ if __name__ == "__main__":
     pygame.display.flip()
     print(f"Debug: Status - {'Starting TLE process...'}")
 
+    profile.lap("config and first menu render")
+
     # Cache file management
     cache_file = "tle_cache.tle"
     cache_age_limit = 24 * 3600  # 24 hours in seconds
 
-    # Load or update TLEs from cache or Celestrak
+    # Load or update TLEs from cache or Celestrak on a background thread; the menu is usable meanwhile
     tle_loaded = False
     satellites = []
-    try:
-        if os.path.exists(cache_file):
-            cache_time = os.path.getmtime(cache_file)
-            current_time = time.time()
-            if current_time - cache_time > cache_age_limit:
-                status_messages.append("Downloading TLEs from Celestrak...")
-                status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-                menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-                pygame.display.flip()
-                print(f"Debug: Status - {status_messages[-1]}")
-                # Update from Celestrak
-                url = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle'
-                response = requests.get(url)
-                response.raise_for_status()
-                tle_text = response.text
-                with open(cache_file, 'w') as f:
-                    f.write(tle_text)
-            else:
-                status_messages.append("Loading TLEs from cache...")
-                status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-                menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-                pygame.display.flip()
-                print(f"Debug: Status - {status_messages[-1]}")
-                # Load from cache
-                with open(cache_file, 'r') as f:
-                    tle_text = f.read()
-        else:
-            status_messages.append("Downloading TLEs from Celestrak...")
-            status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-            menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-            pygame.display.flip()
-            print(f"Debug: Status - {status_messages[-1]}")
-            # Initial download from Celestrak
-            url = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle'
-            response = requests.get(url)
-            response.raise_for_status()
-            tle_text = response.text
-            with open(cache_file, 'w') as f:
-                f.write(tle_text)
-
-        status_messages.append("Creating satellite objects...")
-        status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-        menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-        pygame.display.flip()
-        print(f"Debug: Status - {status_messages[-1]}")
-
-        # Process TLE text into satellites
-        satellites = load.tle_file(cache_file)
-        status_messages.append("TLEs ready")
-        status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-        menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-        pygame.display.flip()
-        print(f"Debug: Status - {status_messages[-1]}")
-        tle_loaded = True
-    except Exception as e:
-        print(f"Debug: Error loading TLEs in text format: {e}")
-
-    # Pre-compute satellite labels and mean altitudes
-    satellite_labels = {}
     satellite_mean_altitudes = {}
-    MU = 3.986004418e14  # Earth's gravitational parameter in m^3/s^2
-    R_EARTH = 6371  # Earth radius in km
-    for sat in satellites:
-        name = sat.name.strip()
-        norad_id = sat.model.satnum_str
-        label_text = f"{norad_id} - {name}"
-        satellite_labels[sat] = small_font.render(label_text, True, (255, 255, 255))
-        # Compute mean altitude using Keplerian math
-        n = sat.model.no_kozai / 60  # Mean motion in rad/s (convert from rad/min)
-        a = (MU / (n**2))**(1/3) / 1000  # Semi-major axis in km
-        e = sat.model.ecco  # Eccentricity
-        perigee = a * (1 - e) - R_EARTH  # Perigee altitude in km
-        apogee = a * (1 + e) - R_EARTH  # Apogee altitude in km
-        mean_altitude = (perigee + apogee) / 2
-        satellite_mean_altitudes[sat] = mean_altitude
+    filter_index = None
+    satellite_index = {}
+    catalog_loader = CatalogLoader(cache_file, config.get("tle_url"), cache_age_limit, prepare=index_catalog,
+                                   profile=profile)
+    catalog_loader.start()
+    startup_reported = False
+    first_frame_presented = False
+
+    # Labels are rendered the first time a satellite is drawn, not for the whole catalog up front
+    satellite_labels = LabelCache(small_font)
 
     last_update_time = 0
     update_interval = 0.1  # Target 10 Hz
     last_trajectory_update = 0
-    trajectory_interval = 900  # 15 minutes in seconds
-    satellite_trajectories = {}
-    satellite_arc_segments = {}
+    trajectory_interval = 300  # 5 minutes; the worker only propagates the window's newest 5 minutes
+    submitted_mask = float('inf')  # Elevation mask the latest trajectory job was screened with
+    pass_table = None  # PASS_DTYPE records for the next 24 hours, from the worker
+    last_pass_update = 0
+    pass_interval = 3600  # Pass windows are cached per hour
+    submitted_pass_mask = None
+    submitted_pass_key = None  # (site index, fixed site or None if moving) the latest pass job was for
+    trajectory_store = None  # propagation.TrajectoryStore of the current window, for the active site
+    trajectory_stores = []  # One store per site of the window, sharing its propagation
+    submitted_sites = []  # (name, observer) of each store, from observer_sites()
+    observer_track = None  # observer_track.ObserverTrack of a --track file
+    track_reader = None  # observer_track.NmeaReader of a live --track stream
+    track_interval = float(config.get("track_refresh_s", 60))  # A live track's window is rebuilt this often
+    pending_sites = []  # Sites of the trajectory job in flight
+    active_site = 0  # Position in submitted_sites the view shows
+    satellite_arc_segments = {}  # Built on demand for the selected satellite
+    pvt_ephemeris = None  # pvt.PvtEphemeris from --pvt, loaded with the catalog
+    pvt_differences = {}  # (pvt_difference() records, arc segments) per satellite, per trajectory window
+    trajectory_worker = None  # Started once the catalog has loaded
+    ts = None  # Loaded once with the catalog; rebuilding it every frame cost ~2 ms
     hovered_satellite = None
+    marker_index = MarkerIndex([], [], [])  # Hit-test grid over satellite_positions, rebuilt every frame
     selected_satellite = None
+    layers = LayerCache()  # Static sky grid, legend and config background, rendered once
+    page_dirty = True  # Static pages are only redrawn after input
+    presented_mode = None
 
     running = True
     while running:
@@ -352,27 +378,135 @@ if __name__ == "__main__":
         filter_rect = pygame.Rect(sub_x + 20, sub_y + 210, 200, 30)  # Filter by name box
         filter_alt_rect = pygame.Rect(sub_x + 20, sub_y + 280, 200, 30)  # Filter by altitude box
 
-        # Precompute trajectories and arc segments every 15 minutes
-        if current_time - last_trajectory_update >= trajectory_interval:
+        # Pick up the catalog once the loader thread has finished with it
+        if catalog_loader is not None:
+            loader_done = not catalog_loader.is_alive()
+            for msg in catalog_loader.pending_messages():
+                status_messages.append(msg)
+                print(f"Debug: Status - {msg}")
+            if loader_done:
+                if catalog_loader.satellites is not None:
+                    from skyfield.api import load, wgs84
+                    from passes import upcoming_passes
+                    from trajectory_worker import TrajectoryWorker
+                    satellites = catalog_loader.satellites
+                    satellite_mean_altitudes, filter_index, satellite_index = catalog_loader.prepared
+                    ts = load.timescale()
+                    # Started after the loader thread has exited, so the worker process forks a single-threaded parent
+                    trajectory_worker = TrajectoryWorker()
+                    tle_loaded = True
+                    status_messages.append("TLEs ready")
+                    if args.track:
+                        from observer_track import NmeaReader, is_live_source, read_track
+                        try:
+                            if is_live_source(args.track):
+                                track_reader = NmeaReader(args.track, baud=args.track_baud)
+                                track_reader.start()
+                                status_messages.append(f"Reading GPS fixes from {args.track}")
+                            else:
+                                observer_track = read_track(args.track)
+                                status_messages.append(f"Observer track: {len(observer_track)} fixes")
+                        except (OSError, ValueError) as e:
+                            status_messages.append("Observer track load failed")
+                            print(f"Debug: Error loading observer track: {e}")
+                    if args.pvt:
+                        from pvt import load_pvt, pvt_difference
+                        try:
+                            pvt_ephemeris = load_pvt(args.pvt, ts)
+                            status_messages.append(f"PVT ephemeris: {pvt_ephemeris.name or pvt_ephemeris.object_id}, "
+                                                   f"{len(pvt_ephemeris)} samples")
+                        except (OSError, ValueError) as e:
+                            status_messages.append("PVT ephemeris load failed")
+                            print(f"Debug: Error loading PVT ephemeris: {e}")
+                else:
+                    status_messages.append("TLE load failed")
+                print(f"Debug: Status - {status_messages[-1]}")
+                profile.lap("catalog handoff")
+                catalog_loader = None
+                page_dirty = True
+
+        # Roll the trajectory window forward every 5 minutes in the background worker, or recompute it
+        # sooner if the mask was lowered below the one the latest window was screened with. A live track
+        # has moved on from the fixes its window was propagated for, so that window is rebuilt more often.
+        screen_mask = max(float(elevation_mask_str) if elevation_mask_str.replace('.', '').isdigit() else 0.0, 0.0)
+        refresh_interval = track_interval if track_reader is not None else trajectory_interval
+        if tle_loaded and (current_time - last_trajectory_update >= refresh_interval or screen_mask < submitted_mask) \
+                and not trajectory_worker.busy:
             status_messages.append("Starting trajectory precomputation...")
-            status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-            menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-            pygame.display.flip()
             print(f"Debug: Status - {status_messages[-1]}")
-            lat = float(lat_str)
-            lon = float(lon_str)
-            alt_m = float(alt_str)
-            observer = wgs84.latlon(lat, lon, elevation_m=alt_m)
-            ts = load.timescale()
-            satellite_trajectories, satellite_arc_segments = precompute_trajectories(satellites, observer, ts, sub_x, sub_y, sub_width, sub_height)
+            # Every site in one window: the propagation is shared and switching sites needs no new job
+            # Until a live stream's first fix the configured site stands in
+            track = track_reader.track() if track_reader is not None else observer_track
+            pending_sites = observer_sites(config, lat_str, lon_str, alt_str, track)
+            trajectory_worker.submit(cache_file, [observer for _, observer in pending_sites],
+                                     (sub_x, sub_y, sub_width, sub_height),
+                                     workers=propagation_workers, shard_size=propagation_shard_size,
+                                     max_error_arcsec=trajectory_max_error,
+                                     elevation_mask=screen_mask)
+            submitted_mask = screen_mask
             last_trajectory_update = current_time
-            status_messages.append("Trajectories updated")
-            status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
-            menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
-            pygame.display.flip()
-            print(f"Debug: Status - {status_messages[-1]}")
+        # Refresh the pass table hourly (a cache hit unless the TLEs changed), or when the mask or site changes.
+        # A moving site's table is for where the platform was at the time, refreshed with the hourly update.
+        pass_key = None
+        if tle_loaded and submitted_sites:
+            site_observer = submitted_sites[active_site][1]
+            pass_key = (active_site, site_observer if isinstance(site_observer, tuple) else None)
+            if (current_time - last_pass_update >= pass_interval or screen_mask != submitted_pass_mask
+                    or pass_key != submitted_pass_key) and not trajectory_worker.passes_busy:
+                pass_site = site_observer if isinstance(site_observer, tuple) else site_observer.latest()[1:]
+                trajectory_worker.submit_passes(cache_file, *pass_site, elevation_mask=screen_mask)
+                submitted_pass_mask = screen_mask
+                submitted_pass_key = pass_key
+                last_pass_update = current_time
+        if trajectory_worker is not None:
+            for msg in trajectory_worker.progress():
+                # Update the progress line in place rather than scrolling the status area
+                if status_messages and status_messages[-1].split(" ")[0] == msg.split(" ")[0]:
+                    status_messages[-1] = msg
+                else:
+                    status_messages.append(msg)
+            try:
+                trajectory_result = trajectory_worker.poll()
+            except Exception as e:
+                trajectory_result = None
+                status_messages.append("Trajectory precomputation failed")
+                print(f"Debug: Error precomputing trajectories: {e}")
+            if trajectory_result is not None:
+                satnums, stores = trajectory_result
+                if satnums == [sat.model.satnum for sat in satellites]:
+                    # Publish the new window in one swap; until now the UI drew from the previous one.
+                    # Satellites the pre-filter ruled out have no row and are not drawn.
+                    trajectory_stores = stores
+                    submitted_sites = pending_sites
+                    active_site = min(active_site, len(stores) - 1)
+                    trajectory_store = trajectory_stores[active_site]
+                    satellite_arc_segments = {}
+                    pvt_differences = {}
+                    status_messages.append("Trajectories updated")
+                else:
+                    status_messages.append("Trajectory catalog mismatch, discarded")
+                print(f"Debug: Status - {status_messages[-1]}")
+            try:
+                pass_result = trajectory_worker.poll_passes()
+            except Exception as e:
+                pass_result = None
+                status_messages.append("Pass prediction failed")
+                print(f"Debug: Error predicting passes: {e}")
+            if pass_result is not None and submitted_pass_key != pass_key:
+                pass_result = None  # For a site the view has since switched away from; resubmitted above
+            if pass_result is not None:
+                satnums, passes = pass_result
+                if satnums == [sat.model.satnum for sat in satellites]:
+                    pass_table = passes
+                    status_messages.append(f"Pass table ready ({len(passes)} passes)")
+                else:
+                    status_messages.append("Pass catalog mismatch, discarded")
+                print(f"Debug: Status - {status_messages[-1]}")
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if events:
+            page_dirty = True
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -392,7 +526,7 @@ if __name__ == "__main__":
                 if current_mode == "config_options":
                     if save_button.collidepoint(pos):
                         button_states["save"]["clicked"] = True
-                        config = {"lat": lat_str, "lon": lon_str, "alt": alt_str, "elevation_mask": elevation_mask_str}
+                        config.update({"lat": lat_str, "lon": lon_str, "alt": alt_str, "elevation_mask": elevation_mask_str})
                         with open("config.json", "w") as f:
                             json.dump(config, f)
                         status_messages.append("Config saved successfully")
@@ -403,6 +537,7 @@ if __name__ == "__main__":
                         button_states["save"]["clicked"] = False  # Revert after action
                     elif load_button.collidepoint(pos):
                         button_states["load"]["clicked"] = True
+                        from tkinter import filedialog, Tk
                         root = Tk()
                         root.withdraw()
                         initial_dir = os.getcwd()
@@ -421,25 +556,39 @@ if __name__ == "__main__":
                             print(f"Debug: Status - {status_messages[-1]}")
                         button_states["load"]["clicked"] = False  # Revert after action
                 if current_mode == "tracking_vis" and tle_loaded and pos[0] >= sub_x:  # Only check satellite clicks in tracking area
-                    for sat, (px, py) in satellite_positions.items():
-                        if math.hypot(pos[0] - px, pos[1] - py) < 10:  # 10-pixel click radius
-                            if selected_satellite == sat:
-                                selected_satellite = None  # Deselect on second click
-                            else:
-                                selected_satellite = sat  # Select satellite on first click
-                                filter_text = sat.name.strip()  # Set filter_text to selected satellite name
-                            break
-                if current_mode == "tracking_vis" and 'clear_filters_button' in locals() and clear_filters_button.collidepoint(pos):
+                    sat = marker_index.nearest(pos[0], pos[1])  # Nearest marker within the 10-pixel click radius
+                    if sat is not None:
+                        if selected_satellite == sat:
+                            selected_satellite = None  # Deselect on second click
+                        else:
+                            selected_satellite = sat  # Select satellite on first click
+                            filter_text = sat.name.strip()  # Set filter_text to selected satellite name
+                if current_mode == "tracking_vis" and tle_loaded and clear_filters_button.collidepoint(pos):
                     button_states["clear_filters"]["clicked"] = True
                     filter_text = ""
                     filter_alt_text = ""
                     selected_satellite = None  # Clear selected satellite filter
+                    button_states["visible_only"]["clicked"] = False
                     status_messages.append("Filters Cleared")
                     status_render = status_font.render(status_messages[-1], True, (0, 0, 0))
                     menu_screen.blit(status_render, (10, status_y_start + (len(status_messages) - 1) * 14))
                     pygame.display.flip()
                     print(f"Debug: Status - {status_messages[-1]}")
                     button_states["clear_filters"]["clicked"] = False  # Revert after action
+                if current_mode == "tracking_vis" and tle_loaded and len(trajectory_stores) > 1 and site_button.collidepoint(pos):
+                    # Every site's store is already in hand, so the view switches in a single swap
+                    active_site = (active_site + 1) % len(trajectory_stores)
+                    trajectory_store = trajectory_stores[active_site]
+                    satellite_arc_segments = {}
+                    pvt_differences = {}
+                    pass_table = None
+                    status_messages.append(f"Site: {submitted_sites[active_site][0]}")
+                    print(f"Debug: Status - {status_messages[-1]}")
+                if current_mode == "tracking_vis" and tle_loaded and visible_only_button.collidepoint(pos):
+                    button_states["visible_only"]["clicked"] = not button_states["visible_only"]["clicked"]
+                    status_messages.append("Showing naked-eye visible satellites only" if button_states["visible_only"]["clicked"]
+                                           else "Showing all satellites")
+                    print(f"Debug: Status - {status_messages[-1]}")
                 # Check for clicks on filter boxes to set focus
                 if current_mode == "tracking_vis" and filter_rect.collidepoint(pos):
                     focused_field = "filter"
@@ -610,12 +759,9 @@ if __name__ == "__main__":
                 button_states["load"]["hover"] = load_button.collidepoint(mouse_pos)
                 if current_mode == "tracking_vis" and tle_loaded:
                     button_states["clear_filters"]["hover"] = clear_filters_button.collidepoint(mouse_pos)
-                    hovered_satellite = None
-                    mouse_x, mouse_y = mouse_pos
-                    for sat, (px, py) in satellite_positions.items():
-                        if math.hypot(mouse_x - px, mouse_y - py) < 10:  # 10-pixel hover radius
-                            hovered_satellite = sat
-                            break
+                    button_states["visible_only"]["hover"] = visible_only_button.collidepoint(mouse_pos)
+                    button_states["site"]["hover"] = site_button.collidepoint(mouse_pos)
+                    hovered_satellite = marker_index.nearest(*mouse_pos)  # 10-pixel hover radius
 
         menu_screen.fill((200, 200, 200), (0, 0, menu_width, total_height))  # Menu background
 
@@ -638,20 +784,17 @@ if __name__ == "__main__":
         for i, msg in enumerate(status_messages):
             status_render = status_font.render(msg, True, (0, 0, 0))
             menu_screen.blit(status_render, (10, status_y_start + i * 14))
-        if current_mode == "config_options":
+        # The tracking plot animates; other pages only change in response to input
+        redraw_page = current_mode == "tracking_vis" or page_dirty or current_mode != presented_mode
+        if not redraw_page:
+            pass  # Page unchanged since it was last presented
+        elif current_mode == "config_options":
             sub_rect = (sub_x, sub_y, sub_width, sub_height)
-            # Draw gradient background from (160, 160, 160) to (155, 155, 155)
-            for y in range(sub_height):
-                color = (160 - (y / sub_height * 5), 160 - (y / sub_height * 5), 160 - (y / sub_height * 5))
-                pygame.draw.line(menu_screen, color, (sub_x, sub_y + y), (sub_x + sub_width, sub_y + y))
-            # Draw grouping box and label
-            group_rect = pygame.Rect(sub_x + 10, sub_y + 0, 220, 370)  # Adjusted height for new parameter
-            pygame.draw.rect(menu_screen, (0, 0, 0), group_rect, 2, border_radius=5)  # Sleek black box with rounded edges
-            group_label = font.render("Observer Location", True, (0, 0, 0))
-            menu_screen.blit(group_label, (sub_x + 20, sub_y + 10))
-            # Draw labels and inputs with adjusted positions
-            lat_label = font.render("Latitude:", True, (0, 0, 0))
-            menu_screen.blit(lat_label, (sub_x + 20, sub_y + 30))
+            # Gradient background, group box, labels and divider come from the cached layer
+            menu_screen.blit(layers.get("config", (sub_width, sub_height),
+                                        lambda: render_config_background((sub_width, sub_height), font)),
+                             (sub_x, sub_y))
+            # Draw inputs with adjusted positions
             pygame.draw.rect(menu_screen, (255, 255, 255), input_rects['lat'])
             lat_text = font.render(lat_str, True, (0, 0, 0))
             menu_screen.blit(lat_text, (input_rects['lat'].x + 5, input_rects['lat'].y + 5))
@@ -668,8 +811,6 @@ if __name__ == "__main__":
                                     (input_rects['lat'].x + 5 + start_width, input_rects['lat'].y + 5,
                                      end_width - start_width, 20), 2)
 
-            lon_label = font.render("Longitude:", True, (0, 0, 0))
-            menu_screen.blit(lon_label, (sub_x + 20, sub_y + 120))
             pygame.draw.rect(menu_screen, (255, 255, 255), input_rects['lon'])
             lon_text = font.render(lon_str, True, (0, 0, 0))
             menu_screen.blit(lon_text, (input_rects['lon'].x + 5, input_rects['lon'].y + 5))
@@ -686,8 +827,6 @@ if __name__ == "__main__":
                                     (input_rects['lon'].x + 5 + start_width, input_rects['lon'].y + 5,
                                      end_width - start_width, 20), 2)
 
-            alt_label = font.render("Altitude (m):", True, (0, 0, 0))
-            menu_screen.blit(alt_label, (sub_x + 20, sub_y + 210))
             pygame.draw.rect(menu_screen, (255, 255, 255), input_rects['alt'])
             alt_text = font.render(alt_str, True, (0, 0, 0))
             menu_screen.blit(alt_text, (input_rects['alt'].x + 5, input_rects['alt'].y + 5))
@@ -704,8 +843,6 @@ if __name__ == "__main__":
                                     (input_rects['alt'].x + 5 + start_width, input_rects['alt'].y + 5,
                                      end_width - start_width, 20), 2)
 
-            elevation_mask_label = font.render("Elevation Mask (deg):", True, (0, 0, 0))
-            menu_screen.blit(elevation_mask_label, (sub_x + 20, sub_y + 300))
             pygame.draw.rect(menu_screen, (255, 255, 255), input_rects['elevation_mask'])
             elevation_mask_text = font.render(elevation_mask_str, True, (0, 0, 0))
             menu_screen.blit(elevation_mask_text, (input_rects['elevation_mask'].x + 5, input_rects['elevation_mask'].y + 5))
@@ -722,74 +859,69 @@ if __name__ == "__main__":
                                     (input_rects['elevation_mask'].x + 5 + start_width, input_rects['elevation_mask'].y + 5,
                                      end_width - start_width, 20), 2)
 
-            # Draw buttons and divider
-            pygame.draw.line(menu_screen, (0, 0, 0), (sub_x, sub_y + sub_height - 60), (sub_x + sub_width, sub_y + sub_height - 60), 1)
+            # Draw buttons
             draw_button(menu_screen, save_button, "Save", button_states["save"])
             draw_button(menu_screen, load_button, "Load", button_states["load"])
         elif current_mode == "tracking_vis" and tle_loaded:
             legend_x = sub_x + 20  # Define legend_x here
             legend_y = sub_y + 20  # Define legend_y here
-            clear_filters_button = pygame.Rect(legend_x + 170, legend_y, 110, 30)  # Wider button (30 pixels more)
             sub_rect = (sub_x, sub_y, sub_width, sub_height)
-            menu_screen.fill((0, 0, 0), sub_rect)
+            elevation_mask = float(elevation_mask_str) if elevation_mask_str.replace('.', '').isdigit() else 0.0
+            # Black plot with horizon, mask circle, elevation rings and azimuth spokes, from the cached layer
+            menu_screen.blit(layers.get("sky", (sub_width, sub_height, elevation_mask),
+                                        lambda: render_sky_grid((sub_width, sub_height), elevation_mask, small_font)),
+                             (sub_x, sub_y))
 
             # Interpolate satellite positions
-            ts = load.timescale()
             t = ts.now()
             current_tt = t.tt
             satellite_positions = {}
-            lat = float(lat_str)
-            lon = float(lon_str)
-            alt_m = float(alt_str)
-            observer = wgs84.latlon(lat, lon, elevation_m=alt_m)
-            elevation_mask = float(elevation_mask_str) if elevation_mask_str.replace('.', '').isdigit() else 0.0
-            max_alt = float(filter_alt_text) if filter_alt_text.replace('.', '').isdigit() else float('inf')
+            site_observer = (submitted_sites[active_site][1] if submitted_sites else
+                             (float(lat_str), float(lon_str), float(alt_str)))
+            visible_only = button_states["visible_only"]["clicked"]
 
-            for sat in satellites:
-                if sat in satellite_trajectories and sat in satellite_labels:
-                    px, py, alt = interpolate_position(satellite_trajectories[sat], current_tt)
-                    if px is not None and py is not None and alt is not None:
-                        if alt > elevation_mask and alt > 0 and satellite_mean_altitudes.get(sat, 0.0) <= max_alt:
-                            if selected_satellite is None or sat == selected_satellite:
-                                satellite_positions[sat] = (int(px), int(py))
+            if trajectory_store is not None and len(trajectory_store):
+                # Every satellite at once; the filters are boolean arrays over the store's rows
+                px, py, alt, eye = interpolate_positions(trajectory_store, current_tt)
+                catalog_rows = trajectory_store.indices
+                # Name and altitude masks are memoized per filter string by the catalog index
+                catalog_shown = filter_index.name_mask(filter_text) & filter_index.altitude_mask(filter_alt_text)
+                shown = (alt > elevation_mask) & (alt > 0) & catalog_shown[catalog_rows]
+                if visible_only:
+                    shown &= eye > 0
+                if selected_satellite is not None:
+                    shown &= catalog_rows == satellite_index[selected_satellite]
+                shown = np.flatnonzero(shown)
+                shown_satellites = [satellites[j] for j in catalog_rows[shown].tolist()]
+                shown_x = px[shown].astype(int)
+                shown_y = py[shown].astype(int)
+                satellite_positions = dict(zip(shown_satellites, zip(shown_x.tolist(), shown_y.tolist())))
+                marker_index = MarkerIndex(shown_satellites, shown_x, shown_y)
+            else:
+                marker_index = MarkerIndex([], [], [])
 
-            # Draw polar plot (static elements only, no per-frame math)
+            # Plot geometry for the marker orientation below
             cx = sub_x + sub_width // 2
             cy = sub_y + sub_height // 2
-            radius = min(sub_width, sub_height) // 2 - 50
-            # Draw horizon circle
-            pygame.draw.circle(menu_screen, (255, 255, 255), (cx, cy), radius, 1)
-            # Draw elevation mask circle
-            mask_radius = (90 - elevation_mask) / 90 * radius
-            pygame.draw.circle(menu_screen, (255, 0, 0), (cx, cy), mask_radius, 2)
-            # Draw elevation circles
-            for el in [30, 60]:
-                r = (90 - el) / 90 * radius
-                pygame.draw.circle(menu_screen, (100, 100, 100), (cx, cy), int(r), 1)
-                el_label = small_font.render(f"{el}°", True, (255, 255, 255))
-                menu_screen.blit(el_label, (cx + r + 5, cy - 5))
-            # Draw azimuth lines and labels
-            for az_deg in range(0, 360, 30):
-                az_rad = math.radians(az_deg)
-                x1 = cx + radius * math.sin(az_rad)
-                y1 = cy - radius * math.cos(az_rad)
-                pygame.draw.line(menu_screen, (100, 100, 100), (cx, cy), (x1, y1), 1)
-                if az_deg % 90 == 0:
-                    direction = {0: "N", 90: "E", 180: "S", 270: "W"}[az_deg]
-                    direction_label = small_font.render(direction, True, (255, 255, 255))
-                    # Ensure all cardinal directions are outside the circle with 10-pixel clearance
-                    if az_deg == 0:  # North
-                        menu_screen.blit(direction_label, (cx - direction_label.get_width() // 2, cy - radius - 10))
-                    elif az_deg == 90:  # East
-                        menu_screen.blit(direction_label, (cx + radius + 10, cy - direction_label.get_height() // 2))
-                    elif az_deg == 180:  # South
-                        menu_screen.blit(direction_label, (cx - direction_label.get_width() // 2, cy + radius + 10))
-                    elif az_deg == 270:  # West
-                        menu_screen.blit(direction_label, (cx - radius - 10 - direction_label.get_width(), cy - direction_label.get_height() // 2))
-            # Draw precomputed arc segments for selected satellite
-            if selected_satellite and tle_loaded and selected_satellite in satellite_arc_segments:
+            # Draw arc segments for selected satellite, computed once per trajectory window
+            if selected_satellite and tle_loaded and trajectory_store is not None:
+                if selected_satellite not in satellite_arc_segments:
+                    row = int(trajectory_store.row_of[satellite_index[selected_satellite]])
+                    satellite_arc_segments[selected_satellite] = (compute_arc_segments(trajectory_store, row)
+                                                                  if row >= 0 else [])
                 for x0, y0, x1, y1, color in satellite_arc_segments[selected_satellite]:
                     pygame.draw.line(menu_screen, color, (x0, y0), (x1, y1), 1)
+                # Second arc from the PVT ephemeris, over the same time grid
+                if pvt_ephemeris is not None and pvt_ephemeris.matches(selected_satellite):
+                    if selected_satellite not in pvt_differences:
+                        difference = pvt_difference(pvt_ephemeris, selected_satellite,
+                                                    (wgs84.latlon(*site_observer[:2], elevation_m=site_observer[2])
+                                                     if isinstance(site_observer, tuple) else site_observer),
+                                                    ts.tt_jd(trajectory_store.times_tt),
+                                                    (sub_x, sub_y, sub_width, sub_height))
+                        pvt_differences[selected_satellite] = (difference, compute_difference_segments(difference))
+                    for x0, y0, x1, y1 in pvt_differences[selected_satellite][1]:
+                        pygame.draw.line(menu_screen, (0, 255, 255), (x0, y0), (x1, y1), 1)
             # Draw details box
             if (hovered_satellite or selected_satellite) and current_mode == "tracking_vis":
                 sat = selected_satellite if selected_satellite else hovered_satellite
@@ -799,6 +931,21 @@ if __name__ == "__main__":
                     f"Mean Altitude (km): {satellite_mean_altitudes.get(sat, 0.0):.1f}",
                     f"Eccentricity: {sat.model.ecco:.4f}"
                 ]
+                if pass_table is not None:
+                    details.append("Next passes (UTC, max el):")
+                    for p in upcoming_passes(pass_table, sat.model.satnum, current_tt):
+                        rise = ts.tt_jd(p['rise_tt']).utc_strftime('%H:%M:%S') if not np.isnan(p['rise_tt']) else "up"
+                        set_ = ts.tt_jd(p['set_tt']).utc_strftime('%H:%M:%S') if not np.isnan(p['set_tt']) else "..."
+                        details.append(f"  {rise}-{set_}  {p['max_alt']:.0f}°")
+                if sat in pvt_differences:
+                    difference = pvt_differences[sat][0]
+                    along, cross, angle = (np.interp(current_tt, trajectory_store.times_tt, difference[column],
+                                                     left=np.nan, right=np.nan) for column in ('along', 'cross', 'angle'))
+                    details.append("PVT - TLE (cyan arc):")
+                    details.append(f"  {along:+.2f} along, {cross:+.2f} cross km" if not np.isnan(angle) else
+                                   "  outside ephemeris span")
+                    if not np.isnan(angle):
+                        details.append(f"  {angle:.0f}\" on sky")
                 details_rect = pygame.Rect(sub_x + sub_width - 250, sub_y + 20, 230, 200)
                 pygame.draw.rect(menu_screen, (50, 50, 50), details_rect)  # Dark grey background
                 pygame.draw.rect(menu_screen, (0, 0, 0), details_rect, 2)  # Black border
@@ -806,32 +953,31 @@ if __name__ == "__main__":
                     text_surface = small_font.render(line, True, (255, 255, 255))
                     menu_screen.blit(text_surface, (details_rect.x + 5, details_rect.y + 5 + i * 20))
             # Plot satellites with color and shape based on orbit type
-            for sat, (px, py) in satellite_positions.items():
-                if not filter_text or filter_text.lower() in sat.name.lower():
-                    mean_altitude = satellite_mean_altitudes.get(sat, 0.0)
-                    eccentricity = sat.model.ecco
-                    if 2000 < mean_altitude <= 35786:  # MEO
-                        color = (255, 165, 0)  # Orange
-                        draw_hexagon(menu_screen, px, py, color)
-                    elif abs(mean_altitude - 35786) <= 1000:  # GEO or nearby
-                        color = (128, 0, 128)  # Purple
-                        draw_triangle(menu_screen, px, py, color)
-                    else:  # LEO (0-2000 km)
-                        color = get_altitude_color(mean_altitude) or (0, 255, 0)  # Fallback to green if out of range
-                        if eccentricity > 0.01:
-                            width = 6
-                            height = 3
-                            angle = math.degrees(math.atan2(py - cy, px - cx))
-                            oval_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-                            pygame.draw.ellipse(oval_surface, color, (0, 0, width, height))
-                            rotated_oval = pygame.transform.rotate(oval_surface, angle)
-                            rotated_rect = rotated_oval.get_rect(center=(px, py))
-                            menu_screen.blit(rotated_oval, rotated_rect.topleft)
-                        else:
-                            pygame.draw.circle(menu_screen, color, (px, py), 3)
-                    if sat == hovered_satellite or sat == selected_satellite:
-                        pygame.draw.circle(menu_screen, (255, 255, 0), (px, py), 5, 1)  # Highlight on hover or select
-                    menu_screen.blit(satellite_labels[sat], (px + 5, py))
+            for sat, (px, py) in satellite_positions.items():  # Already name-filtered
+                mean_altitude = satellite_mean_altitudes.get(sat, 0.0)
+                eccentricity = sat.model.ecco
+                if 2000 < mean_altitude <= 35786:  # MEO
+                    color = (255, 165, 0)  # Orange
+                    draw_hexagon(menu_screen, px, py, color)
+                elif abs(mean_altitude - 35786) <= 1000:  # GEO or nearby
+                    color = (128, 0, 128)  # Purple
+                    draw_triangle(menu_screen, px, py, color)
+                else:  # LEO (0-2000 km)
+                    color = get_altitude_color(mean_altitude) or (0, 255, 0)  # Fallback to green if out of range
+                    if eccentricity > 0.01:
+                        width = 6
+                        height = 3
+                        angle = math.degrees(math.atan2(py - cy, px - cx))
+                        oval_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+                        pygame.draw.ellipse(oval_surface, color, (0, 0, width, height))
+                        rotated_oval = pygame.transform.rotate(oval_surface, angle)
+                        rotated_rect = rotated_oval.get_rect(center=(px, py))
+                        menu_screen.blit(rotated_oval, rotated_rect.topleft)
+                    else:
+                        pygame.draw.circle(menu_screen, color, (px, py), 3)
+                if sat == hovered_satellite or sat == selected_satellite:
+                    pygame.draw.circle(menu_screen, (255, 255, 0), (px, py), 5, 1)  # Highlight on hover or select
+                menu_screen.blit(satellite_labels.get(sat), (px + 5, py))
             # Draw filter boxes and labels above the boxes
             filter_label = small_font.render("Name Filter:", True, (255, 255, 255))
             menu_screen.blit(filter_label, (filter_rect.x, filter_rect.y - filter_label.get_height() - 5))
@@ -870,29 +1016,16 @@ if __name__ == "__main__":
                                      end_width - start_width, 20), 2)
 
             # Draw legend for altitude heatmap and orbit types
-            pygame.draw.rect(menu_screen, (50, 50, 50), (legend_x, legend_y, 150, 140))  # Larger legend
-            pygame.draw.line(menu_screen, (255, 255, 255), (legend_x, legend_y + 20), (legend_x + 150, legend_y + 20), 1)  # Title line
-            legend_title = small_font.render("Orbit Legend", True, (255, 255, 255))
-            menu_screen.blit(legend_title, (legend_x + 5, legend_y + 5))
-            # LEO heatmap
-            for i in range(150):
-                alt = i / 150 * 1000  # Scale from 0 to 1000 km
-                color = get_altitude_color(alt) or (0, 255, 0)
-                pygame.draw.line(menu_screen, color, (legend_x + i, legend_y + 40), (legend_x + i, legend_y + 60))
-            low_alt = small_font.render("0 km", True, (255, 255, 255))
-            high_alt = small_font.render("1000 km", True, (255, 255, 255))
-            menu_screen.blit(low_alt, (legend_x, legend_y + 70))
-            menu_screen.blit(high_alt, (legend_x + 140, legend_y + 70))
-            # MEO hexagon
-            draw_hexagon(menu_screen, legend_x + 20, legend_y + 90, (255, 165, 0))  # Orange
-            meo_label = small_font.render("MEO (Orange)", True, (255, 255, 255))
-            menu_screen.blit(meo_label, (legend_x + 40, legend_y + 85))
-            # GEO triangle with line break
-            draw_triangle(menu_screen, legend_x + 20, legend_y + 110, (128, 0, 128))  # Purple
-            geo_label = small_font.render("GEO (Purple)", True, (255, 255, 255))
-            menu_screen.blit(geo_label, (legend_x + 40, legend_y + 105))
+            menu_screen.blit(layers.get("legend", (), lambda: render_legend(small_font, get_altitude_color,
+                                                                            draw_hexagon, draw_triangle)),
+                             (legend_x, legend_y))
+            menu_screen.blit(small_font.render("1000 km", True, (255, 255, 255)), (legend_x + 140, legend_y + 70))
             # Draw clear filters button
             draw_button(menu_screen, clear_filters_button, "Clear Filters", button_states["clear_filters"])
+            draw_button(menu_screen, visible_only_button, "Visible Only", button_states["visible_only"])
+            if len(trajectory_stores) > 1:
+                draw_button(menu_screen, site_button, f"Site: {submitted_sites[active_site][0]}"[:16],
+                            button_states["site"])
             # Draw time display in lower left
             current_utc = datetime.datetime.utcnow()
             current_local = current_utc - datetime.timedelta(hours=7)  # PDT is UTC-7
@@ -901,6 +1034,22 @@ if __name__ == "__main__":
             time_text = f"UTC: {utc_time_str}  Local: {local_time_str}"
             time_surface = small_font.render(time_text, True, (255, 255, 255))
             menu_screen.blit(time_surface, (sub_x + 10, sub_y + sub_height - 30))
+            # Where a moving platform is now
+            if track_reader is not None or observer_track is not None:
+                fix = track_reader.latest() if track_reader is not None else None
+                if fix is not None:
+                    gps_text = f"GPS: {fix[1]:.5f}, {fix[2]:.5f}, {fix[3]:.0f} m ({current_time - fix[0]:.0f} s old)"
+                elif observer_track is not None:
+                    here = observer_track.at(current_time)
+                    gps_text = f"Track: {float(here[0]):.5f}, {float(here[1]):.5f}, {float(here[2]):.0f} m"
+                else:
+                    gps_text = "GPS: waiting for a fix"
+                menu_screen.blit(small_font.render(gps_text, True, (255, 255, 255)), (sub_x + 10, sub_y + sub_height - 45))
+        elif current_mode == "tracking_vis":
+            sub_rect = (sub_x, sub_y, sub_width, sub_height)
+            menu_screen.fill((0, 0, 0), sub_rect)
+            loading_text = large_font.render("Loading TLE catalog...", True, (255, 255, 255))
+            menu_screen.blit(loading_text, loading_text.get_rect(center=(sub_x + sub_width // 2, sub_y + sub_height // 2)))
         elif current_mode == "sensor_calib":
             sub_rect = (sub_x, sub_y, sub_width, sub_height)
             menu_screen.fill((50, 50, 50), sub_rect)
@@ -926,7 +1075,21 @@ if __name__ == "__main__":
             text2 = large_font.render(contact_text, True, (255, 255, 255))
             menu_screen.blit(text2, (sub_x + 10, sub_y + 50))
 
-        pygame.display.flip()
+        # Present only what was redrawn: the menu column always, the page area when it changed
+        dirty_rects = [pygame.Rect(0, 0, menu_width, total_height)]
+        if redraw_page:
+            dirty_rects.append(pygame.Rect(sub_x, sub_y, sub_width, sub_height))
+        pygame.display.update(dirty_rects)
+        page_dirty = False
+        presented_mode = current_mode
+        if not first_frame_presented:
+            profile.lap("first interactive frame")
+            first_frame_presented = True
+        if args.profile_startup and not startup_reported and catalog_loader is None:
+            profile.report()
+            startup_reported = True
         clock.tick(60)  # Limit to 60 FPS for better responsiveness
 
+    if trajectory_worker is not None:
+        trajectory_worker.shutdown()
     pygame.quit()
\ No newline at end of file
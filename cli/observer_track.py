@@ -0,0 +1,326 @@
+"""
+Moving observers: a mobile platform's position as a timestamped track of GPS fixes.
+
+An ObserverTrack holds its fixes as arrays of POSIX UTC time, geodetic latitude/longitude and
+height above the ellipsoid. positions_at() gives the observer at every sample of a Skyfield time
+array at once, as a GeographicPosition with array coordinates: linearly interpolated between
+fixes, dead-reckoned for up to MAX_EXTRAPOLATION_S past the last one and held after that.
+propagation.py accepts a track wherever it takes a fixed observer, and evaluates each time
+sample's topocentric transform against the observer position at that sample.
+
+Tracks come from a file, read by read_track(). The file is either a CSV with time, lat, lon and
+alt columns or an NMEA 0183 log. They can also come live from a GPS receiver's NMEA stream on a
+serial port, pty or FIFO; NmeaReader collects those fixes on a background thread.
+"""
+
+import calendar
+import collections
+import csv
+import datetime
+import os
+import stat
+import threading
+
+import numpy as np
+from skyfield.api import wgs84
+
+from propagation import _sgp4_dates
+
+MAX_EXTRAPOLATION_S = 900.0  # Dead reckoning past the last fix; a trajectory window's half width
+DEAD_RECKONING_BASELINE_S = 30.0  # Velocity for dead reckoning is taken over at least this long
+MAX_TRACK_FIXES = 36000  # Live fixes kept, 10 hours at 1 Hz
+NMEA_BAUD = 4800  # NMEA 0183 default
+UNIX_EPOCH_JD = 2440587.5
+
+
+class ObserverTrack:
+    """Timestamped positions of a moving observer"""
+    def __init__(self, times, lat, lon, alt_m, name=''):
+        """Hold a track's fixes
+
+        Args:
+            times (numpy.ndarray): Fix times, POSIX UTC seconds
+            lat (numpy.ndarray): Geodetic latitudes in degrees
+            lon (numpy.ndarray): Longitudes in degrees
+            alt_m (numpy.ndarray): Heights above the WGS84 ellipsoid in meters
+            name (str): Label for the track
+
+        Raises:
+            ValueError: If the track has no fixes
+        """
+        times = np.asarray(times, dtype=float)
+        if times.size == 0:
+            raise ValueError("a track needs at least one fix")
+        order = np.argsort(times, kind='stable')
+        self.times = times[order]
+        self.lat = np.asarray(lat, dtype=float)[order]
+        # Unwrapped, so interpolation across the antimeridian takes the short way round
+        self.lon = np.degrees(np.unwrap(np.radians(np.asarray(lon, dtype=float)[order])))
+        self.alt_m = np.asarray(alt_m, dtype=float)[order]
+        self.name = name
+
+    def __len__(self):
+        return len(self.times)
+
+    def __eq__(self, other):
+        return (isinstance(other, ObserverTrack) and len(self) == len(other)
+                and all(np.array_equal(a, b) for a, b in ((self.times, other.times), (self.lat, other.lat),
+                                                          (self.lon, other.lon), (self.alt_m, other.alt_m))))
+
+    __hash__ = None
+
+    def latest(self):
+        """(time, lat, lon, alt_m) of the last fix"""
+        return (float(self.times[-1]), float(self.lat[-1]), float((self.lon[-1] + 180.0) % 360.0 - 180.0),
+                float(self.alt_m[-1]))
+
+    def at(self, unix):
+        """Observer position at POSIX UTC times
+
+        Args:
+            unix (numpy.ndarray): Times, any shape
+
+        Returns:
+            tuple: (lat_deg, lon_deg, alt_m) arrays shaped like unix
+        """
+        t = np.asarray(unix, dtype=float)
+        columns = [np.interp(t, self.times, column) for column in (self.lat, self.lon, self.alt_m)]
+        if len(self.times) > 1:
+            # Dead-reckon at the velocity over the last DEAD_RECKONING_BASELINE_S of the track
+            base = max(np.searchsorted(self.times, self.times[-1] - DEAD_RECKONING_BASELINE_S, side='right') - 1, 0)
+            span = self.times[-1] - self.times[base]
+            if span > 0:
+                ahead = np.clip(t - self.times[-1], 0.0, MAX_EXTRAPOLATION_S)
+                for value, column in zip(columns, (self.lat, self.lon, self.alt_m)):
+                    value += ahead * ((column[-1] - column[base]) / span)
+        lat, lon, alt_m = columns
+        return np.clip(lat, -90.0, 90.0), (lon + 180.0) % 360.0 - 180.0, alt_m
+
+    def positions_at(self, times=None):
+        """The observer at each of a Skyfield time array's samples
+
+        Args:
+            times (skyfield.timelib.Time): Sample times; None gives every fix of the track
+
+        Returns:
+            skyfield.toposlib.GeographicPosition: With one coordinate per sample
+        """
+        if times is None:
+            lat, lon, alt_m = self.lat, self.lon, self.alt_m
+        else:
+            lat, lon, alt_m = self.at(posix_seconds(times))
+        return wgs84.latlon(np.atleast_1d(lat), np.atleast_1d(lon), elevation_m=np.atleast_1d(alt_m))
+
+
+def posix_seconds(times):
+    """Skyfield Time -> POSIX UTC seconds (no leap seconds), as SGP4's UTC dates"""
+    jd, fr = _sgp4_dates(times)
+    return (jd - UNIX_EPOCH_JD) * 86400.0 + fr * 86400.0
+
+
+def _nmea_angle(value, hemisphere):
+    """ddmm.mmmm / dddmm.mmmm and N/S/E/W -> signed degrees"""
+    degrees_length = value.index('.') - 2 if '.' in value else len(value) - 2
+    angle = float(value[:degrees_length]) + float(value[degrees_length:]) / 60.0
+    return -angle if hemisphere in ('S', 'W') else angle
+
+
+def _nmea_seconds(value):
+    """hhmmss.ss -> seconds of the day"""
+    return int(value[0:2]) * 3600 + int(value[2:4]) * 60 + float(value[4:])
+
+
+def parse_nmea(lines, date=None):
+    """Fixes from NMEA 0183 sentences
+
+    GGA sentences give the fixes: position, and height as altitude above mean sea level plus the
+    geoid separation. RMC sentences give the date, which GGA lacks, and stand in as fixes (at the
+    last known height) once two arrive with no GGA between them. Fixes before the first date are
+    dropped unless one is given. Sentences with a bad checksum and fixes flagged invalid are skipped.
+
+    Args:
+        lines (iterable): Sentences, str or bytes
+        date (datetime.date): UTC date of fixes before the first RMC, if known
+
+    Yields:
+        tuple: (unix_time, lat_deg, lon_deg, alt_m)
+    """
+    day = calendar.timegm(date.timetuple()) if date is not None else None
+    last_seconds = None
+    alt_m = 0.0
+    rmc_only = False  # No GGA since the previous RMC
+    seen_rmc = False
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('ascii', 'replace')
+        line = line.strip()
+        start = line.find('$')
+        if start < 0:
+            continue
+        body, _, checksum = line[start + 1:].partition('*')
+        if checksum:
+            expected = 0
+            for char in body:
+                expected ^= ord(char)
+            try:
+                if int(checksum[:2], 16) != expected:
+                    continue
+            except ValueError:
+                continue
+        fields = body.split(',')
+        kind = fields[0][-3:]
+        try:
+            if kind == 'RMC' and len(fields) > 9:
+                if fields[9]:
+                    day = calendar.timegm(datetime.datetime.strptime(fields[9], '%d%m%y').timetuple())
+                    last_seconds = None
+                rmc_only, seen_rmc = seen_rmc, True
+                if not rmc_only or fields[2] != 'A' or day is None:
+                    continue
+                lat = _nmea_angle(fields[3], fields[4])
+                lon = _nmea_angle(fields[5], fields[6])
+            elif kind == 'GGA' and len(fields) > 11:
+                if not fields[6] or fields[6] == '0' or not fields[2]:
+                    continue
+                seen_rmc = False
+                if day is None:
+                    continue
+                lat = _nmea_angle(fields[2], fields[3])
+                lon = _nmea_angle(fields[4], fields[5])
+                alt_m = float(fields[9] or 0.0) + float(fields[11] or 0.0)
+            else:
+                continue
+            seconds = _nmea_seconds(fields[1])
+        except ValueError:
+            continue
+        # GGA-only stretches carry the date across midnight themselves
+        if last_seconds is not None and seconds < last_seconds - 43200:
+            day += 86400
+        last_seconds = seconds
+        yield day + seconds, lat, lon, alt_m
+
+
+def _csv_time(row):
+    for column in ('utc', 'time', 'timestamp'):
+        value = row.get(column)
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                when = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+                if when.tzinfo is None:
+                    when = when.replace(tzinfo=datetime.timezone.utc)
+                return when.timestamp()
+    if row.get('unix_time'):
+        return float(row['unix_time'])
+    raise ValueError("no utc, time, timestamp or unix_time column")
+
+
+def read_track(path, date=None):
+    """Load a track file: an NMEA 0183 log, or a CSV with a header row
+
+    The CSV needs a time column (utc, time or timestamp: ISO 8601, UTC unless it carries an
+    offset, or POSIX seconds; or unix_time), lat/latitude and lon/longitude in degrees, and
+    optionally alt/alt_m/altitude in meters above the ellipsoid.
+
+    Args:
+        path (str): Track file
+        date (datetime.date): Date for NMEA fixes before the log's first RMC sentence
+
+    Returns:
+        ObserverTrack: The track
+
+    Raises:
+        ValueError: If the file holds no fixes
+    """
+    with open(path, 'r', errors='replace') as f:
+        first = ''
+        for first in f:
+            if first.strip():
+                break
+        f.seek(0)
+        if first.lstrip().startswith('$'):
+            fixes = list(parse_nmea(f, date))
+        else:
+            fixes = []
+            for row in csv.DictReader(f):
+                row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+                lat = row.get('lat') or row.get('latitude')
+                lon = row.get('lon') or row.get('longitude')
+                alt_m = row.get('alt') or row.get('alt_m') or row.get('altitude') or 0.0
+                fixes.append((_csv_time(row), float(lat), float(lon), float(alt_m)))
+    if not fixes:
+        raise ValueError(f"{path}: no position fixes")
+    return ObserverTrack(*np.array(fixes).T, name=os.path.basename(path))
+
+
+def is_live_source(path):
+    """True for a serial port, pty or FIFO, to be read with NmeaReader rather than read_track()"""
+    mode = os.stat(path).st_mode
+    return stat.S_ISCHR(mode) or stat.S_ISFIFO(mode)
+
+
+def _configure_serial(fd, baud):
+    """Raw mode at the receiver's baud rate, for a real serial port"""
+    import termios
+    import tty
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    attrs[4] = attrs[5] = getattr(termios, f'B{baud}')
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+class NmeaReader(threading.Thread):
+    """Collect fixes from a live NMEA stream on a background thread"""
+    def __init__(self, device, baud=NMEA_BAUD, max_fixes=MAX_TRACK_FIXES):
+        """Set up the reader; call start() to begin
+
+        Args:
+            device (str): Serial port, pty or FIFO the receiver writes to
+            baud (int): Line speed, applied when device is a terminal
+            max_fixes (int): Most recent fixes kept
+        """
+        super().__init__(name="nmea-reader", daemon=True)
+        self.device = device
+        self.baud = baud
+        self.fixes = collections.deque(maxlen=max_fixes)
+        self.error = None
+        self._lock = threading.Lock()
+
+    def run(self):
+        try:
+            with open(self.device, 'rb', buffering=0) as f:
+                if os.isatty(f.fileno()):
+                    _configure_serial(f.fileno(), self.baud)
+                for fix in parse_nmea(_read_lines(f), datetime.datetime.now(datetime.timezone.utc).date()):
+                    with self._lock:
+                        self.fixes.append(fix)
+        except Exception as e:
+            print(f"Debug: Error reading NMEA from {self.device}: {e}")
+            self.error = e
+
+    def latest(self):
+        """(time, lat, lon, alt_m) of the newest fix, or None before the first"""
+        with self._lock:
+            return self.fixes[-1] if self.fixes else None
+
+    def track(self):
+        """ObserverTrack of the fixes so far, or None before the first"""
+        with self._lock:
+            fixes = list(self.fixes)
+        return ObserverTrack(*np.array(fixes).T, name=os.path.basename(self.device)) if fixes else None
+
+
+def _read_lines(f):
+    """Lines from an unbuffered stream as they arrive; ends at EOF or when a pty's writer hangs up"""
+    pending = b''
+    while True:
+        try:
+            chunk = f.read(4096)
+        except OSError:  # EIO from a pty whose other end closed
+            return
+        if not chunk:
+            return
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        yield from lines
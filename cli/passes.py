@@ -0,0 +1,115 @@
+"""
+Catalog-wide pass event table with an on-disk cache.
+
+find_passes() (propagation.py) computes rise/culmination/set for every satellite over a window,
+which takes a while for the full catalog. The table is cached in ``pass_cache/<key>.npy``, keyed
+by a hash of the observer site, the packed TLE elements (so any epoch change invalidates it), the
+window and the elevation mask. Windows start on the hour and run one hour longer than requested,
+so the next `hours` from any moment within that hour are covered by the same cached table.
+"""
+
+import datetime
+import hashlib
+import os
+
+import numpy as np
+from skyfield.api import utc, wgs84
+
+from propagation import DEFAULT_PASS_STEP_S, PASS_DTYPE, find_passes, pack_elements
+
+PASS_CACHE_DIR = 'pass_cache'
+PASS_CACHE_KEEP = 8  # Most recent tables kept on disk
+DEFAULT_PASS_HOURS = 24.0
+
+
+def pass_window(now_utc=None, hours=DEFAULT_PASS_HOURS):
+    """(start_utc, hours) of the cached window covering the next `hours` from now_utc"""
+    now_utc = now_utc or datetime.datetime.now(utc)
+    return now_utc.replace(minute=0, second=0, microsecond=0), hours + 1.0
+
+
+def pass_cache_key(satellites, site, start_utc, hours, elevation_mask, step_s=DEFAULT_PASS_STEP_S):
+    """Hex digest identifying a pass table
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, in catalog order
+        site (tuple): Observer (lat_deg, lon_deg, alt_m)
+        start_utc (datetime.datetime): Window start
+        hours (float): Window length
+        elevation_mask (float): Mask the passes were found above
+        step_s (float): Coarse sampling step
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((tuple(round(float(x), 6) for x in site), start_utc.isoformat(), float(hours),
+                        float(elevation_mask), float(step_s))).encode())
+    digest.update(pack_elements(satellites).tobytes())
+    return digest.hexdigest()
+
+
+def load_passes(satellites, site, ts, now_utc=None, hours=DEFAULT_PASS_HOURS, elevation_mask=0.0,
+                cache_dir=PASS_CACHE_DIR, progress=None):
+    """Pass table for the next `hours`, from the cache when possible
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects
+        site (tuple): Observer (lat_deg, lon_deg, alt_m)
+        ts (skyfield.timelib.Timescale): Timescale used to build the time grid
+        now_utc (datetime.datetime): Current time, defaults to now
+        hours (float): How far ahead passes are needed
+        elevation_mask (float): Elevation in degrees a pass has to exceed
+        cache_dir (str): Directory holding the cached tables
+        progress (callable): Optional progress(done, total) callback, only called on a cache miss
+
+    Returns:
+        tuple: (passes, cached) with PASS_DTYPE records sorted by culmination time
+    """
+    start_utc, window_hours = pass_window(now_utc, hours)
+    key = pass_cache_key(satellites, site, start_utc, window_hours, elevation_mask)
+    path = os.path.join(cache_dir, key + '.npy')
+    try:
+        passes = np.load(path)
+        if passes.dtype == PASS_DTYPE:
+            os.utime(path)  # Keep recently used tables from being pruned
+            return passes, True
+    except (OSError, ValueError):
+        pass
+    observer = wgs84.latlon(site[0], site[1], elevation_m=site[2])
+    passes = find_passes(satellites, observer, ts, start_utc=start_utc, hours=window_hours,
+                         elevation_mask=elevation_mask, progress=progress)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, passes)
+        os.replace(tmp_path, path)
+        _prune_cache(cache_dir)
+    except OSError as e:
+        print(f"Debug: Could not write pass cache: {e}")
+    return passes, False
+
+
+def _prune_cache(cache_dir, keep=PASS_CACHE_KEEP):
+    tables = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.npy')]
+    tables.sort(key=os.path.getmtime, reverse=True)
+    for path in tables[keep:]:
+        os.remove(path)
+
+
+def upcoming_passes(passes, satnum, after_tt, count=3):
+    """The next `count` passes of one satellite that have not ended by after_tt
+
+    Args:
+        passes (numpy.ndarray): PASS_DTYPE table from load_passes()
+        satnum (int): NORAD catalog number
+        after_tt (float): TT Julian date, usually now
+        count (int): Maximum number of passes returned
+
+    Returns:
+        numpy.ndarray: PASS_DTYPE records in time order
+    """
+    mine = passes[passes['satnum'] == satnum]
+    ends = np.where(np.isnan(mine['set_tt']), np.inf, mine['set_tt'])
+    return mine[ends > after_tt][:count]
@@ -9,6 +9,9 @@ import numpy as np
 import cv2 as cv
 from matplotlib import pyplot as plt
 
+from ephemeris_file import AngularEphemeris, frame_times
+from image_kernels import detect_spots, gamma_correction, linear_transform
+
 # Logging setup
 logging.basicConfig(
         handlers=[RotatingFileHandler('./vis.log', backupCount=1)],
@@ -23,6 +26,7 @@ parser = argparse.ArgumentParser(
                     description='Post-process an image stack')
 parser.add_argument("--directory", type=str, help='Directory to process')
 parser.add_argument("--wait", type=int, help="Milliseconds of wait between frames")
+parser.add_argument("--ephemeris", type=str, help='Angular ephemeris (.aeph from track.py) to annotate frames with')
 args = parser.parse_args()
 
 
@@ -34,21 +38,12 @@ gamma = 0.1
 gamma_max = 200
 
 def basicLinearTransform(img_original):
-    res = cv.convertScaleAbs(img_original, alpha=alpha, beta=beta)
-    img_corrected = cv.hconcat([img_original, res])
+    img_corrected = linear_transform(img_original, alpha, beta)
     #cv.imshow("Brightness and contrast adjustments", img_corrected)
     return img_corrected
 
 def gammaCorrection(img_original):
-    ## [changing-contrast-brightness-gamma-correction]
-    lookUpTable = np.empty((1,256), np.uint8)
-    for i in range(256):
-        lookUpTable[0,i] = np.clip(pow(i / 255.0, gamma) * 255.0, 0, 255)
-
-    res = cv.LUT(img_original, lookUpTable)
-    ## [changing-contrast-brightness-gamma-correction]
-
-    img_gamma_corrected = cv.hconcat([img_original, res])
+    img_gamma_corrected = gamma_correction(img_original, gamma)
     #cv.imshow("Gamma correction", img_gamma_corrected)
     return img_gamma_corrected
 
@@ -69,6 +64,18 @@ def on_gamma_correction_trackbar(val):
 
 ##################################### MAIN #############################################
 files = os.listdir(args.directory)
+
+# Predicted alt/az/range at every frame's capture time, looked up in one call; only the ephemeris
+# pages around the frame times are read
+predicted = {}
+if args.ephemeris:
+    ephemeris = AngularEphemeris(args.ephemeris)
+    logging.info(f'Ephemeris: {ephemeris.name} ({ephemeris.satnum}), {len(ephemeris)} samples, TLE epoch {ephemeris.tle_epoch}')
+    frames = [file for file in files if (".PNG" in file or ".png" in file) and '.txt' not in file.lower()]
+    times = frame_times([os.path.join(args.directory, file) for file in frames])
+    for file, t, alt, az, rng in zip(frames, times, *ephemeris.interpolate(times)):
+        predicted[file] = (t, alt, az, rng)
+
 for file in files:
     if (".PNG" in file or ".png" in file) and '.txt' not in file.lower():
         logging.info(f'Processing {file}')
@@ -155,19 +162,12 @@ for file in files:
         #         cv.line(cl1,(x1,y1),(x2,y2),(0,0,255),2)
         
         # Pretty decent spot detector
-        # 12 = inverse ratio of accumulator resolution to image res. 1.5 is standard. 12 is quite big and filters out star streaks well.
-        # 70 = Min distance between detections. This helps weed out extraneous detections.
-        # param1 = 300 = gradient threshold for canny edge
-        # param2 = 0.85 = circle perfectness measure/filter
-        # minRadius/maxRadius = tune these depending on instantaneous field of view 2/8 works well for a 50mm guide scope.
-        circles = cv.HoughCircles(cl1,cv.HOUGH_GRADIENT,12,70,
-        param1=300,param2=0.85,minRadius=2,maxRadius=8)
+        circles = detect_spots(cl1)
         
         # Draw detected circles into the image(s)
         if circles is not None:
-            circles = np.uint16(np.around(circles))
             if type(circles) != None:
-                for i in circles[0,:]:
+                for i in circles:
                     # draw the outer circle
                     cv.circle(cl1,(i[0],i[1]),i[2],(255,255,0),2)
                     # draw the center of the circle
@@ -175,6 +175,14 @@ for file in files:
                     
         # Todo: implement a sequential spot tracker
 
+        if file in predicted:
+            t, alt, az, rng = predicted[file]
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t)) + f'.{int(t * 1000) % 1000:03d}Z'
+            label = (f'{stamp}  alt {alt:.3f}  az {az:.3f}  range {rng:.1f} km' if not np.isnan(alt) else
+                     f'{stamp}  outside ephemeris')
+            logging.info(f'Predicted: {label}')
+            cv.putText(cl1, label, (10, 20), cv.FONT_HERSHEY_SIMPLEX, 0.5, 255, 1, cv.LINE_AA)
+
         cv.imshow("original", cl1)
         #cv.imshow("processed", cl2)
         # cv.moveWindow("processed", x=int(xsize*1.125), y=int(ysize*0.1875))
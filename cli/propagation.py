@@ -0,0 +1,1194 @@
+"""
+Batch SGP4 propagation for a whole TLE catalog.
+
+Instead of asking Skyfield for ``(sat - observer).at(times)`` one satellite at a time,
+the catalog is packed into sgp4 ``SatrecArray`` blocks and every satellite is propagated
+over the full time grid in a handful of array operations. TEME positions are rotated into
+the Earth-fixed frame with GMST 1982 (the same rotation Skyfield applies for TEME) and then
+into the observer's local East-North-Up frame to get alt/az/range. Given a Sun table
+(sun_teme(), one per window) the same pass also evaluates a conical Earth-shadow model for every
+sample.
+
+precompute_trajectories wraps this for the tracking view and returns a columnar
+TrajectoryStore: one shared time axis and a float32 (satellite, sample) array per quantity,
+addressed by the satellite's catalog index. TrajectoryWindow keeps that window in a ring buffer
+and rolls it forward, propagating only the samples that are new. SGP4 runs at a per-satellite
+spacing picked from its angular rate (sample_strides()); the samples in between come from cubic
+Hermite interpolation of the TEME position, within a fixed bound in arcseconds. Given
+several observer sites, the window is propagated once and projected into each site's sky in one
+broadcast operation, giving one store per site. A site can also be a moving observer
+(observer_track.ObserverTrack), whose position is taken at each time sample.
+
+The module has no pygame dependency so it can run in the background worker process (see
+trajectory_worker.py). With workers > 1 it splits the catalog into shards and propagates them in
+a process pool. The shards travel as packed element arrays (sgp4 Satrec objects cannot be
+pickled) and write their rows straight into the store's block, allocated in shared memory.
+"""
+
+import concurrent.futures
+import datetime
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72
+from skyfield.api import load, utc, wgs84
+from skyfield.constants import DAY_S
+from skyfield.sgp4lib import TEME, theta_GMST1982
+
+# Satellites propagated per SatrecArray block. Bounds the (block, time, 3) temporaries.
+DEFAULT_BLOCK_SIZE = 1024
+# Satellites per process-pool shard when precompute_trajectories runs with workers > 1
+DEFAULT_SHARD_SIZE = 2048
+
+# Visibility pre-filter: coarse screening step and safety margins
+DEFAULT_SCREEN_STEP_S = 60.0
+SCREEN_ANGLE_MARGIN_DEG = 1.0  # Covers geodetic vs geocentric zenith and osculating vs mean inclination
+SCREEN_RADIUS_MARGIN_KM = 50.0  # Covers SGP4 short-period radius swings above the mean apogee
+SCREEN_MAX_ELEMENT_AGE_DAYS = 14.0  # Older elements skip the inclination screen
+MU_KM3_S2 = 398600.4418
+EARTH_ROTATION_RAD_S = 7.2921159e-5
+
+# TrajectoryStore columns. lit is the fraction of the solar disk seen from the satellite and eye
+# is 1.0 where it is sunlit, above the horizon and the observer's sky is dark.
+TRAJECTORY_COLUMNS = ('alt', 'az', 'range', 'px', 'py', 'lit', 'eye')
+TRAJECTORY_DTYPE = np.float32
+
+# Trajectory window: ±15 minutes in 900 samples, on a grid shared by every window a TrajectoryWindow rolls through
+WINDOW_HALF_WIDTH = datetime.timedelta(minutes=15)
+WINDOW_SAMPLES = 900
+WINDOW_STEP_S = 2 * WINDOW_HALF_WIDTH.total_seconds() / (WINDOW_SAMPLES - 1)
+
+# Adaptive sampling: SGP4 only runs every stride-th window sample, the stride chosen per satellite so
+# that cubic Hermite interpolation in between stays within the error bound (see sample_strides())
+DEFAULT_MAX_ERROR_ARCSEC = 1.0
+MAX_SAMPLE_STRIDE = 64  # 128 s between SGP4 samples at most
+HERMITE_SAFETY = 2.0  # Over the n_p^4 * r_p estimate of |d4r/dt4|, which the catalog stays within 13% of
+DEEP_SPACE_PERIOD_MIN = 225.0  # SDP4 from here on
+DEEP_SPACE_D4R_KM_S4 = 1e-7  # |d4r/dt4| floor for deep-space orbits, 10x the catalog's 99th percentile
+MIN_RANGE_KM = 80.0  # Closest any orbiting object comes to the observer
+# Knot velocities are central differences of SGP4 positions this far either side: SGP4's own velocity
+# is up to a few m/s off the derivative of its position (eccentric and decaying orbits), which
+# Hermite interpolation turns into an error growing only linearly with the stride
+KNOT_DIFFERENCE_S = 0.5
+
+# Conical shadow model and naked-eye visibility
+SUN_RADIUS_KM = 696000.0
+EARTH_RADIUS_KM = 6378.137
+EYE_SUN_ALTITUDE_DEG = -6.0  # Sun below civil twilight at the observer
+
+# Pass events: coarse sampling step, how far below the mask a sampled peak may sit and still be
+# refined (catches short passes that clear the mask between samples), refinement iterations
+DEFAULT_PASS_STEP_S = 60.0
+PASS_GRAZE_MARGIN_DEG = 3.0
+PASS_REFINE_ITERATIONS = 16
+
+# One pass over the observer. Times are TT Julian dates; rise_tt / set_tt are NaN when the pass is
+# already in progress at the start of the window / still in progress at its end.
+PASS_DTYPE = np.dtype([
+    ('satnum', 'i4'),
+    ('rise_tt', 'f8'),
+    ('rise_az', 'f4'),
+    ('max_tt', 'f8'),
+    ('max_alt', 'f4'),
+    ('max_az', 'f4'),
+    ('set_tt', 'f8'),
+    ('set_az', 'f4'),
+])
+
+# SGP4 mean elements, enough to rebuild a Satrec with sgp4init()
+ELEMENT_DTYPE = np.dtype([
+    ('satnum', 'i4'),
+    ('jdsatepoch', 'f8'),
+    ('jdsatepochF', 'f8'),
+    ('bstar', 'f8'),
+    ('ndot', 'f8'),
+    ('nddot', 'f8'),
+    ('ecco', 'f8'),
+    ('argpo', 'f8'),
+    ('inclo', 'f8'),
+    ('mo', 'f8'),
+    ('no_kozai', 'f8'),
+    ('nodeo', 'f8'),
+])
+
+
+class TrajectoryStore:
+    """Columnar trajectories for one window
+
+    All columns share the (T,) TT time axis and live in a single (column, satellite, sample)
+    float32 block; alt, az, range, px, py, lit and eye are (M, T) views into it. Row k belongs to
+    the satellite at catalog position indices[k]; row_of maps a catalog position back to its row,
+    or -1 for satellites the visibility pre-filter skipped.
+    """
+    def __init__(self, times_tt, indices, data, catalog_size):
+        self.times_tt = times_tt
+        self.indices = indices
+        self.data = data
+        self.row_of = np.full(catalog_size, -1, dtype=np.int64)
+        self.row_of[indices] = np.arange(len(indices))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getattr__(self, name):
+        if name in TRAJECTORY_COLUMNS:
+            return self.data[TRAJECTORY_COLUMNS.index(name)]
+        raise AttributeError(name)
+
+    @property
+    def nbytes(self):
+        return self.times_tt.nbytes + self.indices.nbytes + self.data.nbytes + self.row_of.nbytes
+
+
+class CatalogPropagator:
+    """Whole-catalog SGP4 propagator built on sgp4's SatrecArray"""
+    def __init__(self, satellites, block_size=DEFAULT_BLOCK_SIZE):
+        """Pack a list of satellites into SatrecArray blocks
+
+        Args:
+            satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+            block_size (int): Number of satellites propagated per SatrecArray call
+        """
+        self.models = [getattr(sat, 'model', sat) for sat in satellites]
+        self.block_size = block_size
+        self.blocks = [(i, min(i + block_size, len(self.models)), SatrecArray(self.models[i:i + block_size]))
+                       for i in range(0, len(self.models), block_size)]
+
+    def __len__(self):
+        return len(self.models)
+
+    def teme(self, times):
+        """Propagate every satellite over a time grid
+
+        Args:
+            times (skyfield.timelib.Time): Time array to propagate over
+
+        Returns:
+            tuple: (errors, r, v) with errors shaped (N, T) and TEME r, v shaped (N, T, 3) in km and km/s
+        """
+        jd, fr = _sgp4_dates(times)
+        errors = np.empty((len(self), len(jd)), dtype=np.uint8)
+        r = np.empty((len(self), len(jd), 3))
+        v = np.empty((len(self), len(jd), 3))
+        for start, stop, block in self.blocks:
+            errors[start:stop], r[start:stop], v[start:stop] = block.sgp4(jd, fr)
+        return errors, r, v
+
+    def teme_at(self, index, times):
+        """Propagate each of a list of satellites to its own time
+
+        SatrecArray only propagates every satellite to every time, so this makes one vectorized
+        sgp4_array call per distinct satellite instead.
+
+        Args:
+            index (numpy.ndarray): Catalog position of the satellite for each query
+            times (skyfield.timelib.Time): Time array, one time per query
+
+        Returns:
+            tuple: (errors, r, v) with errors shaped (Q,) and TEME r, v shaped (Q, 3) in km and km/s
+        """
+        jd, fr = _sgp4_dates(times)
+        errors = np.empty(len(index), dtype=np.uint8)
+        r = np.empty((len(index), 3))
+        v = np.empty((len(index), 3))
+        order = np.argsort(index, kind='stable')
+        for group in np.split(order, np.flatnonzero(np.diff(index[order])) + 1):
+            if len(group):
+                errors[group], r[group], v[group] = self.models[index[group[0]]].sgp4_array(jd[group], fr[group])
+        return errors, r, v
+
+    def altaz(self, observer, times, dtype=np.float64, progress=None, sun=None):
+        """Compute topocentric alt/az/range of every satellite from a fixed observer
+
+        Args:
+            observer (skyfield.toposlib.GeographicPosition): Observer, e.g. from wgs84.latlon()
+            times (skyfield.timelib.Time): Time array to propagate over
+            dtype (numpy.dtype): Output dtype for the alt/az/range arrays
+            progress (callable): Optional progress(done, total) callback, called after each block
+            sun (numpy.ndarray): Optional (T, 3) TEME Sun table from sun_teme()
+
+        Returns:
+            tuple: (alt_deg, az_deg, range_km), each shaped (N, T); NaN where SGP4 failed. With a
+                   sun table, a fourth (N, T) array holds the illumination() fraction.
+        """
+        jd, fr = _sgp4_dates(times)
+        theta, _ = theta_GMST1982(times.whole, times.ut1_fraction)
+        cos_t = np.cos(theta)
+        sin_t = np.sin(theta)
+        enu = _enu_matrix(observer)
+        obs_xyz = observer.itrs_xyz.km
+
+        alt = np.empty((len(self), len(jd)), dtype=dtype)
+        az = np.empty((len(self), len(jd)), dtype=dtype)
+        rng = np.empty((len(self), len(jd)), dtype=dtype)
+        lit = np.empty((len(self), len(jd)), dtype=dtype) if sun is not None else None
+        for start, stop, block in self.blocks:
+            errors, r, _ = block.sgp4(jd, fr)
+            block_alt, block_az, block_rng = _topocentric(r, cos_t, sin_t, enu, obs_xyz)
+            failed = errors != 0
+            block_alt[failed] = np.nan
+            block_az[failed] = np.nan
+            block_rng[failed] = np.nan
+            alt[start:stop] = block_alt
+            az[start:stop] = block_az
+            rng[start:stop] = block_rng
+            if lit is not None:
+                block_lit = illumination(r, sun)
+                block_lit[failed] = np.nan
+                lit[start:stop] = block_lit
+            if progress is not None:
+                progress(stop, len(self))
+        if lit is not None:
+            return alt, az, rng, lit
+        return alt, az, rng
+
+
+def sun_teme(ephemeris, times):
+    """Geocentric Sun position in the TEME frame for every sample of a window
+
+    Args:
+        ephemeris (ephemeris.EphemerisService): Shared ephemeris, e.g. get_ephemeris_service()
+        times (skyfield.timelib.Time): Time array of the window
+
+    Returns:
+        numpy.ndarray: (T, 3) positions in km
+    """
+    return ephemeris.positions('sun', times, frame=TEME)
+
+
+def illumination(r, sun):
+    """Fraction of the solar disk visible from each satellite position, conical Earth shadow
+
+    Compares the apparent radii of the Sun and the Earth seen from the satellite with their
+    angular separation; in the penumbra the fraction is the unobscured share of the solar disk.
+
+    Args:
+        r (numpy.ndarray): (..., T, 3) TEME satellite positions in km
+        sun (numpy.ndarray): (T, 3) TEME Sun positions in km, from sun_teme()
+
+    Returns:
+        numpy.ndarray: (..., T) fraction, 0 in the umbra and 1 in full sunlight
+    """
+    to_sun = sun - r
+    sun_dist = np.sqrt(np.sum(to_sun * to_sun, axis=-1))
+    r_norm = np.sqrt(np.sum(r * r, axis=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = np.arcsin(np.minimum(SUN_RADIUS_KM / sun_dist, 1.0))  # Apparent solar radius
+        b = np.arcsin(np.minimum(EARTH_RADIUS_KM / r_norm, 1.0))  # Apparent Earth radius
+        c = np.arccos(np.clip(-np.sum(r * to_sun, axis=-1) / (r_norm * sun_dist), -1.0, 1.0))
+        # Partial overlap of two discs with radii a, b whose centres are c apart
+        x = (c * c + a * a - b * b) / (2 * c)
+        y = np.sqrt(np.maximum(a * a - x * x, 0.0))
+        overlap = (a * a * np.arccos(np.clip(x / a, -1.0, 1.0))
+                   + b * b * np.arccos(np.clip((c - x) / b, -1.0, 1.0)) - c * y)
+        lit = 1.0 - overlap / (np.pi * a * a)
+    lit = np.where(c >= a + b, 1.0, np.where(c <= b - a, 0.0, np.clip(lit, 0.0, 1.0)))
+    return lit
+
+
+def pack_elements(satellites):
+    """Pack satellites into an ELEMENT_DTYPE structured array
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+
+    Returns:
+        numpy.ndarray: One ELEMENT_DTYPE record per satellite
+    """
+    elements = np.empty(len(satellites), dtype=ELEMENT_DTYPE)
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    for name in ELEMENT_DTYPE.names:
+        elements[name] = [getattr(model, name) for model in models]
+    return elements
+
+
+def unpack_elements(elements):
+    """Rebuild sgp4 Satrec models from an ELEMENT_DTYPE array
+
+    Args:
+        elements (numpy.ndarray): Records produced by pack_elements(), or any array with those fields
+
+    Returns:
+        list: sgp4 Satrec models, in the same order
+    """
+    models = []
+    for rec in elements[list(ELEMENT_DTYPE.names)].tolist():
+        (satnum, jdsatepoch, jdsatepochF, bstar, ndot, nddot,
+         ecco, argpo, inclo, mo, no_kozai, nodeo) = rec
+        model = Satrec()
+        model.sgp4init(WGS72, 'i', satnum, (jdsatepoch - 2433281.5) + jdsatepochF,
+                       bstar, ndot, nddot, ecco, argpo, inclo, mo, no_kozai, nodeo)
+        # Keep the TLE's own epoch split so tsince matches twoline2rv()
+        model.jdsatepoch = jdsatepoch
+        model.jdsatepochF = jdsatepochF
+        models.append(model)
+    return models
+
+
+def visibility_prefilter(satellites, observer, times, elevation_mask, step_s=DEFAULT_SCREEN_STEP_S):
+    """Cheaply find the satellites that could rise above elevation_mask during a time window
+
+    Conservative screen run before the fine propagation: it may keep objects that never
+    actually clear the mask, but never drops one that does. Two stages:
+
+    1. Inclination/latitude: an orbit never reaches latitudes above its inclination, so the
+       observer must lie within the horizon cone (from the apogee radius) of that band.
+       Elements more than SCREEN_MAX_ELEMENT_AGE_DAYS from the window skip this stage.
+    2. Coarse propagation every step_s seconds: between samples the satellite's direction
+       moves at most (perigee angular rate + Earth rotation) * step_s / 2, so a satellite is
+       kept if at some sample its Earth central angle from the observer is within the
+       horizon cone plus that slack. Objects found outside their apogee radius (diverged
+       stale elements) are kept too.
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+        observer (skyfield.toposlib.GeographicPosition): Observer location, or a list of them to
+                                                         keep what could clear the mask from any;
+                                                         moving observers are screened along their
+                                                         track
+        times (skyfield.timelib.Time): Fine time grid the window spans
+        elevation_mask (float): Elevation in degrees the satellite has to exceed
+        step_s (float): Coarse propagation step in seconds
+
+    Returns:
+        numpy.ndarray: Boolean keep-mask, one entry per satellite
+    """
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    if not models:
+        return np.zeros(0, dtype=bool)
+    inclo = np.array([model.inclo for model in models])
+    ecco = np.array([model.ecco for model in models])
+    n_rad_s = np.array([model.no_kozai for model in models]) / 60.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a_km = np.cbrt(MU_KM3_S2 / n_rad_s ** 2)
+    apogee_km = a_km * (1 + ecco) + SCREEN_RADIUS_MARGIN_KM
+
+    ts = times.ts
+    steps = max(int(np.ceil((times.tt[-1] - times.tt[0]) * DAY_S / step_s)), 1)
+    coarse = ts.tt_jd(times.tt[0] + np.arange(steps + 1) * step_s / DAY_S)
+    # (site, xyz, coarse sample) observer positions; the coarse propagation below is shared by all sites
+    observers = observer if isinstance(observer, (list, tuple)) else [observer]
+    obs_xyz = _observer_xyzs([_observer_at(site, coarse) for site in observers])
+    obs_unit = obs_xyz / np.linalg.norm(obs_xyz, axis=1)[:, None]
+    # A moving observer is screened at its lowest radius and latitude, which widen the cone
+    obs_r = np.min(np.linalg.norm(obs_xyz, axis=1), axis=1)[:, None]
+    # Earth central angle at which a satellite at apogee sits exactly on the mask
+    mask = np.radians(max(elevation_mask, 0.0) - SCREEN_ANGLE_MARGIN_DEG)
+    with np.errstate(invalid='ignore'):
+        cone = np.arccos(np.clip(obs_r * np.cos(mask) / apogee_km, -1.0, 1.0)) - mask
+    cone = np.where(apogee_km > obs_r, cone, 0.0)
+    margin = np.radians(SCREEN_ANGLE_MARGIN_DEG)
+
+    # Stage 1: inclination band vs observer geocentric latitude
+    max_lat = np.minimum(inclo, np.pi - inclo)
+    obs_lat = np.min(np.arcsin(np.abs(obs_unit[:, 2])), axis=1)[:, None]
+    # Long-stale elements (decayed objects) can wander off their mean orbit, so only fresh ones are screened here
+    epoch = np.array([model.jdsatepoch + model.jdsatepochF for model in models])
+    stale = np.abs(times.tt[len(times.tt) // 2] - epoch) > SCREEN_MAX_ELEMENT_AGE_DAYS
+    keep = (stale | np.any(obs_lat <= max_lat + cone + margin, axis=0)) & np.isfinite(a_km)
+    candidates = np.flatnonzero(keep)
+    if len(candidates) == 0:
+        return keep
+
+    # Stage 2: coarse propagation with an angular-rate slack between samples
+    jd, fr = _sgp4_dates(coarse)
+    theta, _ = theta_GMST1982(coarse.whole, coarse.ut1_fraction)
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    perigee_rate = n_rad_s * np.sqrt((1 + ecco) / (1 - ecco) ** 3)
+    slack = (perigee_rate * 1.05 + EARTH_ROTATION_RAD_S) * step_s / 2
+    # Plus half the largest angle a moving observer covers between coarse samples
+    with np.errstate(invalid='ignore'):
+        moved = np.arccos(np.clip(np.sum(obs_unit[:, :, 1:] * obs_unit[:, :, :-1], axis=1), -1.0, 1.0))
+    site_slack = np.max(moved, axis=1, initial=0.0) / 2
+    for start in range(0, len(candidates), DEFAULT_BLOCK_SIZE):
+        idx = candidates[start:start + DEFAULT_BLOCK_SIZE]
+        errors, r, _ = SatrecArray([models[i] for i in idx]).sgp4(jd, fr)
+        x = cos_t * r[..., 0] + sin_t * r[..., 1]
+        y = -sin_t * r[..., 0] + cos_t * r[..., 1]
+        z = r[..., 2]
+        with np.errstate(invalid='ignore'):
+            radius = np.sqrt(x * x + y * y + z * z)
+            near = np.zeros(len(idx), dtype=bool)
+            for unit, site_cone, moving in zip(obs_unit, cone, site_slack):
+                cos_psi = (x * unit[0] + y * unit[1] + z * unit[2]) / radius
+                psi = np.arccos(np.clip(cos_psi, -1.0, 1.0))
+                near |= np.any(psi <= (site_cone[idx] + slack[idx] + moving)[:, None], axis=1)
+            # Stale elements of decayed objects can diverge far outside their mean orbit, where
+            # the cone and slack no longer bound them
+            diverged = np.any(radius > apogee_km[idx, None], axis=1)
+        # Partially failed propagations are kept for the fine pass to sort out
+        failed = errors != 0
+        partial = failed.any(axis=1) & ~failed.all(axis=1)
+        keep[idx] = near | diverged | partial
+    return keep
+
+
+def _sgp4_dates(times):
+    """Split a Skyfield Time into the (jd, fraction) UTC pair SGP4 expects, as Skyfield does"""
+    jd = np.atleast_1d(times.whole)
+    fr = np.atleast_1d(times.tai_fraction - times._leap_seconds() / DAY_S)
+    return jd, fr
+
+
+def _topocentric(r, cos_t, sin_t, enu, obs_xyz):
+    """TEME positions (..., 3) -> alt/az in degrees and range in km, given cos/sin of GMST broadcast to (...)"""
+    # TEME -> pseudo Earth fixed (rotate by -GMST), relative to the observer
+    x = cos_t * r[..., 0] + sin_t * r[..., 1] - obs_xyz[0]
+    y = -sin_t * r[..., 0] + cos_t * r[..., 1] - obs_xyz[1]
+    z = r[..., 2] - obs_xyz[2]
+    e = enu[0, 0] * x + enu[0, 1] * y
+    n = enu[1, 0] * x + enu[1, 1] * y + enu[1, 2] * z
+    u = enu[2, 0] * x + enu[2, 1] * y + enu[2, 2] * z
+    horizontal = np.hypot(e, n)
+    alt = np.degrees(np.arctan2(u, horizontal))
+    az = np.degrees(np.arctan2(e, n)) % 360.0
+    rng = np.sqrt(horizontal * horizontal + u * u)
+    return alt, az, rng
+
+
+def _topocentric_sites(r, cos_t, sin_t, enus, obs_xyzs):
+    """_topocentric() from S observers at once, rotating r into the Earth-fixed frame only once
+
+    The observers' last axis is time: length 1 for fixed sites, or one entry per sample of r's
+    last leading axis when a site moves.
+
+    Args:
+        r (numpy.ndarray): (..., T, 3) TEME positions
+        cos_t, sin_t (numpy.ndarray): cos/sin of GMST, broadcastable to r's leading shape
+        enus (numpy.ndarray): (S, 3, 3, T or 1) East-North-Up rotations, from _enu_matrices()
+        obs_xyzs (numpy.ndarray): (S, 3, T or 1) observer Earth-fixed positions in km, from _observer_xyzs()
+
+    Returns:
+        tuple: (alt_deg, az_deg, range_km), each shaped (S, ..., T)
+    """
+    x = cos_t * r[..., 0] + sin_t * r[..., 1]
+    y = -sin_t * r[..., 0] + cos_t * r[..., 1]
+    z = r[..., 2]
+    per_site = (len(obs_xyzs),) + (1,) * (x.ndim - 1) + (obs_xyzs.shape[-1],)
+    x = x - obs_xyzs[:, 0].reshape(per_site)
+    y = y - obs_xyzs[:, 1].reshape(per_site)
+    z = z - obs_xyzs[:, 2].reshape(per_site)
+    e = enus[:, 0, 0].reshape(per_site) * x + enus[:, 0, 1].reshape(per_site) * y
+    n = (enus[:, 1, 0].reshape(per_site) * x + enus[:, 1, 1].reshape(per_site) * y
+         + enus[:, 1, 2].reshape(per_site) * z)
+    u = (enus[:, 2, 0].reshape(per_site) * x + enus[:, 2, 1].reshape(per_site) * y
+         + enus[:, 2, 2].reshape(per_site) * z)
+    horizontal = np.hypot(e, n)
+    alt = np.degrees(np.arctan2(u, horizontal))
+    az = np.degrees(np.arctan2(e, n)) % 360.0
+    rng = np.sqrt(horizontal * horizontal + u * u)
+    return alt, az, rng
+
+
+def _enu_matrix(observer):
+    """Rotation from Earth-fixed XYZ into the observer's East-North-Up frame, (3, 3) or (3, 3, T) for array coordinates"""
+    lat = observer.latitude.radians
+    lon = observer.longitude.radians
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    sin_lon, cos_lon = np.sin(lon), np.cos(lon)
+    return np.array([
+        [-sin_lon, cos_lon, np.zeros_like(lon)],
+        [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat],
+        [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat],
+    ])
+
+
+def plot_xy(alt, az, plot_rect):
+    """Sky plot pixel coordinates of alt/az in degrees: zenith at the center, horizon 50 px inside the edge
+
+    Args:
+        alt (numpy.ndarray): Altitudes in degrees
+        az (numpy.ndarray): Azimuths in degrees, north up and east right
+        plot_rect (tuple): (sub_x, sub_y, sub_width, sub_height) of the sky plot
+
+    Returns:
+        tuple: (px, py) arrays shaped like alt
+    """
+    sub_x, sub_y, sub_width, sub_height = plot_rect
+    cx = sub_x + sub_width // 2
+    cy = sub_y + sub_height // 2
+    radius = min(sub_width, sub_height) // 2 - 50
+    plot_r = (90 - alt) / 90 * radius
+    az_rad = np.radians(az)
+    return cx + plot_r * np.sin(az_rad), cy - plot_r * np.cos(az_rad)
+
+
+def angular_ephemeris(satellite, observer, times):
+    """Alt/az/range of one satellite and their rates of change, from SGP4 position and velocity
+
+    The rates are analytic rather than differences between samples: the TEME velocity is rotated
+    into the pseudo Earth-fixed frame, less the Earth's rotation at the GMST rate (as Skyfield's
+    TEME_to_ITRF does), and projected onto the observer's East-North-Up axes.
+
+    Args:
+        satellite (EarthSatellite): Satellite, or a raw sgp4 Satrec model
+        observer (skyfield.toposlib.GeographicPosition): Observer location
+        times (skyfield.timelib.Time): Time array to propagate over
+
+    Returns:
+        tuple: (alt_deg, az_deg, range_km, alt_rate_deg_s, az_rate_deg_s, range_rate_km_s), each
+               shaped (T,); NaN where SGP4 failed
+    """
+    jd, fr = _sgp4_dates(times)
+    errors, r, v = getattr(satellite, 'model', satellite).sgp4_array(jd, fr)
+    theta, theta_dot = theta_GMST1982(np.atleast_1d(times.whole), np.atleast_1d(times.ut1_fraction))
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    omega = theta_dot / DAY_S
+    enu = _enu_matrix(observer)
+    obs_xyz = observer.itrs_xyz.km
+
+    # TEME -> pseudo Earth fixed, position relative to the observer and velocity relative to the ground
+    x = cos_t * r[:, 0] + sin_t * r[:, 1]
+    y = -sin_t * r[:, 0] + cos_t * r[:, 1]
+    vx = cos_t * v[:, 0] + sin_t * v[:, 1] + omega * y
+    vy = -sin_t * v[:, 0] + cos_t * v[:, 1] - omega * x
+    vz = v[:, 2]
+    x = x - obs_xyz[0]
+    y = y - obs_xyz[1]
+    z = r[:, 2] - obs_xyz[2]
+    e = enu[0, 0] * x + enu[0, 1] * y
+    n = enu[1, 0] * x + enu[1, 1] * y + enu[1, 2] * z
+    u = enu[2, 0] * x + enu[2, 1] * y + enu[2, 2] * z
+    de = enu[0, 0] * vx + enu[0, 1] * vy
+    dn = enu[1, 0] * vx + enu[1, 1] * vy + enu[1, 2] * vz
+    du = enu[2, 0] * vx + enu[2, 1] * vy + enu[2, 2] * vz
+
+    horizontal2 = e * e + n * n
+    horizontal = np.sqrt(horizontal2)
+    rng2 = horizontal2 + u * u
+    rng = np.sqrt(rng2)
+    alt = np.degrees(np.arctan2(u, horizontal))
+    az = np.degrees(np.arctan2(e, n)) % 360.0
+    range_rate = (e * de + n * dn + u * du) / rng
+    with np.errstate(divide='ignore', invalid='ignore'):  # Azimuth rate is unbounded at the zenith
+        alt_rate = np.degrees((du * horizontal2 - u * (e * de + n * dn)) / (horizontal * rng2))
+        az_rate = np.degrees((de * n - e * dn) / horizontal2)
+    columns = (alt, az, rng, alt_rate, az_rate, range_rate)
+    failed = errors != 0
+    for column in columns:
+        column[failed] = np.nan
+    return columns
+
+
+def precompute_trajectories(satellites, observer, ts, sub_x, sub_y, sub_width, sub_height, start_utc=None,
+                            progress=None, workers=1, shard_size=DEFAULT_SHARD_SIZE, elevation_mask=None,
+                            ephemeris=None, max_error_arcsec=DEFAULT_MAX_ERROR_ARCSEC):
+    """Propagate the ±15 minute window for every satellite and project it onto the polar plot
+
+    One-shot form of TrajectoryWindow; keep a TrajectoryWindow around instead to move the window
+    forward without re-propagating the samples it keeps.
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects
+        observer (skyfield.toposlib.GeographicPosition): Observer location, or a list of them to
+                                                         project the same propagation into each; an
+                                                         observer_track.ObserverTrack for a moving one
+        ts (skyfield.timelib.Timescale): Timescale used to build the time grid
+        sub_x, sub_y, sub_width, sub_height (int): Plot area the pixel coordinates are computed for
+        start_utc (datetime.datetime): Window center, defaults to now
+        progress (callable): Optional progress(done, total) callback
+        workers (int): Processes to shard the catalog across; 1 propagates in-process, None uses every core
+        shard_size (int): Satellites per shard when workers > 1
+        elevation_mask (float): If given, skip satellites visibility_prefilter() rules out above this elevation
+        ephemeris (ephemeris.EphemerisService): Sun positions for the shadow model; without it the
+                                                lit column is NaN and eye is 0
+        max_error_arcsec (float): Interpolation error bound for adaptive sampling; None runs SGP4 at every sample
+
+    Returns:
+        TrajectoryStore: Columnar alt/az/range/px/py/lit/eye arrays for the propagated satellites;
+                         for a list of observers, a list with one store per site, sharing rows
+    """
+    window = TrajectoryWindow(satellites, observer, ts, (sub_x, sub_y, sub_width, sub_height), workers=workers,
+                              shard_size=shard_size, elevation_mask=elevation_mask, ephemeris=ephemeris,
+                              max_error_arcsec=max_error_arcsec)
+    return window.advance(start_utc, progress)
+
+
+class TrajectoryWindow:
+    """Rolling ±15 minute trajectory window, kept in a ring buffer over the time axis
+
+    Every window's samples lie on one fixed grid, WINDOW_STEP_S apart from the first window's
+    start, so a window moved forward shares all but its newest samples with the previous one.
+    advance() propagates only those new samples and writes them into the slots of the samples that
+    fell off the start; the (column, satellite, slot) block is never shifted. With an elevation
+    mask the satellite set rolls too: rows whose kept samples never come within
+    SCREEN_ANGLE_MARGIN_DEG of the mask are dropped, only the new span is screened for newcomers,
+    and newcomers get a full window.
+
+    Over several observer sites the ring gains a leading site axis, (site, column, satellite, slot).
+    Each satellite is propagated once for all of them; its row is kept while it can clear the mask
+    from any site. A moving observer (observer_track.ObserverTrack) is taken at its position at each
+    sample, at no extra propagation cost; the track has to stay the same while the window rolls.
+    """
+    def __init__(self, satellites, observer, ts, plot_rect, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                 elevation_mask=None, ephemeris=None, max_error_arcsec=DEFAULT_MAX_ERROR_ARCSEC):
+        """Set up an empty window; the first advance() propagates it in full
+
+        Args:
+            satellites (list): Skyfield EarthSatellite objects
+            observer (skyfield.toposlib.GeographicPosition): Observer location, an ObserverTrack, or a list of them
+            ts (skyfield.timelib.Timescale): Timescale used to build the time grid
+            plot_rect (tuple): (sub_x, sub_y, sub_width, sub_height) the pixel coordinates are computed for
+            workers (int): Processes to shard propagation across; 1 propagates in-process, None uses every core
+            shard_size (int): Satellites per shard when workers > 1
+            elevation_mask (float): If given, only satellites that can clear this elevation are propagated
+            ephemeris (ephemeris.EphemerisService): Sun positions for the shadow model
+            max_error_arcsec (float): Interpolation error bound for adaptive sampling; None (or 0) runs SGP4
+                                      at every sample
+        """
+        self.satellites = satellites
+        self.multi_site = isinstance(observer, (list, tuple))
+        self.observers = list(observer) if self.multi_site else [observer]
+        self.ts = ts
+        self.plot_rect = plot_rect
+        self.workers = workers
+        self.shard_size = shard_size
+        self.elevation_mask = elevation_mask
+        self.ephemeris = ephemeris
+        self.strides = None
+        if max_error_arcsec:
+            # The bound has to hold from every site; only the observer's radius enters it
+            self.strides = np.minimum.reduce([sample_strides(satellites, _observer_at(site, None), WINDOW_STEP_S,
+                                                             max_error_arcsec)
+                                              for site in self.observers])
+        self.anchor_tt = None  # TT of grid sample 0
+        self.first = None  # Grid sample at the start of the window
+        self.base = None  # Grid sample held in ring slot 0
+        self.indices = None
+        self.data = None
+        self.propagated = 0  # (satellite, sample) pairs the last advance() propagated
+
+    def advance(self, center_utc=None, progress=None):
+        """Move the window to be centred on center_utc, propagating only samples it did not hold
+
+        A window moved backwards, or forward by its full length or more, is propagated afresh.
+
+        Args:
+            center_utc (datetime.datetime): New window center, defaults to now
+            progress (callable): Optional progress(done, total) callback
+
+        Returns:
+            TrajectoryStore: The window in time order, or a list of one per site (see store())
+        """
+        center_utc = center_utc or datetime.datetime.now(utc)
+        start_tt = self.ts.utc(center_utc - WINDOW_HALF_WIDTH).tt
+        if self.anchor_tt is None:
+            self.anchor_tt = start_tt
+        first = int(round((start_tt - self.anchor_tt) * DAY_S / WINDOW_STEP_S))
+        shift = WINDOW_SAMPLES if self.data is None else first - self.first
+        if not 0 <= shift < WINDOW_SAMPLES:
+            self._fill(first, progress)
+        elif shift:
+            self._roll(first, progress)
+        else:
+            self.propagated = 0
+        return self.store()
+
+    def store(self):
+        """The current window as a time-ordered TrajectoryStore
+
+        Returns:
+            TrajectoryStore: Shares the ring's memory if the window starts at slot 0, else a copy.
+                             A window over a list of observers returns a list of stores, one per
+                             site, sharing the time axis and rows.
+        """
+        samples = np.arange(self.first, self.first + WINDOW_SAMPLES)
+        data = self.data
+        if self.first != self.base:
+            data = data[..., self._slots(samples)]
+        times_tt = self._grid_tt(samples)
+        stores = [TrajectoryStore(times_tt, self.indices, site_data, len(self.satellites)) for site_data in data]
+        return stores if self.multi_site else stores[0]
+
+    def _grid_tt(self, samples):
+        return self.anchor_tt + samples * (WINDOW_STEP_S / DAY_S)
+
+    def _slots(self, samples):
+        return (samples - self.base) % WINDOW_SAMPLES
+
+    def _fill(self, first, progress):
+        times = self.ts.tt_jd(self._grid_tt(np.arange(first, first + WINDOW_SAMPLES)))
+        if self.elevation_mask is None:
+            indices = np.arange(len(self.satellites))
+        else:
+            indices = np.flatnonzero(visibility_prefilter(self.satellites, self.observers, times,
+                                                          self.elevation_mask))
+        self.data = self._propagate(indices, times, progress)
+        self.indices = indices
+        self.first = self.base = first
+        self.propagated = len(indices) * WINDOW_SAMPLES
+
+    def _roll(self, first, progress):
+        new_samples = np.arange(self.first + WINDOW_SAMPLES, first + WINDOW_SAMPLES)
+        new_times = self.ts.tt_jd(self._grid_tt(new_samples))
+        indices, data = self.indices, self.data
+        rolled = None  # Rows carried over from the previous window; None when that is all of them
+        self.propagated = 0
+        if self.elevation_mask is not None:
+            kept_alts = data[:, 0][..., self._slots(np.arange(first, self.first + WINDOW_SAMPLES))]
+            # Near the mask from any site; partially failed rows stay, as in visibility_prefilter()
+            near = (np.any(kept_alts > self.elevation_mask - SCREEN_ANGLE_MARGIN_DEG, axis=(0, 2))
+                    | np.any(np.isnan(kept_alts), axis=(0, 2)))
+            screened = visibility_prefilter(self.satellites, self.observers, new_times, self.elevation_mask)
+            new_indices = np.union1d(indices[near], np.flatnonzero(screened))
+            if not np.array_equal(new_indices, indices):
+                retained = np.isin(new_indices, indices)
+                rolled = np.flatnonzero(retained)
+                data = np.empty((len(self.observers), len(TRAJECTORY_COLUMNS), len(new_indices), WINDOW_SAMPLES),
+                                dtype=TRAJECTORY_DTYPE)
+                data[:, :, rolled] = self.data[:, :, np.searchsorted(indices, new_indices[rolled])]
+                added = np.flatnonzero(~retained)
+                if len(added):
+                    samples = np.arange(first, first + WINDOW_SAMPLES)
+                    times = self.ts.tt_jd(self._grid_tt(samples))
+                    data[:, :, added[:, None], self._slots(samples)] = self._propagate(new_indices[added], times)
+                    self.propagated += len(added) * WINDOW_SAMPLES
+                indices = new_indices
+        slots = self._slots(new_samples)
+        if rolled is None:
+            data[..., slots] = self._propagate(indices, new_times, progress)
+            self.propagated += len(indices) * len(new_samples)
+        else:
+            data[:, :, rolled[:, None], slots] = self._propagate(indices[rolled], new_times, progress)
+            self.propagated += len(rolled) * len(new_samples)
+        self.indices, self.data, self.first = indices, data, first
+
+    def _propagate(self, indices, times, progress=None):
+        """(site, column, satellite, sample) block for the catalog positions in indices over times"""
+        sun = sun_alt = None
+        observers = [_observer_at(observer, times) for observer in self.observers]
+        if self.ephemeris is not None:
+            # One Sun table per call, shared by every satellite (and shard) and site
+            sun = sun_teme(self.ephemeris, times)
+            theta, _ = theta_GMST1982(times.whole, times.ut1_fraction)
+            sun_alt = _topocentric_sites(sun, np.cos(theta), np.sin(theta), _enu_matrices(observers),
+                                         _observer_xyzs(observers))[0]
+        strides = None
+        if self.strides is not None:
+            # The per-catalog strides only hold while the elements still describe the orbit
+            strides = np.where(diverged_elements([self.satellites[i] for i in indices], times), 1,
+                               self.strides[indices])
+        return _propagate_rows([self.satellites[i] for i in indices], observers, times, self.plot_rect, sun,
+                               sun_alt, progress, self.workers, self.shard_size, strides)
+
+
+def _observer_at(observer, times):
+    """A fixed observer as is; a moving one (observer_track.ObserverTrack) at each of times, or every fix for None"""
+    return observer.positions_at(times) if hasattr(observer, 'positions_at') else observer
+
+
+def _enu_matrices(observers):
+    """(S, 3, 3, T or 1) East-North-Up rotations; T when any observer has array coordinates"""
+    return np.stack(np.broadcast_arrays(*[_enu_matrix(observer).reshape(3, 3, -1) for observer in observers]))
+
+
+def _observer_xyzs(observers):
+    """(S, 3, T or 1) observer Earth-fixed positions in km"""
+    return np.stack(np.broadcast_arrays(*[observer.itrs_xyz.km.reshape(3, -1) for observer in observers]))
+
+
+def _propagate_rows(satellites, observers, times, plot_rect, sun, sun_alt, progress, workers, shard_size, strides):
+    """Propagate satellites over times into a new (site, column, satellite, sample) block, sharded if asked"""
+    shape = (len(observers), len(TRAJECTORY_COLUMNS), len(satellites), len(times.tt))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(satellites) <= shard_size:
+        data = np.empty(shape, dtype=TRAJECTORY_DTYPE)
+        _propagate_into(data, satellites, observers, times, plot_rect, sun, sun_alt, progress, strides)
+        return data
+
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(TRAJECTORY_DTYPE).itemsize)
+    try:
+        elements = pack_elements(satellites)
+        sites = [(observer.latitude.degrees, observer.longitude.degrees, observer.elevation.m) for observer in observers]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_propagate_shard, shm.name, shape, start, elements[start:start + shard_size],
+                                       sites, times.tt, plot_rect, sun, sun_alt,
+                                       None if strides is None else strides[start:start + shard_size])
+                       for start in range(0, len(satellites), shard_size)]
+            done = 0
+            for future in concurrent.futures.as_completed(futures):
+                done += future.result()
+                if progress is not None:
+                    progress(done, len(satellites))
+        data = np.ndarray(shape, dtype=TRAJECTORY_DTYPE, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return data
+
+
+def _propagate_shard(shm_name, shape, start, elements, sites, times_tt, plot_rect, sun, sun_alt, strides):
+    """Pool job: propagate one shard and write its rows into the shared trajectory block"""
+    times = load.timescale().tt_jd(times_tt)
+    observers = [wgs84.latlon(lat, lon, elevation_m=alt_m) for lat, lon, alt_m in sites]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray(shape, dtype=TRAJECTORY_DTYPE, buffer=shm.buf)
+        _propagate_into(data[:, :, start:start + len(elements)], unpack_elements(elements), observers, times,
+                        plot_rect, sun, sun_alt, strides=strides)
+        del data
+    finally:
+        shm.close()
+    return len(elements)
+
+
+def _propagate_into(out, satellites, observers, times, plot_rect, sun=None, sun_alt=None, progress=None,
+                    strides=None):
+    """Propagate satellites block by block into a (site, column, satellite, sample) view
+
+    Working one SatrecArray block at a time keeps the float64 temporaries to a block's worth
+    instead of the whole catalog's; blocks shrink with the number of sites, whose alt/az/range
+    temporaries they multiply. With strides, SGP4 runs at every strides[i]-th sample of
+    satellite i only and _teme_sampled() interpolates the rest; everything after the TEME position
+    is evaluated at every sample either way. The TEME positions and the shadow model are
+    computed once for all sites; only the topocentric projection is per site, in one broadcast.
+    observers have scalar coordinates, or one per sample for a moving observer; sun_alt is the
+    Sun's (site, sample) altitude.
+    """
+    theta, _ = theta_GMST1982(times.whole, times.ut1_fraction)
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    enus = _enu_matrices(observers)
+    obs_xyzs = _observer_xyzs(observers)
+    block_size = max(DEFAULT_BLOCK_SIZE // len(observers), 1)
+    for start in range(0, len(satellites), block_size):
+        stop = min(start + block_size, len(satellites))
+        if strides is None:
+            errors, r, _ = CatalogPropagator(satellites[start:stop]).teme(times)
+            failed = errors != 0
+        else:
+            failed, r = _teme_sampled(satellites[start:stop], times, strides[start:stop])
+        alts, azs, distances = _topocentric_sites(r, cos_t, sin_t, enus, obs_xyzs)
+        alts[:, failed] = np.nan
+        azs[:, failed] = np.nan
+        distances[:, failed] = np.nan
+        rows = out[:, :, start:stop]
+        rows[:, 0] = alts
+        rows[:, 1] = azs
+        rows[:, 2] = distances
+        # Precompute pixel coordinates for every sample at once
+        rows[:, 3], rows[:, 4] = plot_xy(alts, azs, plot_rect)
+        if sun is not None:
+            lit = illumination(r, sun)
+            lit[failed] = np.nan
+            rows[:, 5] = lit
+            # Naked-eye visible: sunlit, above the horizon, and the observer's sky is dark
+            rows[:, 6] = (lit > 0) & (alts > 0) & (sun_alt[:, None, :] < EYE_SUN_ALTITUDE_DEG)
+        else:
+            rows[:, 5] = np.nan
+            rows[:, 6] = 0.0
+        if progress is not None:
+            progress(stop, len(satellites))
+
+
+def sample_strides(satellites, observer, step_s, max_error_arcsec=DEFAULT_MAX_ERROR_ARCSEC,
+                   max_stride=MAX_SAMPLE_STRIDE, times=None):
+    """SGP4 sample spacing per satellite, in grid steps, for a given interpolation error bound
+
+    Between SGP4 samples h seconds apart, cubic Hermite interpolation of the TEME position is off
+    by at most h^4 / 384 * |d4r/dt4| per component, given velocities consistent with the positions
+    (_teme_sampled() differences them from SGP4 positions KNOT_DIFFERENCE_S either side of a knot). Across the catalog |d4r/dt4| of a near-Earth
+    orbit stays within a few percent of n_p^4 * r_p (perigee angular rate and radius), which
+    HERMITE_SAFETY covers; deep-space orbits, whose lunisolar and resonance terms are less smooth,
+    get at least DEEP_SPACE_D4R_KM_S4. Seen from the observer, a position error subtends at most
+    error / range, and the range is at least the perigee height above the observer. Strides are
+    powers of two, so the catalog shares a handful of SGP4 time grids: at the 1 arcsecond default
+    a 400 km LEO object is sampled every 32 steps and GEO objects every MAX_SAMPLE_STRIDE.
+
+    The bound rests on the mean elements, which only describe the SGP4 state near their epoch.
+    Given the window's times, satellites that diverged_elements() flags are sampled at every step.
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+        observer (skyfield.toposlib.GeographicPosition): Observer location; with array coordinates,
+                                                         the bound holds for each of them
+        step_s (float): Grid step in seconds
+        max_error_arcsec (float): Largest allowed direction error of an interpolated sample
+        max_stride (int): Upper bound on the stride
+        times (skyfield.timelib.Time): Window the strides are for; None trusts the elements everywhere
+
+    Returns:
+        numpy.ndarray: int64 stride per satellite, 1 ... max_stride
+    """
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    n_rad_s = np.array([model.no_kozai for model in models], dtype=float) / 60.0
+    ecco = np.array([model.ecco for model in models], dtype=float)
+    obs_r = np.max(np.linalg.norm(observer.itrs_xyz.km.reshape(3, -1), axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        perigee_km = np.cbrt(MU_KM3_S2 / n_rad_s ** 2) * (1 - ecco)
+        perigee_rate = n_rad_s * np.sqrt((1 + ecco) / (1 - ecco) ** 3)
+        d4r = HERMITE_SAFETY * perigee_rate ** 4 * perigee_km
+        deep = 2 * np.pi / n_rad_s >= DEEP_SPACE_PERIOD_MIN * 60
+        d4r = np.where(deep, np.maximum(d4r, DEEP_SPACE_D4R_KM_S4), d4r)
+        range_km = np.maximum(perigee_km - SCREEN_RADIUS_MARGIN_KM - obs_r, MIN_RANGE_KM)
+        allowed_km = np.radians(max_error_arcsec / 3600.0) * range_km
+        # |error| <= sqrt(3) * h^4 / 384 * |d4r/dt4|, summing the per-component bounds
+        h = (384 * allowed_km / (np.sqrt(3) * d4r)) ** 0.25
+        stride = np.exp2(np.floor(np.log2(h / step_s)))
+    stride = np.where(np.isfinite(stride), stride, 1)
+    if times is not None:
+        stride = np.where(diverged_elements(models, times), 1, stride)
+    return np.clip(stride, 1, max_stride).astype(np.int64)
+
+
+def diverged_elements(satellites, times):
+    """Satellites whose mean elements cannot be trusted to describe their SGP4 state over a window
+
+    That is elements more than SCREEN_MAX_ELEMENT_AGE_DAYS from the window's middle, or an SGP4
+    error or a radius outside the mean orbit (plus SCREEN_RADIUS_MARGIN_KM) at the window's first,
+    middle or last sample; decayed objects' stale elements do both.
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+        times (skyfield.timelib.Time): Time array of the window
+
+    Returns:
+        numpy.ndarray: bool per satellite
+    """
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    if not models:
+        return np.zeros(0, dtype=bool)
+    ecco = np.array([model.ecco for model in models])
+    n_rad_s = np.array([model.no_kozai for model in models]) / 60.0
+    epoch = np.array([model.jdsatepoch + model.jdsatepochF for model in models])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a_km = np.cbrt(MU_KM3_S2 / n_rad_s ** 2)
+    tt = times.tt[[0, len(times.tt) // 2, -1]]
+    diverged = (np.abs(tt[1] - epoch) > SCREEN_MAX_ELEMENT_AGE_DAYS) | ~np.isfinite(a_km)
+    errors, r, _ = CatalogPropagator(models).teme(times.ts.tt_jd(tt))
+    radius = np.linalg.norm(r, axis=2)
+    with np.errstate(invalid='ignore'):
+        outside = ((radius < (a_km * (1 - ecco) - SCREEN_RADIUS_MARGIN_KM)[:, None])
+                   | (radius > (a_km * (1 + ecco) + SCREEN_RADIUS_MARGIN_KM)[:, None]))
+    return diverged | np.any((errors != 0) | outside | ~np.isfinite(radius), axis=1)
+
+
+def hermite_interpolate(knot_t, r, v, t):
+    """Cubic Hermite interpolation of positions from samples with velocities, on any knot spacing
+
+    Args:
+        knot_t (numpy.ndarray): (K,) increasing knot times in seconds; steps may vary
+        r (numpy.ndarray): (..., K, 3) positions at the knots, in km
+        v (numpy.ndarray): (..., K, 3) velocities at the knots, in km/s
+        t (numpy.ndarray): (T,) query times in seconds, within [knot_t[0], knot_t[-1]]
+
+    Returns:
+        numpy.ndarray: (..., T, 3) interpolated positions
+    """
+    if len(knot_t) == 1:
+        return np.repeat(r, len(t), axis=-2)
+    k = _knot_interval(knot_t, t)
+    h = knot_t[k + 1] - knot_t[k]
+    u = (t - knot_t[k]) / h
+    u2 = u * u
+    u3 = u2 * u
+    h00 = (2 * u3 - 3 * u2 + 1)[:, None]
+    h10 = ((u3 - 2 * u2 + u) * h)[:, None]
+    h01 = (3 * u2 - 2 * u3)[:, None]
+    h11 = ((u3 - u2) * h)[:, None]
+    return h00 * r[..., k, :] + h10 * v[..., k, :] + h01 * r[..., k + 1, :] + h11 * v[..., k + 1, :]
+
+
+def _knot_interval(knot_t, t):
+    """Index k of the knot interval [knot_t[k], knot_t[k + 1]] holding each t"""
+    return np.clip(np.searchsorted(knot_t, t, side='right') - 1, 0, len(knot_t) - 2)
+
+
+def _teme_sampled(satellites, times, strides):
+    """TEME positions over times, from SGP4 at every strides[i]-th sample (and the last) of satellite i
+
+    Returns:
+        tuple: (failed, r) shaped (N, T) and (N, T, 3); a sample is failed if SGP4 failed at either
+               knot around it
+    """
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    jd, fr = _sgp4_dates(times)
+    count = len(jd)
+    # Seconds from the first sample, from the (whole, fraction) split to keep microseconds exact
+    t = ((jd - jd[0]) + (fr - fr[0])) * DAY_S
+    r = np.empty((len(models), count, 3))
+    failed = np.empty((len(models), count), dtype=bool)
+    offsets = np.array([0.0, -KNOT_DIFFERENCE_S, KNOT_DIFFERENCE_S]) / DAY_S
+    for stride in np.unique(strides).tolist():
+        members = np.flatnonzero(strides == stride)
+        array = SatrecArray([models[i] for i in members])
+        if stride == 1:  # Every sample is a knot
+            errors, r[members], _ = array.sgp4(jd, fr)
+            failed[members] = errors != 0
+            continue
+        knots = np.unique(np.append(np.arange(0, count, stride), count - 1))
+        # Each knot and a sample either side of it, for a velocity consistent with SGP4's positions
+        errors, knot_r, _ = array.sgp4(np.tile(jd[knots], 3), (fr[knots] + offsets[:, None]).ravel())
+        knot_r = knot_r.reshape(len(members), 3, len(knots), 3)
+        knot_v = (knot_r[:, 2] - knot_r[:, 1]) / (2 * KNOT_DIFFERENCE_S)
+        knot_failed = np.any(errors.reshape(len(members), 3, len(knots)) != 0, axis=1)
+        r[members] = hermite_interpolate(t[knots], knot_r[:, 0], knot_v, t)
+        if len(knots) == 1:
+            failed[members] = knot_failed
+        else:
+            k = _knot_interval(t[knots], t)
+            failed[members] = knot_failed[:, k] | knot_failed[:, k + 1]
+    return failed, r
+
+
+def find_passes(satellites, observer, ts, start_utc=None, hours=24.0, elevation_mask=0.0,
+                step_s=DEFAULT_PASS_STEP_S, progress=None):
+    """Rise, culmination and set of every pass of every satellite over a time window
+
+    The whole catalog is sampled every step_s seconds with the batch propagator. Mask crossings
+    between samples are then refined by bisection and sampled peaks by golden-section search, for
+    all satellites at once: each iteration propagates every pending event with
+    CatalogPropagator.teme_at(), one sgp4_array call per satellite. Peaks sampled up to
+    PASS_GRAZE_MARGIN_DEG below the mask are refined too, so passes that clear the mask only
+    between two samples are not lost.
+
+    Args:
+        satellites (list): Skyfield EarthSatellite objects, or raw sgp4 Satrec models
+        observer (skyfield.toposlib.GeographicPosition): Observer location
+        ts (skyfield.timelib.Timescale): Timescale used to build the time grid
+        start_utc (datetime.datetime): Window start, defaults to now
+        hours (float): Window length
+        elevation_mask (float): Elevation in degrees a pass has to exceed
+        step_s (float): Coarse sampling step in seconds
+        progress (callable): Optional progress(done, total) callback for the coarse pass
+
+    Returns:
+        numpy.ndarray: PASS_DTYPE records sorted by culmination time
+    """
+    models = [getattr(sat, 'model', sat) for sat in satellites]
+    if not models:
+        return np.zeros(0, dtype=PASS_DTYPE)
+    start_utc = start_utc or datetime.datetime.now(utc)
+    t0 = ts.utc(start_utc).tt
+    steps = max(int(np.ceil(hours * 3600 / step_s)), 1)
+    grid = t0 + np.arange(steps + 1) * (step_s / DAY_S)
+    coarse = ts.tt_jd(grid)
+
+    rises, sets, peaks = [], [], []
+    for start in range(0, len(models), DEFAULT_SHARD_SIZE):
+        alts, _, _ = CatalogPropagator(models[start:start + DEFAULT_SHARD_SIZE]).altaz(observer, coarse,
+                                                                                     dtype=np.float32)
+        alts[np.isnan(alts)] = -np.inf  # SGP4 failures count as below the horizon
+        up = alts > elevation_mask
+        # Rises/sets lie between samples k and k+1; passes in progress at either end of the window
+        # get a virtual rise at k = -1 / set at k = steps
+        row, k = np.nonzero(~up[:, :-1] & up[:, 1:])
+        rises.append((np.concatenate([row, np.flatnonzero(up[:, 0])]) + start,
+                      np.concatenate([k, np.full(up[:, 0].sum(), -1)])))
+        row, k = np.nonzero(up[:, :-1] & ~up[:, 1:])
+        sets.append((np.concatenate([row, np.flatnonzero(up[:, -1])]) + start,
+                     np.concatenate([k, np.full(up[:, -1].sum(), steps)])))
+        padded = np.pad(alts, ((0, 0), (1, 1)), constant_values=-np.inf)
+        centre = padded[:, 1:-1]
+        row, k = np.nonzero((centre >= padded[:, :-2]) & (centre > padded[:, 2:])
+                            & (centre > elevation_mask - PASS_GRAZE_MARGIN_DEG))
+        peaks.append((row + start, k, up[row, k]))
+        if progress is not None:
+            progress(min(start + DEFAULT_SHARD_SIZE, len(models)), len(models))
+    rise_sat, rise_k = (np.concatenate(a) for a in zip(*rises))
+    set_sat, set_k = (np.concatenate(a) for a in zip(*sets))
+    peak_sat, peak_k, peak_up = (np.concatenate(a) for a in zip(*peaks))
+    propagator = CatalogPropagator(models)
+    enu = _enu_matrix(observer)
+    obs_xyz = observer.itrs_xyz.km
+
+    def altaz_at(sat, tt):
+        """Alt/az in degrees and range in km of satellite sat[j] at TT tt[j]; NaN where SGP4 fails"""
+        if len(tt) == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        times = ts.tt_jd(tt)
+        errors, r, _ = propagator.teme_at(sat, times)
+        theta, _ = theta_GMST1982(times.whole, times.ut1_fraction)
+        alt, az, rng = _topocentric(r, np.cos(theta), np.sin(theta), enu, obs_xyz)
+        failed = errors != 0
+        alt[failed] = np.nan
+        az[failed] = np.nan
+        rng[failed] = np.nan
+        return alt, az, rng
+
+    # Culminations: golden-section search for the maximum around each sampled peak
+    lo = grid[np.maximum(peak_k - 1, 0)]
+    hi = grid[np.minimum(peak_k + 1, steps)]
+    inv_phi = (np.sqrt(5.0) - 1) / 2
+    c = hi - inv_phi * (hi - lo)
+    d = lo + inv_phi * (hi - lo)
+    fc = altaz_at(peak_sat, c)[0]
+    fd = altaz_at(peak_sat, d)[0]
+    for _ in range(PASS_REFINE_ITERATIONS):
+        left = fc > fd  # The maximum is in [lo, d]
+        hi = np.where(left, d, hi)
+        lo = np.where(left, lo, c)
+        probe = np.where(left, hi - inv_phi * (hi - lo), lo + inv_phi * (hi - lo))
+        f_probe = altaz_at(peak_sat, probe)[0]
+        c, d, fc, fd = (np.where(left, probe, d), np.where(left, c, probe),
+                        np.where(left, f_probe, fd), np.where(left, fc, f_probe))
+    peak_tt = (lo + hi) / 2
+    peak_alt, peak_az = altaz_at(peak_sat, peak_tt)[:2]
+    peak_alt = np.where(np.isnan(peak_alt), -np.inf, peak_alt)
+
+    # Grazing passes: the refined peak clears the mask although no sample around it does
+    interior = (peak_k > 0) & (peak_k < steps)
+    graze = ~peak_up & interior & (peak_alt > elevation_mask)
+    graze_sat = peak_sat[graze]
+
+    # Mask crossings: bisection, keeping lo on the side the search started from
+    cross_sat = np.concatenate([rise_sat, set_sat, graze_sat, graze_sat])
+    lo = np.concatenate([grid[np.maximum(rise_k, 0)], grid[np.maximum(set_k, 0)],
+                         grid[peak_k[graze] - 1], peak_tt[graze]])
+    hi = np.concatenate([grid[np.minimum(rise_k + 1, steps)], grid[np.minimum(set_k + 1, steps)],
+                         peak_tt[graze], grid[peak_k[graze] + 1]])
+    lo_up = np.concatenate([np.zeros(len(rise_sat), bool), np.ones(len(set_sat), bool),
+                            np.zeros(len(graze_sat), bool), np.ones(len(graze_sat), bool)])
+    for _ in range(PASS_REFINE_ITERATIONS):
+        mid = (lo + hi) / 2
+        mid_up = altaz_at(cross_sat, mid)[0] > elevation_mask
+        same = mid_up == lo_up
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+    cross_tt = (lo + hi) / 2
+    cross_az = altaz_at(cross_sat, cross_tt)[1]
+    n_rise, n_set, n_graze = len(rise_sat), len(set_sat), len(graze_sat)
+    rise_tt = np.where(rise_k < 0, np.nan, cross_tt[:n_rise])
+    rise_az = np.where(rise_k < 0, np.nan, cross_az[:n_rise])
+    set_tt = np.where(set_k >= steps, np.nan, cross_tt[n_rise:n_rise + n_set])
+    set_az = np.where(set_k >= steps, np.nan, cross_az[n_rise:n_rise + n_set])
+
+    # Sampled passes: rises and sets alternate per satellite, so sorted by (satellite, k) they pair up
+    rise_order = np.lexsort((rise_k, rise_sat))
+    set_order = np.lexsort((set_k, set_sat))
+    passes = np.zeros(n_rise + n_graze, dtype=PASS_DTYPE)
+    sampled = passes[:n_rise]
+    pass_sat = rise_sat[rise_order]
+    sampled['rise_tt'] = rise_tt[rise_order]
+    sampled['rise_az'] = rise_az[rise_order]
+    sampled['set_tt'] = set_tt[set_order]
+    sampled['set_az'] = set_az[set_order]
+    # Culmination: the highest sampled peak inside the pass, found by (satellite, k) key lookup
+    key_scale = steps + 2
+    pass_first = pass_sat * key_scale + rise_k[rise_order] + 1
+    inside = np.flatnonzero(peak_up)
+    owner = np.searchsorted(pass_first, peak_sat[inside] * key_scale + peak_k[inside], side='right') - 1
+    order = np.lexsort((peak_alt[inside], owner))
+    owner, inside = owner[order], inside[order]
+    highest = np.append(owner[1:] != owner[:-1], True)  # Last, i.e. highest, peak of each pass
+    best = np.full(n_rise, -1)
+    best[owner[highest]] = inside[highest]
+    sampled['max_tt'] = np.where(best >= 0, peak_tt[best], np.nan)
+    sampled['max_alt'] = np.where(best >= 0, peak_alt[best], np.nan)
+    sampled['max_az'] = np.where(best >= 0, peak_az[best], np.nan)
+
+    grazed = passes[n_rise:]
+    grazed['rise_tt'] = cross_tt[n_rise + n_set:n_rise + n_set + n_graze]
+    grazed['rise_az'] = cross_az[n_rise + n_set:n_rise + n_set + n_graze]
+    grazed['set_tt'] = cross_tt[n_rise + n_set + n_graze:]
+    grazed['set_az'] = cross_az[n_rise + n_set + n_graze:]
+    grazed['max_tt'] = peak_tt[graze]
+    grazed['max_alt'] = peak_alt[graze]
+    grazed['max_az'] = peak_az[graze]
+
+    satnums = np.array([model.satnum for model in models], dtype=np.int64)
+    passes['satnum'] = satnums[np.concatenate([pass_sat, graze_sat])]
+    return passes[np.argsort(passes['max_tt'], kind='stable')]
@@ -0,0 +1,370 @@
+"""
+PVT (position-velocity-time) ephemeris ingestion and TLE-difference analysis.
+
+Reads an externally supplied ephemeris for one satellite, either CCSDS OEM-style text or the
+memory-mappable binary variant this module writes (``.pvt``), interpolates it onto a time grid
+with vectorized Hermite or Lagrange interpolation, and compares it with the satellite's SGP4
+trajectory. pvt_difference() returns the radial / along-track / cross-track offsets (in the
+SGP4 orbit's frame), the angular separation seen from the observer, and the ephemeris's own
+alt/az and sky plot pixels, so main2.py can draw it as a second arc.
+
+OEM text is read line by line and converted in blocks of OEM_BLOCK_LINES data lines. Supported
+reference frames are TEME, Earth-fixed (ITRF*, treated as pseudo Earth-fixed: polar motion is
+ignored) and inertial (EME2000 / J2000 / GCRF / ICRF); time systems UTC, TAI, TT and GPS.
+Covariance blocks are skipped.
+
+Convert OEM text to the binary form with:
+    python cli/pvt.py ephemeris.oem ephemeris.pvt
+"""
+
+import argparse
+import datetime
+import os
+import struct
+
+import numpy as np
+from skyfield.api import load
+from skyfield.constants import DAY_S
+from skyfield.functions import mxv
+from skyfield.sgp4lib import TEME, theta_GMST1982
+
+from propagation import _enu_matrix, _observer_at, _sgp4_dates, _topocentric, hermite_interpolate, plot_xy
+
+PVT_SUFFIX = '.pvt'
+PVT_MAGIC = b'HCSKYPVT'
+PVT_VERSION = 1
+# magic, version, NORAD ID (-1 unknown), count, frame, object ID, name; padded to 128 bytes
+PVT_HEADER = struct.Struct('<8sIiQ16s24s24s36x')
+OEM_BLOCK_LINES = 65536
+INERTIAL_FRAMES = ('EME2000', 'J2000', 'GCRF', 'ICRF')
+TIME_SYSTEM_OFFSETS = {'UTC': 0.0, 'TAI': 0.0, 'TT': 0.0, 'GPS': 19.0}  # GPS = TAI - 19 s
+DEFAULT_LAGRANGE_ORDER = 8
+
+# One sample of pvt_difference(): the ephemeris's position relative to SGP4's at each grid time
+DIFFERENCE_DTYPE = np.dtype([
+    ('alt', 'f4'),      # Ephemeris alt/az in degrees, for the second arc
+    ('az', 'f4'),
+    ('px', 'f4'),
+    ('py', 'f4'),
+    ('radial', 'f4'),   # Ephemeris minus SGP4 in km, along SGP4's radial / in-track / cross-track axes
+    ('along', 'f4'),
+    ('cross', 'f4'),
+    ('angle', 'f4'),    # Separation seen from the observer, arcseconds
+])
+
+
+class PvtEphemeris:
+    """Position/velocity samples of one satellite in a single reference frame"""
+    def __init__(self, tt, r, v, frame, object_id='', name='', satnum=-1):
+        """Wrap sample arrays
+
+        Args:
+            tt (numpy.ndarray): (N,) increasing TT Julian dates
+            r (numpy.ndarray): (N, 3) positions in km
+            v (numpy.ndarray): (N, 3) velocities in km/s
+            frame (str): Reference frame, e.g. 'TEME', 'ITRF', 'EME2000'
+            object_id (str): OEM OBJECT_ID, usually the international designator
+            name (str): OEM OBJECT_NAME
+            satnum (int): NORAD catalog number, -1 if unknown
+        """
+        self.tt = tt
+        self.r = r
+        self.v = v
+        self.frame = frame.upper()
+        self.object_id = object_id
+        self.name = name
+        self.satnum = satnum
+        if not (self.frame == 'TEME' or self.frame.startswith('ITRF') or self.frame in INERTIAL_FRAMES):
+            raise ValueError(f"Unsupported PVT reference frame {frame}")
+
+    def __len__(self):
+        return len(self.tt)
+
+    def matches(self, satellite):
+        """Whether this ephemeris is for the given EarthSatellite, by NORAD ID or international designator"""
+        if self.satnum >= 0:
+            return satellite.model.satnum == self.satnum
+        # OEM OBJECT_IDs are designators like 1998-067A; TLEs carry them as 98067A
+        designator = self.object_id.strip().upper()
+        if len(designator) > 5 and designator[4] == '-':
+            designator = designator[2:4] + designator[5:]
+        return bool(designator) and satellite.model.intldesg.strip().upper() == designator
+
+    def positions(self, times, method='hermite', order=DEFAULT_LAGRANGE_ORDER):
+        """Positions interpolated onto times, rotated into TEME
+
+        Args:
+            times (skyfield.timelib.Time): Query times
+            method (str): 'hermite' (cubic, from positions and velocities) or 'lagrange'
+            order (int): Points per Lagrange interpolant
+
+        Returns:
+            numpy.ndarray: (T, 3) TEME positions in km; NaN outside the ephemeris's span
+        """
+        tt = np.atleast_1d(times.tt)
+        knot_s = (self.tt - self.tt[0]) * DAY_S
+        t = (tt - self.tt[0]) * DAY_S
+        if method == 'hermite':
+            r = hermite_interpolate(knot_s, self.r, self.v, t)
+        elif method == 'lagrange':
+            r = lagrange_interpolate(knot_s, self.r, t, order)
+        else:
+            raise ValueError(f"Unknown interpolation method {method}")
+        r[(t < knot_s[0]) | (t > knot_s[-1])] = np.nan
+        return self._to_teme(r, times)
+
+    def _to_teme(self, r, times):
+        if self.frame == 'TEME':
+            return r
+        if self.frame.startswith('ITRF'):
+            # Pseudo Earth-fixed -> TEME: rotate by +GMST, the inverse of _topocentric()'s rotation
+            theta, _ = theta_GMST1982(np.atleast_1d(times.whole), np.atleast_1d(times.ut1_fraction))
+            cos_t, sin_t = np.cos(theta), np.sin(theta)
+            return np.stack([cos_t * r[:, 0] - sin_t * r[:, 1], sin_t * r[:, 0] + cos_t * r[:, 1], r[:, 2]], axis=-1)
+        # Inertial frames are taken as GCRS, whose axes are the ICRS's (frame bias is milliarcseconds)
+        return mxv(TEME.rotation_at(times), r.T).T
+
+
+def lagrange_interpolate(knot_t, values, t, order=DEFAULT_LAGRANGE_ORDER):
+    """Lagrange interpolation of samples through the `order` knots around each query time
+
+    Args:
+        knot_t (numpy.ndarray): (K,) increasing knot times; steps may vary
+        values (numpy.ndarray): (K, D) samples at the knots
+        t (numpy.ndarray): (T,) query times
+        order (int): Knots per interpolant, capped at K
+
+    Returns:
+        numpy.ndarray: (T, D) interpolated values
+    """
+    order = min(order, len(knot_t))
+    k = np.clip(np.searchsorted(knot_t, t, side='right') - 1, 0, len(knot_t) - 1)
+    first = np.clip(k - (order // 2 - 1), 0, len(knot_t) - order)
+    idx = first[:, None] + np.arange(order)  # (T, order)
+    nodes = knot_t[idx]
+    offsets = t[:, None] - nodes
+    # weight_j = prod_{m != j} (t - t_m) / (t_j - t_m), with the m = j factor replaced by 1
+    diagonal = np.eye(order, dtype=bool)
+    numerator = np.where(diagonal, 1.0, offsets[:, None, :]).prod(axis=2)
+    denominator = np.where(diagonal, 1.0, nodes[:, :, None] - nodes[:, None, :]).prod(axis=2)
+    weights = numerator / denominator
+    return np.einsum('tj,tjd->td', weights, values[idx])
+
+
+def iter_oem(path, ts=None, block_lines=OEM_BLOCK_LINES):
+    """Stream an OEM text file as blocks of converted samples
+
+    Args:
+        path (str): OEM file
+        ts (skyfield.timelib.Timescale): Timescale for the epochs
+        block_lines (int): Data lines converted per block
+
+    Yields:
+        tuple: (metadata dict, tt (N,), r (N, 3), v (N, 3)) for each block of a data segment
+    """
+    ts = ts or load.timescale()
+    metadata = {}
+    block = []
+    in_meta = in_covariance = False
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('COMMENT'):
+                continue
+            if line == 'META_START':
+                if block:
+                    yield _oem_block(metadata, block, ts)
+                    block = []
+                in_meta = True
+                metadata = {}
+            elif line == 'META_STOP':
+                in_meta = False
+            elif line == 'COVARIANCE_START':
+                in_covariance = True
+            elif line == 'COVARIANCE_STOP':
+                in_covariance = False
+            elif in_meta:
+                key, _, value = line.partition('=')
+                metadata[key.strip()] = value.strip()
+            elif in_covariance or '=' in line:
+                continue  # Covariance rows and header keywords
+            else:
+                block.append(line)
+                if len(block) >= block_lines:
+                    yield _oem_block(metadata, block, ts)
+                    block = []
+    if block:
+        yield _oem_block(metadata, block, ts)
+
+
+def _oem_block(metadata, lines, ts):
+    """Convert OEM data lines (epoch x y z vx vy vz [ax ay az]) into TT and r, v arrays"""
+    if metadata.get('CENTER_NAME', 'EARTH').upper() != 'EARTH':
+        raise ValueError(f"PVT center {metadata['CENTER_NAME']} is not EARTH")
+    fields = [line.split() for line in lines]
+    epochs = [field[0] for field in fields]
+    try:
+        instants = np.array(epochs, dtype='datetime64[ns]')
+    except ValueError:
+        # Day-of-year epochs (2025-235T10:30:00) are not ISO calendar dates
+        instants = np.array([_parse_doy(epoch) for epoch in epochs], dtype='datetime64[ns]')
+    days = instants.astype('datetime64[D]')
+    seconds = (instants - days).astype(np.int64) / 1e9
+    day_numbers = (days - np.datetime64('1970-01-01', 'D')).astype(np.int64)
+    system = metadata.get('TIME_SYSTEM', 'UTC').upper()
+    if system not in TIME_SYSTEM_OFFSETS:
+        raise ValueError(f"Unsupported PVT time system {system}")
+    seconds = seconds + TIME_SYSTEM_OFFSETS[system]
+    builder = {'UTC': ts.utc, 'TAI': ts.tai, 'GPS': ts.tai, 'TT': ts.tt}[system]
+    tt = builder(1970, 1, 1 + day_numbers, 0, 0, seconds).tt
+    values = np.array([field[1:7] for field in fields], dtype=float)
+    return metadata, np.atleast_1d(tt), values[:, :3], values[:, 3:6]
+
+
+def _parse_doy(epoch):
+    date, _, clock = epoch.partition('T')
+    year, doy = date.split('-')
+    day = datetime.datetime(int(year), 1, 1) + datetime.timedelta(days=int(doy) - 1)
+    return np.datetime64(day.strftime('%Y-%m-%d') + 'T' + (clock or '00:00:00'))
+
+
+def read_oem(path, ts=None):
+    """Load a whole OEM text file into a PvtEphemeris
+
+    Segments are joined in time order; samples repeated at segment boundaries are kept once.
+
+    Args:
+        path (str): OEM file
+        ts (skyfield.timelib.Timescale): Timescale for the epochs
+
+    Returns:
+        PvtEphemeris: The ephemeris
+
+    Raises:
+        ValueError: On an unsupported frame, center or time system, segments in different
+                    frames, or a file without data
+    """
+    blocks = list(iter_oem(path, ts))
+    if not blocks:
+        raise ValueError(f"{path}: no ephemeris data")
+    frames = {metadata.get('REF_FRAME', 'TEME').upper() for metadata, _, _, _ in blocks}
+    if len(frames) > 1:
+        raise ValueError(f"{path}: segments in different frames ({', '.join(sorted(frames))})")
+    tt = np.concatenate([block[1] for block in blocks])
+    r = np.concatenate([block[2] for block in blocks])
+    v = np.concatenate([block[3] for block in blocks])
+    tt, unique = np.unique(tt, return_index=True)
+    metadata = blocks[0][0]
+    object_id = metadata.get('OBJECT_ID', '')
+    satnum = int(object_id) if object_id.isdigit() else -1
+    return PvtEphemeris(tt, r[unique], v[unique], frames.pop(), object_id, metadata.get('OBJECT_NAME', ''), satnum)
+
+
+def write_pvt(path, ephemeris):
+    """Write an ephemeris in the binary form: PVT_HEADER, then tt (N,) and r, v (N, 3) as float64"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PVT_HEADER.pack(PVT_MAGIC, PVT_VERSION, ephemeris.satnum, len(ephemeris), ephemeris.frame.encode('ascii'),
+                                ephemeris.object_id.encode('ascii', 'replace')[:24],
+                                ephemeris.name.encode('ascii', 'replace')[:24]))
+        for column in (ephemeris.tt, ephemeris.r, ephemeris.v):
+            f.write(np.ascontiguousarray(column, dtype=np.float64).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_pvt(path):
+    """Memory-map a binary ephemeris written by write_pvt()
+
+    Raises:
+        ValueError: If the file is not a binary PVT ephemeris, or is truncated
+    """
+    with open(path, 'rb') as f:
+        header = f.read(PVT_HEADER.size)
+    try:
+        magic, version, satnum, count, frame, object_id, name = PVT_HEADER.unpack(header)
+    except struct.error:
+        raise ValueError(f"{path}: not a binary PVT ephemeris")
+    if magic != PVT_MAGIC or version != PVT_VERSION:
+        raise ValueError(f"{path}: not a binary PVT ephemeris (version {PVT_VERSION})")
+    if os.path.getsize(path) != PVT_HEADER.size + count * 7 * 8:
+        raise ValueError(f"{path}: truncated")
+    data = np.memmap(path, dtype=np.float64, mode='r', offset=PVT_HEADER.size, shape=(7 * count,))
+    return PvtEphemeris(data[:count], data[count:4 * count].reshape(count, 3), data[4 * count:].reshape(count, 3),
+                        frame.rstrip(b'\0').decode('ascii'), object_id.rstrip(b'\0').decode('ascii', 'replace'),
+                        name.rstrip(b'\0').decode('ascii', 'replace'), satnum)
+
+
+def load_pvt(path, ts=None):
+    """Binary (.pvt) or OEM text ephemeris, by file contents"""
+    with open(path, 'rb') as f:
+        binary = f.read(len(PVT_MAGIC)) == PVT_MAGIC
+    return read_pvt(path) if binary else read_oem(path, ts)
+
+
+def pvt_difference(ephemeris, satellite, observer, times, plot_rect, method='hermite'):
+    """The ephemeris against a satellite's SGP4 trajectory over a time grid
+
+    Args:
+        ephemeris (PvtEphemeris): The supplied ephemeris
+        satellite (EarthSatellite): The same object's TLE
+        observer (skyfield.toposlib.GeographicPosition): Observer location, or an ObserverTrack
+        times (skyfield.timelib.Time): Time grid, e.g. ts.tt_jd(store.times_tt)
+        plot_rect (tuple): (sub_x, sub_y, sub_width, sub_height) of the sky plot
+        method (str): Ephemeris interpolation, 'hermite' or 'lagrange'
+
+    Returns:
+        numpy.ndarray: DIFFERENCE_DTYPE records, one per time; NaN outside the ephemeris's span
+                       or where SGP4 failed
+    """
+    r_pvt = ephemeris.positions(times, method)
+    jd, fr = _sgp4_dates(times)
+    errors, r_tle, v_tle = satellite.model.sgp4_array(jd, fr)
+    r_tle[errors != 0] = np.nan
+
+    # Radial / in-track / cross-track axes of the SGP4 orbit
+    radial = r_tle / np.linalg.norm(r_tle, axis=1, keepdims=True)
+    cross = np.cross(r_tle, v_tle)
+    cross /= np.linalg.norm(cross, axis=1, keepdims=True)
+    along = np.cross(cross, radial)
+    delta = r_pvt - r_tle
+
+    theta, _ = theta_GMST1982(np.atleast_1d(times.whole), np.atleast_1d(times.ut1_fraction))
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    observer = _observer_at(observer, times)
+    enu = _enu_matrix(observer)
+    obs_xyz = observer.itrs_xyz.km
+    alt, az, _ = _topocentric(r_pvt, cos_t, sin_t, enu, obs_xyz)
+    tle_alt, tle_az, _ = _topocentric(r_tle, cos_t, sin_t, enu, obs_xyz)
+    alt1, az1, alt2, az2 = (np.radians(x) for x in (alt, az, tle_alt, tle_az))
+    haversine = np.sin((alt2 - alt1) / 2) ** 2 + np.cos(alt1) * np.cos(alt2) * np.sin((az2 - az1) / 2) ** 2
+
+    out = np.empty(len(jd), dtype=DIFFERENCE_DTYPE)
+    out['alt'] = alt
+    out['az'] = az
+    out['px'], out['py'] = plot_xy(alt, az, plot_rect)
+    out['radial'] = np.einsum('ij,ij->i', delta, radial)
+    out['along'] = np.einsum('ij,ij->i', delta, along)
+    out['cross'] = np.einsum('ij,ij->i', delta, cross)
+    out['angle'] = np.degrees(2 * np.arcsin(np.sqrt(np.clip(haversine, 0.0, 1.0)))) * 3600
+    return out
+
+
+def main():
+    """Convert an OEM text ephemeris to the binary form"""
+    parser = argparse.ArgumentParser(
+                    prog='pvt.py',
+                    description='Convert a CCSDS OEM text ephemeris to the memory-mappable binary PVT form')
+    parser.add_argument("oem", type=str, help='OEM text file')
+    parser.add_argument("output", type=str, nargs='?', default=None, help=f'Binary file, default <oem>{PVT_SUFFIX}')
+    parser.add_argument("--norad", type=int, default=None, help='NORAD ID, if OBJECT_ID is a designator')
+    args = parser.parse_args()
+    ephemeris = read_oem(args.oem)
+    if args.norad is not None:
+        ephemeris.satnum = args.norad
+    output = args.output or os.path.splitext(args.oem)[0] + PVT_SUFFIX
+    write_pvt(output, ephemeris)
+    print(f"Debug: {len(ephemeris)} samples of {ephemeris.name or ephemeris.object_id} ({ephemeris.frame}) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Fast-start helpers for main2.py.
+
+The menu window comes up before the TLE catalog exists: CatalogLoader refreshes and loads the
+catalog on a background thread, importing the heavy modules it needs (skyfield, sgp4, requests,
+the trajectory worker) there, while the main thread is already drawing interactive frames. Status
+lines are handed back through a queue for the menu's status area.
+
+StartupProfile records how long each startup phase took, on whichever thread ran it, and prints
+the breakdown for main2.py --profile-startup.
+"""
+
+import contextlib
+import os
+import queue
+import threading
+import time
+
+
+class StartupProfile:
+    """Wall-clock timings of named startup phases, relative to one origin"""
+    def __init__(self, origin=None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.events = []  # (name, start_s, duration_s, thread name)
+        self._lock = threading.Lock()
+        self._laps = {}
+
+    def record(self, name, start, duration=0.0):
+        with self._lock:
+            self.events.append((name, start - self.origin, duration, threading.current_thread().name))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start)
+
+    def lap(self, name):
+        """Record the phase that ran on this thread since its previous lap (or the origin)"""
+        now = time.perf_counter()
+        start = self._laps.get(threading.get_ident(), self.origin)
+        self._laps[threading.get_ident()] = now
+        self.record(name, start, now - start)
+
+    def report(self):
+        """Print the breakdown in start order"""
+        print("Debug: Startup profile (ms since launch)")
+        for name, start, duration, thread in sorted(self.events, key=lambda event: event[1]):
+            print(f"Debug:   {start * 1e3:8.1f}  {duration * 1e3:8.1f} ms  {name} [{thread}]")
+
+
+class CatalogLoader(threading.Thread):
+    """Refresh and load the TLE catalog off the UI thread"""
+    def __init__(self, cache_file, tle_url=None, cache_age_limit=24 * 3600, prepare=None, profile=None):
+        """Set up the load; call start() to begin
+
+        Args:
+            cache_file (str): TLE cache file
+            tle_url (str): Catalog URL for a stale cache; celestrak.CELESTRAK_ACTIVE_URL when None
+            cache_age_limit (float): Seconds after which the cache is refreshed first
+            prepare (callable): Optional prepare(satellites), run on the loader thread; its return
+                                value becomes .prepared
+            profile (StartupProfile): Where phase timings go
+        """
+        super().__init__(name="catalog-loader", daemon=True)
+        self.cache_file = cache_file
+        self.tle_url = tle_url
+        self.cache_age_limit = cache_age_limit
+        self.prepare = prepare
+        self.profile = profile or StartupProfile()
+        self.messages = queue.Queue()
+        self.satellites = None
+        self.prepared = None
+        self.error = None
+
+    def status(self, message):
+        self.messages.put(message)
+
+    def pending_messages(self):
+        """Drain and return status lines posted so far"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def run(self):
+        try:
+            self._load()
+        except Exception as e:
+            print(f"Debug: Error loading TLEs in text format: {e}")
+            self.error = e
+
+    def _load(self):
+        cache_file = self.cache_file
+        with self.profile.phase("TLE cache check/refresh"):
+            if not os.path.exists(cache_file) or time.time() - os.path.getmtime(cache_file) > self.cache_age_limit:
+                import requests
+                from celestrak import CELESTRAK_ACTIVE_URL, refresh_tle_cache
+                self.status("Downloading TLEs from Celestrak...")
+                # Conditional fetch, merged into the cache per object; keep the cache if the network fails
+                try:
+                    self.status(refresh_tle_cache(cache_file, self.tle_url or CELESTRAK_ACTIVE_URL))
+                except requests.RequestException as e:
+                    print(f"Debug: Error refreshing TLEs: {e}")
+                    if not os.path.exists(cache_file):
+                        raise
+                    self.status("Celestrak unreachable, using cached TLEs")
+            else:
+                self.status("Loading TLEs from cache...")
+        self.status("Creating satellite objects...")
+        with self.profile.phase("import skyfield/sgp4 + catalog"):
+            from catalog import load_catalog
+        with self.profile.phase("catalog load"):
+            # Process TLE text into satellites, reusing the pre-parsed binary sidecar when current
+            satellites = load_catalog(cache_file)
+        if self.prepare is not None:
+            with self.profile.phase("catalog index"):
+                self.prepared = self.prepare(satellites)
+        with self.profile.phase("import trajectory worker"):
+            import trajectory_worker  # noqa: F401  Warm the import the UI thread does next
+        self.satellites = satellites
@@ -0,0 +1,183 @@
+"""
+Headless pass planner: angular ephemeris files for one satellite's pass over a site.
+
+Loads the satellite from the TLE cache main2.py keeps (through its binary sidecar, see catalog.py),
+finds its passes over the site with find_passes(), and streams time, alt/az/range and their rates
+for the chosen pass at a fixed cadence into a CSV file and a memory-mappable .aeph file
+(ephemeris_file.py), for time-correlating imagery. Samples are computed and written in chunks of
+CHUNK_SECONDS, so memory stays flat however long the window or high the rate.
+
+The site defaults to the one in main2.py's config.json. Examples:
+    python cli/track.py 25544 --list
+    python cli/track.py 25544 --pass-index 1 --rate 10
+    python cli/track.py 25544 --from 2025-08-23T06:10:00 --to 2025-08-23T06:25:00 --out iss
+"""
+
+import argparse
+import datetime
+import json
+import os
+import time
+
+import numpy as np
+from skyfield.api import load, utc, wgs84
+from skyfield.constants import DAY_S
+
+from catalog import find_satellite
+from ephemeris_file import ANGLE_COLUMNS, EPHEMERIS_SUFFIX, AngularEphemeris
+from propagation import angular_ephemeris, find_passes
+
+CHUNK_SECONDS = 60.0  # Ephemeris computed and written per chunk
+DEFAULT_SITE = {"lat": "34.87405877829887", "lon": "-120.44621926328121", "alt": "120.0", "elevation_mask": "0.0"}
+CSV_HEADER = "utc,unix_time,alt_deg,az_deg,range_km,alt_rate_deg_s,az_rate_deg_s,range_rate_km_s\n"
+
+
+def load_site(config_path="config.json"):
+    """main2.py's site settings, from its config.json when present"""
+    config = dict(DEFAULT_SITE)
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                config.update(json.load(f))
+        except Exception as e:
+            print(f"Debug: Error loading {config_path}: {e}")
+    return config
+
+
+def parse_utc(text):
+    """ISO 8601 time, UTC unless it carries an offset"""
+    when = datetime.datetime.fromisoformat(text)
+    return when.replace(tzinfo=utc) if when.tzinfo is None else when.astimezone(utc)
+
+
+def pass_bounds(record, ts, window_start, window_stop):
+    """(rise, set) datetimes of a PASS_DTYPE record, clipped to the search window when open-ended"""
+    rise = window_start if np.isnan(record['rise_tt']) else ts.tt_jd(record['rise_tt']).utc_datetime()
+    set_ = window_stop if np.isnan(record['set_tt']) else ts.tt_jd(record['set_tt']).utc_datetime()
+    return rise, set_
+
+
+def write_ephemeris(satellite, observer, ts, start_utc, stop_utc, rate_hz, csv_path=None, binary_path=None):
+    """Stream a satellite's angular ephemeris between two times to CSV and/or .aeph files
+
+    Samples fall every 1 / rate_hz seconds from start_utc, up to and including stop_utc. The .aeph
+    file is created at its full size, memory-mapped and filled chunk by chunk.
+
+    Args:
+        satellite (EarthSatellite): Satellite to track
+        observer (skyfield.toposlib.GeographicPosition): Observer location
+        ts (skyfield.timelib.Timescale): Timescale
+        start_utc (datetime.datetime): First sample
+        stop_utc (datetime.datetime): Last sample, at most
+        rate_hz (float): Samples per second
+        csv_path (str): CSV output, or None
+        binary_path (str): .aeph output, or None
+
+    Returns:
+        int: Number of samples written
+    """
+    step_s = 1.0 / rate_hz
+    count = int(np.floor((stop_utc - start_utc).total_seconds() / step_s + 1e-9)) + 1
+    chunk = max(int(CHUNK_SECONDS * rate_hz), 1)
+    # Two-part TT Julian date, so sample times keep microsecond precision
+    t0 = ts.from_datetime(start_utc)
+    unix0 = start_utc.timestamp()
+    csv_file = open(csv_path, "w") if csv_path else None
+    site = (observer.latitude.degrees, observer.longitude.degrees, observer.elevation.m)
+    binary = (AngularEphemeris.create(binary_path, count, satellite.model.satnum, site,
+                                      satellite.epoch.utc_datetime(), unix0, step_s, satellite.name)
+              if binary_path else None)
+    try:
+        if csv_file:
+            csv_file.write(CSV_HEADER)
+        for first in range(0, count, chunk):
+            offsets = np.arange(first, min(first + chunk, count)) * step_s
+            times = ts.tt_jd(t0.whole, t0.tt_fraction + offsets / DAY_S)
+            columns = angular_ephemeris(satellite, observer, times)
+            unix = unix0 + offsets
+            if binary is not None:
+                binary.time[first:first + len(offsets)] = unix
+                for name, column in zip(ANGLE_COLUMNS, columns):
+                    binary.columns[name][first:first + len(offsets)] = column
+            if csv_file:
+                stamps = np.datetime_as_string(np.round(unix * 1e6).astype('datetime64[us]'), unit='ms')
+                csv_file.write("".join(
+                    f"{stamp}Z,{t:.3f},{alt:.6f},{az:.6f},{rng:.4f},{alt_rate:.6f},{az_rate:.6f},{range_rate:.6f}\n"
+                    for stamp, t, alt, az, rng, alt_rate, az_rate, range_rate
+                    in zip(stamps.tolist(), unix.tolist(), *(column.tolist() for column in columns))))
+    finally:
+        if csv_file:
+            csv_file.close()
+        if binary is not None:
+            binary.flush()
+    return count
+
+
+def main():
+    """Find a satellite's passes over the site and write the angular ephemeris of one of them"""
+    site = load_site()
+    parser = argparse.ArgumentParser(
+                    prog='track.py',
+                    description='Write the angular ephemeris (time, alt/az/range and rates) of a satellite pass')
+    parser.add_argument("norad", type=int, help='NORAD catalog number')
+    parser.add_argument("--tle", type=str, default="tle_cache.tle", help="TLE file, main2.py's cache by default")
+    parser.add_argument("--lat", type=float, default=float(site["lat"]), help='Site latitude in degrees')
+    parser.add_argument("--lon", type=float, default=float(site["lon"]), help='Site longitude in degrees')
+    parser.add_argument("--alt", type=float, default=float(site["alt"]), help='Site altitude in meters')
+    parser.add_argument("--mask", type=float, default=float(site["elevation_mask"]),
+                        help='Elevation mask in degrees a pass has to clear')
+    parser.add_argument("--start", type=str, default=None, help='ISO UTC start of the pass search, default now')
+    parser.add_argument("--hours", type=float, default=24.0, help='Length of the pass search')
+    parser.add_argument("--pass-index", type=int, default=0, help='Which pass of the search to write, 0 = next')
+    parser.add_argument("--from", dest="from_utc", type=str, default=None,
+                        help='ISO UTC start of an explicit window, instead of a pass')
+    parser.add_argument("--to", dest="to_utc", type=str, default=None, help='ISO UTC end of an explicit window')
+    parser.add_argument("--rate", type=float, default=10.0, help='Samples per second')
+    parser.add_argument("--out", type=str, default=None,
+                        help='Output path without extension, default <norad>_<start time>')
+    parser.add_argument("--formats", nargs="+", choices=("csv", "aeph"), default=["csv", "aeph"],
+                        help='Files to write')
+    parser.add_argument("--list", action="store_true", help='List the passes in the search and exit')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ts = load.timescale()
+    satellite = find_satellite(args.tle, args.norad, ts)
+    if satellite is None:
+        parser.error(f"NORAD {args.norad} is not in {args.tle}")
+    observer = wgs84.latlon(args.lat, args.lon, elevation_m=args.alt)
+    print(f"Debug: {satellite.name} ({args.norad}), TLE epoch {satellite.epoch.utc_strftime('%Y-%m-%d %H:%M:%S')} UTC")
+
+    if args.from_utc or args.to_utc:
+        if not (args.from_utc and args.to_utc):
+            parser.error("--from and --to go together")
+        window_start, window_stop = parse_utc(args.from_utc), parse_utc(args.to_utc)
+    else:
+        search_start = parse_utc(args.start) if args.start else datetime.datetime.now(utc)
+        search_stop = search_start + datetime.timedelta(hours=args.hours)
+        passes = find_passes([satellite], observer, ts, start_utc=search_start, hours=args.hours,
+                             elevation_mask=args.mask)
+        for i, record in enumerate(passes):
+            rise, set_ = pass_bounds(record, ts, search_start, search_stop)
+            print(f"  {i:3d}  rise {rise:%Y-%m-%d %H:%M:%S}  max {record['max_alt']:5.1f} deg  "
+                  f"set {set_:%H:%M:%S}  ({(set_ - rise).total_seconds() / 60:.1f} min)")
+        if args.list:
+            return
+        if not 0 <= args.pass_index < len(passes):
+            parser.error(f"{len(passes)} passes above {args.mask:g} deg in the next {args.hours:g} h, "
+                         f"no pass {args.pass_index}")
+        window_start, window_stop = pass_bounds(passes[args.pass_index], ts, search_start, search_stop)
+    if window_stop <= window_start:
+        parser.error("the window ends before it starts")
+
+    out = args.out or f"{args.norad}_{window_start:%Y%m%dT%H%M%S}"
+    csv_path = out + ".csv" if "csv" in args.formats else None
+    binary_path = out + EPHEMERIS_SUFFIX if "aeph" in args.formats else None
+    count = write_ephemeris(satellite, observer, ts, window_start, window_stop, args.rate, csv_path, binary_path)
+    print(f"Debug: {count} samples at {args.rate:g} Hz from {window_start:%Y-%m-%d %H:%M:%S} to "
+          f"{window_stop:%H:%M:%S} UTC -> {', '.join(p for p in (csv_path, binary_path) if p)} "
+          f"in {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
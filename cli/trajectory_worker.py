@@ -0,0 +1,190 @@
+"""
+Background trajectory precomputation.
+
+Runs the trajectory window in a separate process so the pygame loop keeps rendering and
+handling input while it is propagated. The process keeps its propagation.TrajectoryWindow between
+jobs, so each refresh only propagates the samples the window moved onto. One window covers every observer
+site the UI may switch to, sharing the propagation between them. The UI keeps drawing from the previous
+trajectory set and swaps in the new one, in a single assignment, once poll() hands it back.
+The same process also builds the pass event table (passes.py) on request; those jobs queue
+behind any trajectory job and come back through poll_passes().
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+
+from skyfield.api import load, wgs84
+
+from catalog import load_catalog
+from ephemeris import get_ephemeris_service
+from observer_track import ObserverTrack
+from passes import load_passes
+from propagation import DEFAULT_MAX_ERROR_ARCSEC, DEFAULT_SHARD_SIZE, TrajectoryWindow
+
+# Worker-process state, set up by _init_worker()
+_progress_queue = None
+_catalog_cache = {}
+_ephemeris = None
+_window = None  # (settings, TrajectoryWindow) of the latest trajectory job
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _load_catalog(tle_path):
+    """Load the TLE file once per worker, reloading only when the file changes"""
+    stat = os.stat(tle_path)
+    key = (os.path.abspath(tle_path), stat.st_mtime, stat.st_size)
+    if key not in _catalog_cache:
+        _catalog_cache.clear()
+        ts = load.timescale()
+        _catalog_cache[key] = (ts, load_catalog(tle_path, ts))
+    return _catalog_cache[key]
+
+
+def _load_ephemeris():
+    """Shared ephemeris service for the shadow model, opened once per worker; None if it is unavailable"""
+    global _ephemeris
+    if _ephemeris is None:
+        try:
+            _ephemeris = get_ephemeris_service()
+        except Exception as e:
+            print(f"Debug: Sun ephemeris unavailable, sunlit state not computed: {e}")
+            _ephemeris = False  # Don't retry the download every window
+    return _ephemeris or None
+
+
+def _report(message):
+    if _progress_queue is not None:
+        _progress_queue.put(message)
+
+
+def _propagate_job(tle_path, sites, plot_rect, start_utc, workers, shard_size, elevation_mask, max_error_arcsec):
+    """Worker-side job: roll the window over the catalog in tle_path forward and return one TrajectoryStore per site
+
+    The window is kept while the catalog and settings are unchanged; anything else starts a new one.
+    """
+    global _window
+    ts, satellites = _load_catalog(tle_path)
+    settings = (tuple(sites), tuple(plot_rect), workers, shard_size, elevation_mask, max_error_arcsec)
+    if _window is None or _window[0] != settings or _window[1].satellites is not satellites:
+        observers = [site if isinstance(site, ObserverTrack) else wgs84.latlon(site[0], site[1], elevation_m=site[2])
+                     for site in sites]
+        _window = (settings, TrajectoryWindow(satellites, observers, ts, plot_rect, workers=workers,
+                                              shard_size=shard_size, elevation_mask=elevation_mask,
+                                              ephemeris=_load_ephemeris(), max_error_arcsec=max_error_arcsec))
+
+    def progress(done, total):
+        _report(f"Trajectories {100 * done // max(total, 1)}% ({done}/{total})")
+
+    stores = _window[1].advance(start_utc, progress)
+    satnums = [sat.model.satnum for sat in satellites]
+    return satnums, stores
+
+
+def _passes_job(tle_path, lat, lon, alt_m, elevation_mask, now_utc):
+    """Worker-side job: load or compute the pass table for the catalog in tle_path"""
+    ts, satellites = _load_catalog(tle_path)
+
+    def progress(done, total):
+        _report(f"Passes {100 * done // max(total, 1)}% ({done}/{total})")
+
+    passes, _ = load_passes(satellites, (lat, lon, alt_m), ts, now_utc=now_utc, elevation_mask=elevation_mask,
+                            progress=progress)
+    satnums = [sat.model.satnum for sat in satellites]
+    return satnums, passes
+
+
+class TrajectoryWorker:
+    """Single background process that recomputes trajectory windows on request"""
+    def __init__(self):
+        context = multiprocessing.get_context()
+        self._progress = context.Queue()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=context, initializer=_init_worker, initargs=(self._progress,))
+        self._future = None
+        self._pass_future = None
+
+    @property
+    def busy(self):
+        return self._future is not None and not self._future.done()
+
+    def submit(self, tle_path, sites, plot_rect, start_utc=None, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+               elevation_mask=None, max_error_arcsec=DEFAULT_MAX_ERROR_ARCSEC):
+        """Start moving the trajectory window to a new center. Ignored while a previous job is still running.
+
+        Args:
+            tle_path (str): TLE file holding the same catalog, in the same order, as the UI
+            sites (list): Observer sites as (lat_deg, lon_deg, alt_m) tuples, or observer_track.ObserverTrack
+                          for a moving one; a track unchanged since the last job lets the window roll
+            plot_rect (tuple): (sub_x, sub_y, sub_width, sub_height) of the polar plot
+            start_utc (datetime.datetime): Window center, defaults to the time the job starts
+            workers (int): Processes to shard propagation across; None uses every core
+            shard_size (int): Satellites per shard when workers > 1
+            elevation_mask (float): If given, only satellites that can clear this elevation are propagated
+            max_error_arcsec (float): Adaptive sampling error bound; 0 or None runs SGP4 at every sample
+
+        Returns:
+            bool: True if a job was started
+        """
+        if self.busy:
+            return False
+        self._future = self._executor.submit(_propagate_job, tle_path, [site if isinstance(site, ObserverTrack) else tuple(site) for site in sites], plot_rect,
+                                             start_utc, workers, shard_size, elevation_mask, max_error_arcsec)
+        return True
+
+    @property
+    def passes_busy(self):
+        return self._pass_future is not None and not self._pass_future.done()
+
+    def submit_passes(self, tle_path, lat, lon, alt_m, elevation_mask=0.0, now_utc=None):
+        """Start loading the pass table for the next 24 hours. Ignored while a previous one is pending.
+
+        Returns:
+            bool: True if a job was started
+        """
+        if self.passes_busy:
+            return False
+        self._pass_future = self._executor.submit(_passes_job, tle_path, lat, lon, alt_m, elevation_mask, now_utc)
+        return True
+
+    def progress(self):
+        """Drain and return pending progress messages from the worker"""
+        messages = []
+        while True:
+            try:
+                messages.append(self._progress.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def poll(self):
+        """Return the finished (satnums, stores) result once, else None
+
+        stores holds one propagation.TrajectoryStore per submitted site, in order; store.row_of[i] is
+        the row of the satellite at catalog position i, or -1 if it was not propagated.
+
+        Raises:
+            Exception: Whatever the worker raised, if the job failed
+        """
+        if self._future is None or not self._future.done():
+            return None
+        future, self._future = self._future, None
+        return future.result()
+
+    def poll_passes(self):
+        """Return the finished (satnums, passes) result once, else None
+
+        Raises:
+            Exception: Whatever the worker raised, if the job failed
+        """
+        if self._pass_future is None or not self._pass_future.done():
+            return None
+        future, self._pass_future = self._pass_future, None
+        return future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,5 @@
 from skyfield.api import load, N, W, wgs84
+from ephemeris import get_ephemeris_service
 import logging
 import sys
 from logging.handlers import RotatingFileHandler
@@ -13,8 +14,9 @@ logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
 ts = load.timescale()
 t = ts.now()
 
-# Load the JPL ephemeris DE421 (covers 1900-2050).
-planets = load('de421.bsp')
+# Shared JPL ephemeris DE421 (covers 1900-2050), opened once; positions come from its tables
+ephemeris = get_ephemeris_service()
+planets = ephemeris.kernel
 earth, mars = planets['earth'], planets['mars']
 
 # What's the position of Mars, viewed from Earth?
@@ -22,7 +24,7 @@ astrometric = earth.at(t).observe(mars)
 ra, dec, distance = astrometric.radec()
 
 # Where am I?
-california = earth + wgs84.latlon((34+52/60.0 + 31.8/3600.0) * N, (120 + 26/60.0 + 46.8/3600) * W)
+california = wgs84.latlon((34+52/60.0 + 31.8/3600.0) * N, (120 + 26/60.0 + 46.8/3600) * W)
 
 logging.info(ra)
 logging.info(dec)
@@ -31,8 +33,8 @@ logging.info(distance)
 while True:
     t = ts.now()
 
-    astrometric = california.at(t).observe(mars)
-    alt, az, d = astrometric.apparent().altaz()
+    # Interpolated from the ephemeris tables, no kernel access per iteration
+    alt, az, d = ephemeris.altaz('mars', california, t)
 
     logging.info(t.utc_iso())
     logging.info(alt)
@@ -9,6 +9,8 @@ import numpy as np
 import cv2 as cv
 from matplotlib import pyplot as plt
 
+from ephemeris_file import AngularEphemeris, frame_times
+
 # Logging setup
 logging.basicConfig(
         handlers=[RotatingFileHandler('./zoomview.log', backupCount=5)],
@@ -23,6 +25,7 @@ parser = argparse.ArgumentParser(
                     description='Zoom-view an image sequence')
 parser.add_argument("--directory", type=str, help='Directory to process')
 parser.add_argument("--wait", type=int, help="Milliseconds of wait between frames")
+parser.add_argument("--ephemeris", type=str, help='Angular ephemeris (.aeph from track.py) to annotate frames with')
 args = parser.parse_args()
 
 
@@ -69,6 +72,18 @@ def on_gamma_correction_trackbar(val):
 
 ##################################### MAIN #############################################
 files = os.listdir(args.directory)
+
+# Predicted alt/az/range at every frame's capture time, looked up in one call; only the ephemeris
+# pages around the frame times are read
+predicted = {}
+if args.ephemeris:
+    ephemeris = AngularEphemeris(args.ephemeris)
+    logging.info(f'Ephemeris: {ephemeris.name} ({ephemeris.satnum}), {len(ephemeris)} samples, TLE epoch {ephemeris.tle_epoch}')
+    frames = [file for file in files if ".PNG" in file and '.txt' not in file.lower()]
+    times = frame_times([os.path.join(args.directory, file) for file in frames])
+    for file, t, alt, az, rng in zip(frames, times, *ephemeris.interpolate(times)):
+        predicted[file] = (t, alt, az, rng)
+
 for file in files:
     if ".PNG" in file and '.txt' not in file.lower():
         logging.info(f'Processing {file}')
@@ -133,6 +148,14 @@ for file in files:
         
         # Todo: implement a sequential spot tracker
 
+        if file in predicted:
+            t, alt, az, rng = predicted[file]
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t)) + f'.{int(t * 1000) % 1000:03d}Z'
+            label = (f'{stamp}  alt {alt:.3f}  az {az:.3f}  range {rng:.1f} km' if not np.isnan(alt) else
+                     f'{stamp}  outside ephemeris')
+            logging.info(f'Predicted: {label}')
+            cv.putText(cl1, label, (10, 20), cv.FONT_HERSHEY_SIMPLEX, 0.5, 255, 1, cv.LINE_AA)
+
         cv.imshow("original", cl1)
         
         k = cv.waitKey(0)